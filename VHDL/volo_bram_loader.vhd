@@ -9,11 +9,17 @@
 --
 -- Protocol (CR10-CR14):
 --   Control10[0]     : Start signal (write 1 to begin loading)
+--   Control10[1]     : Stream mode (auto-increment address, see below)
+--   Control10[2]     : Verify: in DONE, compare the upload CRC with Control12
+--   Control10[3]     : CRC continue: keep the running CRC across this start
 --   Control10[31:16] : Word count (number of 32-bit words to load, max 1024)
 --   Control11[11:0]  : Address to write (12-bit, 0-4095 bytes / 4 = 0-1023 words)
+--                      Stream mode: base address, latched at start
 --   Control12[31:0]  : Data to write (32-bit word)
 --   Control13[0]     : Write strobe (pulse high to commit write)
---   Control14        : Reserved for future use
+--   Control13[1]     : Stream mode: pair flag (commit Control12 then Control14)
+--   Control13[31:16] : Stream mode: sequence tag (any change commits)
+--   Control14[31:0]  : Stream mode: second data word of a pair
 --
 -- Usage Pattern (Python/deployment script):
 --   1. Set Control10 = (word_count << 16) | 0x0001  # Start + count
@@ -24,16 +30,43 @@
 --      d. Set Control13 = 0x0000  # Clear strobe
 --   3. Wait for 'done' signal to assert
 --
+-- Stream Mode (models/bram_loader/protocol.py):
+--   1. Set Control10 = 0                          # Re-arm start edge
+--   2. Set Control11 = base, Control13 = 0,
+--      Control10 = (word_count << 16) | 0x0003    # Start + stream + count
+--   3. For each pair of words k = 1, 2, ...:
+--      Set Control12 = word, Control14 = next word,
+--          Control13 = (k << 16) | 0x0002        # New tag commits both
+--   No strobe pulse and no per-word address write: each tag change writes
+--   one or two words at consecutive addresses from the base. The words are
+--   captured one clock after the tag change, so data registers written in
+--   the same bulk call (before the tag) are the ones committed.
+--
+-- Upload CRC:
+--   crc_out is the CRC-32 (IEEE 802.3, as zlib.crc32) of the little-endian
+--   bytes of every word written since the last start without Control10[3].
+--   To verify, set Control12 = expected CRC and Control10[2] = 1 (keeping
+--   Control10[0] high). A mismatch moves the FSM to CRC_ERR, which the
+--   observer shows as a negative (fault) voltage - one readback checks the
+--   whole upload.
+--
 -- State Machine:
 --   IDLE     → Wait for Control10[0] = 1
---   LOADING  → Monitor Control13[0] for write strobes
---   DONE     → Assert done signal, wait for reset
+--   LOADING  → Monitor Control13[0] for write strobes (stream: tag changes)
+--   DONE     → Assert done signal; rising edge of Control10[0] reloads
+--              (done drops for the whole reload)
+--   CRC_ERR  → Verify failed, done cleared; rising edge of Control10[0] reloads
 --
 -- Design Notes:
 --   - Simple edge-detected write protocol (no handshaking)
 --   - Assumes deployment script controls timing
 --   - BRAM is always-enabled (can be accessed by app after loading)
---   - Done signal is sticky (cleared only on reset)
+--   - Done signal holds in DONE; a reload, a failed verify (CRC_ERR) or
+--     reset clears it, so an application gated by done is disabled while
+--     its BRAM is rewritten or known not to match
+--   - Stream mode never writes more than word_count words per load
+--   - Stream tag changes must be at least 3 clocks apart (one bulk network
+--     call takes far longer)
 --------------------------------------------------------------------------------
 
 library IEEE;
@@ -54,8 +87,8 @@ entity volo_bram_loader is
         Control10 : in  std_logic_vector(31 downto 0);  -- Start + word count
         Control11 : in  std_logic_vector(31 downto 0);  -- Address
         Control12 : in  std_logic_vector(31 downto 0);  -- Data
-        Control13 : in  std_logic_vector(31 downto 0);  -- Write strobe
-        Control14 : in  std_logic_vector(31 downto 0);  -- Reserved
+        Control13 : in  std_logic_vector(31 downto 0);  -- Write strobe / stream tag
+        Control14 : in  std_logic_vector(31 downto 0);  -- Stream: second word
 
         -- BRAM Interface (to application)
         bram_addr : out std_logic_vector(11 downto 0);  -- 4KB address space
@@ -64,6 +97,7 @@ entity volo_bram_loader is
 
         -- Status
         done      : out std_logic;  -- Asserted when loading complete
+        crc_out   : out std_logic_vector(31 downto 0);  -- CRC-32 of written words
 
         -- Debug Output (FSM Observer)
         voltage_debug_out : out signed(15 downto 0)  -- Oscilloscope debug voltage
@@ -76,6 +110,7 @@ architecture rtl of volo_bram_loader is
     constant IDLE    : std_logic_vector(1 downto 0) := "00";
     constant LOADING : std_logic_vector(1 downto 0) := "01";
     constant DONE_ST : std_logic_vector(1 downto 0) := "10";
+    constant CRC_ERR : std_logic_vector(1 downto 0) := "11";  -- Fault state
 
     signal state      : std_logic_vector(1 downto 0);
     signal next_state : std_logic_vector(1 downto 0);
@@ -90,7 +125,54 @@ architecture rtl of volo_bram_loader is
     signal write_strobe_prev : std_logic;
     signal write_strobe_edge : std_logic;
 
-    -- Done flag (sticky until reset)
+    -- Start edge detection (reload from DONE)
+    signal start_prev : std_logic;
+    signal start_edge : std_logic;
+
+    -- Stream mode (auto-increment address, tag-committed writes)
+    signal stream_req    : std_logic;
+    signal stream_mode   : std_logic;                      -- Latched at start
+    signal seq_tag       : std_logic_vector(15 downto 0);
+    signal seq_prev      : std_logic_vector(15 downto 0);
+    signal pending_a     : std_logic;                      -- word_a to write
+    signal pending_b     : std_logic;                      -- word_b to write
+    signal word_a        : std_logic_vector(31 downto 0);  -- Control12 at tag change
+    signal word_b        : std_logic_vector(31 downto 0);  -- Control14 at tag change
+    signal next_addr     : unsigned(11 downto 0);
+    signal words_issued  : unsigned(15 downto 0);
+    signal stream_we     : std_logic;
+    signal stream_addr   : std_logic_vector(11 downto 0);
+    signal stream_data   : std_logic_vector(31 downto 0);
+
+    -- Write commit (either protocol)
+    signal legacy_we  : std_logic;
+    signal load_start : std_logic;
+    signal we_int     : std_logic;
+    signal data_int   : std_logic_vector(31 downto 0);
+
+    -- Upload CRC (reflected CRC-32, polynomial 0x04C11DB7)
+    signal verify_req   : std_logic;
+    signal crc_continue : std_logic;
+    signal crc_reg      : std_logic_vector(31 downto 0);  -- Before final XOR
+    signal crc_value    : std_logic_vector(31 downto 0);
+
+    -- Advance a reflected CRC-32 by one word, LSB first (= little-endian bytes)
+    function crc32_word(crc : std_logic_vector(31 downto 0);
+                        data : std_logic_vector(31 downto 0)) return std_logic_vector is
+        variable c : std_logic_vector(31 downto 0);
+    begin
+        c := crc;
+        for i in 0 to 31 loop
+            if (c(0) xor data(i)) = '1' then
+                c := ('0' & c(31 downto 1)) xor x"EDB88320";
+            else
+                c := '0' & c(31 downto 1);
+            end if;
+        end loop;
+        return c;
+    end function;
+
+    -- Done flag (set in DONE, cleared when a load starts or verify fails)
     signal done_internal : std_logic;
 
     -- FSM Observer signals
@@ -104,6 +186,10 @@ begin
     start_loading <= Control10(0);
     word_count    <= unsigned(Control10(31 downto 16));
     write_strobe  <= Control13(0);
+    stream_req    <= Control10(1);
+    verify_req    <= Control10(2);
+    crc_continue  <= Control10(3);
+    seq_tag       <= Control13(31 downto 16);
 
     ----------------------------------------------------------------------------
     -- Edge detection for write strobe (rising edge)
@@ -119,6 +205,23 @@ begin
 
     write_strobe_edge <= '1' when (write_strobe = '1' and write_strobe_prev = '0') else '0';
 
+    ----------------------------------------------------------------------------
+    -- Edge detection for start (rising edge reloads from DONE)
+    ----------------------------------------------------------------------------
+    process(Clk, Reset)
+    begin
+        if Reset = '1' then
+            start_prev <= '0';
+        elsif rising_edge(Clk) then
+            start_prev <= start_loading;
+        end if;
+    end process;
+
+    start_edge <= '1' when (start_loading = '1' and start_prev = '0') else '0';
+
+    -- First cycle of a load (IDLE or DONE → LOADING)
+    load_start <= '1' when (state /= LOADING and next_state = LOADING) else '0';
+
     ----------------------------------------------------------------------------
     -- FSM: State Register
     ----------------------------------------------------------------------------
@@ -134,7 +237,8 @@ begin
     ----------------------------------------------------------------------------
     -- FSM: Next State Logic
     ----------------------------------------------------------------------------
-    process(state, start_loading, write_strobe_edge, words_written, word_count)
+    process(state, start_loading, start_edge, words_written, word_count,
+            verify_req, crc_value, Control12)
     begin
         next_state <= state;  -- Default: hold state
 
@@ -151,8 +255,18 @@ begin
                 end if;
 
             when DONE_ST =>
-                -- Stay in DONE until reset
-                next_state <= DONE_ST;
+                -- Stay in DONE until reset or a new start edge
+                if start_edge = '1' then
+                    next_state <= LOADING;
+                elsif verify_req = '1' and crc_value /= Control12 then
+                    next_state <= CRC_ERR;
+                end if;
+
+            when CRC_ERR =>
+                -- Upload did not match; reload on a new start edge
+                if start_edge = '1' then
+                    next_state <= LOADING;
+                end if;
 
             when others =>
                 next_state <= IDLE;
@@ -167,23 +281,102 @@ begin
         if Reset = '1' then
             words_written <= (others => '0');
         elsif rising_edge(Clk) then
-            if state = IDLE then
+            if state = IDLE or load_start = '1' then
                 words_written <= (others => '0');
-            elsif state = LOADING and write_strobe_edge = '1' then
+            elsif state = LOADING and (legacy_we = '1' or stream_we = '1') then
                 words_written <= words_written + 1;
             end if;
         end if;
     end process;
 
     ----------------------------------------------------------------------------
-    -- FSM: Done Flag (Sticky)
+    -- Stream Mode: Tag-Committed, Auto-Incrementing Writes
+    -- A tag change captures Control12 (and Control14 for a pair); each captured
+    -- word is written on its own cycle at next_addr, which then increments.
+    ----------------------------------------------------------------------------
+    process(Clk, Reset)
+    begin
+        if Reset = '1' then
+            stream_mode  <= '0';
+            seq_prev     <= (others => '0');
+            pending_a    <= '0';
+            pending_b    <= '0';
+            next_addr    <= (others => '0');
+            words_issued <= (others => '0');
+            word_a       <= (others => '0');
+            word_b       <= (others => '0');
+            stream_we    <= '0';
+            stream_addr  <= (others => '0');
+            stream_data  <= (others => '0');
+        elsif rising_edge(Clk) then
+            stream_we <= '0';
+
+            if load_start = '1' then
+                stream_mode  <= stream_req;
+                seq_prev     <= seq_tag;
+                pending_a    <= '0';
+                pending_b    <= '0';
+                next_addr    <= unsigned(Control11(11 downto 0));
+                words_issued <= (others => '0');
+            elsif state = LOADING and stream_mode = '1' then
+                if pending_a = '1' then
+                    stream_we    <= '1';
+                    stream_addr  <= std_logic_vector(next_addr);
+                    stream_data  <= word_a;
+                    next_addr    <= next_addr + 1;
+                    words_issued <= words_issued + 1;
+                    pending_a    <= '0';
+                elsif pending_b = '1' then
+                    stream_we    <= '1';
+                    stream_addr  <= std_logic_vector(next_addr);
+                    stream_data  <= word_b;
+                    next_addr    <= next_addr + 1;
+                    words_issued <= words_issued + 1;
+                    pending_b    <= '0';
+                elsif seq_tag /= seq_prev then
+                    seq_prev <= seq_tag;
+                    word_a   <= Control12;
+                    word_b   <= Control14;
+                    if words_issued < word_count then
+                        pending_a <= '1';
+                    end if;
+                    if Control13(1) = '1' and words_issued + 1 < word_count then
+                        pending_b <= '1';
+                    end if;
+                end if;
+            end if;
+        end if;
+    end process;
+
+    ----------------------------------------------------------------------------
+    -- Upload CRC: one word per write, in write order
+    ----------------------------------------------------------------------------
+    process(Clk, Reset)
+    begin
+        if Reset = '1' then
+            crc_reg <= (others => '1');
+        elsif rising_edge(Clk) then
+            if load_start = '1' and crc_continue = '0' then
+                crc_reg <= (others => '1');
+            elsif we_int = '1' then
+                crc_reg <= crc32_word(crc_reg, data_int);
+            end if;
+        end if;
+    end process;
+
+    crc_value <= not crc_reg;
+
+    ----------------------------------------------------------------------------
+    -- FSM: Done Flag (cleared on the first cycle of a load and on CRC_ERR)
     ----------------------------------------------------------------------------
     process(Clk, Reset)
     begin
         if Reset = '1' then
             done_internal <= '0';
         elsif rising_edge(Clk) then
-            if state = DONE_ST then
+            if load_start = '1' or next_state = CRC_ERR then
+                done_internal <= '0';
+            elsif state = DONE_ST then
                 done_internal <= '1';
             end if;
         end if;
@@ -193,18 +386,24 @@ begin
     -- Output Assignments
     ----------------------------------------------------------------------------
 
-    -- BRAM address (from Control11, lower 12 bits)
-    bram_addr <= Control11(11 downto 0);
+    -- BRAM address (from Control11, lower 12 bits; stream mode: auto-increment)
+    bram_addr <= stream_addr when stream_mode = '1' else Control11(11 downto 0);
 
-    -- BRAM data (from Control12)
-    bram_data <= Control12;
+    -- BRAM data (from Control12; stream mode: registered Control12/Control14)
+    data_int  <= stream_data when stream_mode = '1' else Control12;
+    bram_data <= data_int;
 
     -- BRAM write enable (pulse on write_strobe rising edge, only in LOADING state)
-    bram_we <= '1' when (state = LOADING and write_strobe_edge = '1') else '0';
+    legacy_we <= '1' when (state = LOADING and stream_mode = '0' and write_strobe_edge = '1') else '0';
+    we_int    <= legacy_we or stream_we;
+    bram_we   <= we_int;
 
-    -- Done signal (sticky)
+    -- Done signal (low while loading and in CRC_ERR)
     done <= done_internal;
 
+    -- Upload CRC
+    crc_out <= crc_value;
+
     ----------------------------------------------------------------------------
     -- FSM Observer for Debug Visualization
     -- Maps 2-bit BRAM loader FSM state to oscilloscope-visible voltage
@@ -218,15 +417,15 @@ begin
             NUM_STATES => 4,              -- 2-bit encoding (4 possible states)
             V_MIN => 0.0,                 -- IDLE state voltage
             V_MAX => 2.0,                 -- DONE state voltage
-            FAULT_STATE_THRESHOLD => 3,   -- State "11" (reserved) as fault indicator
+            FAULT_STATE_THRESHOLD => 3,   -- State "11" (CRC_ERR) as fault indicator
             STATE_0_NAME => "IDLE",
             STATE_1_NAME => "LOADING",
             STATE_2_NAME => "DONE",
-            STATE_3_NAME => "RESERVED"
+            STATE_3_NAME => "CRC_ERR"
         )
         port map (
             clk          => Clk,
-            reset        => Reset,
+            reset        => not Reset,  -- fsm_observer expects active-low reset
             state_vector => state_6bit,
             voltage_out  => voltage_debug_out
         );
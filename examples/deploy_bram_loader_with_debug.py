@@ -6,7 +6,7 @@ Demonstrates deploying the volo_bram_loader module with real-time
 FSM observer voltage monitoring on oscilloscope.
 
 Features:
-- BRAM loading via Control Register protocol
+- BRAM loading via Control Register protocol (batched stream mode by default)
 - Real-time state visualization via FSM observer
 - Voltage decoding (IDLE/LOADING/DONE states)
 - Multi-instrument mode (CloudCompile + Oscilloscope)
@@ -21,6 +21,13 @@ Usage:
         --bitstream path/to/bitstream.tar \\
         --buffer path/to/buffer.bin
 
+    # Bitstream built before stream mode: per-word strobe protocol
+    python examples/deploy_bram_loader_with_debug.py --legacy ...
+
+    # Calibration loop: reload the buffer whenever the file changes
+    # (only changed word blocks are sent, see models/bram_loader/delta.py)
+    python examples/deploy_bram_loader_with_debug.py ... --watch
+
 Architecture:
     MCC Bitstream (CustomWrapper)
       └─> volo_bram_loader entity
@@ -32,7 +39,7 @@ FSM States (visible on oscilloscope):
     IDLE:     0.0V  (waiting for start signal)
     LOADING:  1.0V  (writing words to BRAM)
     DONE:     2.0V  (loading complete)
-    RESERVED: -2.0V (fault state, negative voltage indicates error)
+    CRC_ERR: -2.0V (fault state: upload CRC did not match the buffer)
 
 Author: EZ-EMFI Team
 Date: 2025-01-28
@@ -41,9 +48,13 @@ Date: 2025-01-28
 import argparse
 import sys
 import time
-import struct
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Callable, Optional, Dict, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from models.bram_loader import (
+    BRAMUploader, BRAMUploadError, UploadRecord, bitstream_id, load_words, words_crc32,
+)
 
 # Check for Moku API
 try:
@@ -65,7 +76,8 @@ class BRAMLoaderStates:
     IDLE = 0
     LOADING = 1
     DONE = 2
-    RESERVED = 3  # Fault state
+    CRC_ERR = 3   # Fault state (upload CRC mismatch)
+    RESERVED = CRC_ERR
 
 
 class ObserverVoltages:
@@ -84,7 +96,7 @@ class ObserverVoltages:
     IDLE = 0.0      # State 0: 0.0V
     LOADING = 1.0   # State 1: 1.0V
     DONE = 2.0      # State 2: 2.0V
-    FAULT = -2.0    # State 3: -2.0V (sign-flip fault)
+    FAULT = -2.0    # State 3: -2.0V (sign-flip fault, CRC_ERR)
 
     # Tolerance for voltage comparisons (±50mV)
     TOLERANCE = 0.05
@@ -129,7 +141,7 @@ def decode_observer_voltage(voltage: float) -> Dict:
     elif voltage < 0 and abs(voltage - ObserverVoltages.FAULT) < ObserverVoltages.TOLERANCE:
         return {
             'state_name': 'FAULT',
-            'state_id': BRAMLoaderStates.RESERVED,
+            'state_id': BRAMLoaderStates.CRC_ERR,
             'voltage': voltage,
             'is_fault': True
         }
@@ -152,28 +164,60 @@ class BRAMLoader:
 
     Protocol (CR10-CR14):
         Control10[0]     : Start signal (write 1 to begin loading)
+        Control10[1]     : Stream mode (auto-increment address)
         Control10[31:16] : Word count (number of 32-bit words, max 1024)
         Control11[11:0]  : Address to write (12-bit, 0-4095 bytes / 4 = 0-1023 words)
         Control12[31:0]  : Data to write (32-bit word)
         Control13[0]     : Write strobe (pulse high to commit write)
-        Control14        : Reserved
+        Control13[31:16] : Stream mode: sequence tag (change commits CR12/CR14)
+        Control14[31:0]  : Stream mode: second word of a pair
+
+    Stream mode (default) sends two words per bulk set_controls call and
+    paces by reading back Control13 (models/bram_loader). The legacy
+    strobe protocol costs four calls and 2 ms of sleeps per word.
+
+    With an UploadRecord, stream loads only resend the word blocks that
+    changed since the last load to the same device and bitstream. A load
+    is only recorded once the FSM observer shows DONE after the on-device
+    CRC check, so a CRC_ERR upload is always resent in full.
     """
 
-    def __init__(self, cloud_compile: CloudCompile):
+    def __init__(self, cloud_compile: CloudCompile, streamed: bool = True,
+                 record: Optional[UploadRecord] = None, device: Optional[str] = None,
+                 bitstream: Optional[str] = None,
+                 state_reader: Optional[Callable[[], Optional[Dict]]] = None):
         """
         Initialize BRAM loader.
 
         Args:
             cloud_compile: Moku CloudCompile instrument instance
+            streamed: Use the batched stream protocol (False for bitstreams
+                without stream mode)
+            record: Upload record for delta loads (None = always full loads)
+            device: Device key in the record (e.g. IP address)
+            bitstream: bitstream_id() of the deployed bitstream
+            state_reader: Returns the decoded FSM observer state
+                (decode_observer_voltage() dict, None if unreadable); a
+                stream load fails unless it shows DONE, and without it
+                stream loads are never recorded
         """
         self.cc = cloud_compile
-
-    def load_buffer(self, data: List[int], progress_callback=None) -> bool:
+        self.streamed = streamed
+        self.uploader = BRAMUploader(cloud_compile)
+        # Record keys are only kept together with the record
+        self.record: Optional[UploadRecord] = None
+        self.device = ""
+        self.bitstream = ""
+        if record is not None and streamed and device and bitstream:
+            self.record, self.device, self.bitstream = record, device, bitstream
+        self.state_reader = state_reader
+
+    def load_buffer(self, data: Sequence[int], progress_callback=None) -> bool:
         """
         Load data buffer to BRAM.
 
         Args:
-            data: List of 32-bit integers to write
+            data: 32-bit words to write (list, array or numpy array)
             progress_callback: Optional callback(word_index, total) for progress updates
 
         Returns:
@@ -187,6 +231,9 @@ class BRAMLoader:
             print("WARNING: Empty buffer, nothing to load")
             return True
 
+        if self.streamed:
+            return self._load_streamed(data, progress_callback)
+
         try:
             # Step 1: Set start signal + word count
             print(f"Starting BRAM load ({len(data)} words)...")
@@ -200,7 +247,7 @@ class BRAMLoader:
                 self.cc.set_control_matrix(0, 11, addr)
 
                 # Set data
-                self.cc.set_control_matrix(0, 12, word)
+                self.cc.set_control_matrix(0, 12, int(word))
 
                 # Pulse write strobe (high)
                 self.cc.set_control_matrix(0, 13, 0x0001)
@@ -221,6 +268,59 @@ class BRAMLoader:
             print(f"✗ BRAM load failed: {e}")
             return False
 
+    def _load_streamed(self, data: Sequence[int], progress_callback=None) -> bool:
+        """Load data with the batched stream protocol (delta if recorded)"""
+        plan = None
+        if self.record is not None:
+            plan = self.record.plan(self.device, self.bitstream, data)
+            if not plan.full and not plan.runs:
+                print(f"✓ BRAM already holds this buffer ({len(data)} words, nothing sent)")
+                return True
+            # Until confirmed, the BRAM contents are unknown
+            self.record.forget(self.device, self.bitstream)
+
+        if plan is not None and not plan.full:
+            print(f"Starting BRAM delta load ({plan.words}/{len(data)} words, {plan.reason})...")
+        else:
+            print(f"Starting BRAM stream load ({len(data)} words)...")
+        try:
+            if plan is not None and not plan.full:
+                stats = self.uploader.upload_runs(data, plan.runs, progress_callback=progress_callback)
+            else:
+                stats = self.uploader.upload(data, progress_callback=progress_callback)
+        except BRAMUploadError as e:
+            print(f"✗ BRAM load not acknowledged: {e}")
+            return False
+        except Exception as e:
+            print(f"✗ BRAM load failed: {e}")
+            return False
+
+        # Anything but DONE after the verify is a failed load; the record
+        # stays forgotten, so the next load resends everything
+        state = self._read_state()
+        if state is not None and state['state_name'] != 'DONE':
+            if state['is_fault']:
+                print("✗ Upload CRC mismatch (CRC_ERR): BRAM contents differ from the buffer")
+            else:
+                print(f"✗ FSM in {state['state_name']} after the load, expected DONE")
+            return False
+
+        print(f"✓ Loaded {stats.words} words to BRAM in {stats.seconds * 1e3:.0f} ms "
+              f"({stats.calls} calls, {stats.confirms} readbacks, CRC32 0x{stats.crc32:08X} sent for check)")
+        if self.record is not None:
+            if state is not None:
+                self.record.remember(self.device, self.bitstream, data)
+            else:
+                print("WARNING: CRC check result unknown - load not recorded for delta uploads")
+        return True
+
+    def _read_state(self) -> Optional[Dict]:
+        """FSM observer state after a load (None without a state reader)"""
+        if self.state_reader is None:
+            return None
+        time.sleep(0.1)  # Let the oscilloscope catch up with the verify
+        return self.state_reader()
+
     def load_from_file(self, buffer_path: Path, progress_callback=None) -> bool:
         """
         Load buffer from binary file.
@@ -236,24 +336,19 @@ class BRAMLoader:
             print(f"ERROR: Buffer file not found: {buffer_path}")
             return False
 
-        # Read binary file
-        with open(buffer_path, 'rb') as f:
-            raw_bytes = f.read()
-
-        # Check size
-        if len(raw_bytes) % 4 != 0:
-            print(f"ERROR: Buffer size must be multiple of 4 bytes (got {len(raw_bytes)})")
+        # Map the file as little-endian 32-bit words (first 4KB only)
+        try:
+            data = load_words(buffer_path)
+        except ValueError as e:
+            print(f"ERROR: {e}")
             return False
 
-        if len(raw_bytes) > 4096:
-            print(f"WARNING: Buffer truncated to 4KB (was {len(raw_bytes)} bytes)")
-            raw_bytes = raw_bytes[:4096]
+        size = buffer_path.stat().st_size
+        if size > 4096:
+            print(f"WARNING: Buffer truncated to 4KB (was {size} bytes)")
 
-        # Unpack to 32-bit words (little-endian)
-        word_count = len(raw_bytes) // 4
-        data = list(struct.unpack(f'<{word_count}I', raw_bytes))
-
-        print(f"Loaded {len(data)} words ({len(raw_bytes)} bytes) from {buffer_path.name}")
+        print(f"Loaded {len(data)} words ({len(data) * 4} bytes, CRC32 0x{words_crc32(data):08X}) "
+              f"from {buffer_path.name}")
         return self.load_buffer(data, progress_callback)
 
 
@@ -264,7 +359,8 @@ class BRAMLoader:
 class BRAMLoaderDeployment:
     """Main deployment class for BRAM loader with FSM observer monitoring"""
 
-    def __init__(self, moku_ip: str, bitstream_path: Path, buffer_path: Optional[Path] = None):
+    def __init__(self, moku_ip: str, bitstream_path: Path, buffer_path: Optional[Path] = None,
+                 streamed: bool = True, delta: bool = True):
         """
         Initialize deployment.
 
@@ -272,15 +368,19 @@ class BRAMLoaderDeployment:
             moku_ip: Moku device IP address
             bitstream_path: Path to MCC bitstream (.tar)
             buffer_path: Optional path to BRAM buffer (.bin)
+            streamed: Load with the batched stream protocol
+            delta: Only resend changed word blocks on repeated loads
         """
         self.moku_ip = moku_ip
         self.bitstream_path = bitstream_path
         self.buffer_path = buffer_path
+        self.streamed = streamed
+        self.record = UploadRecord() if (streamed and delta) else None
 
         self.multi_instrument = None
         self.cloud_compile = None
         self.oscilloscope = None
-        self.bram_loader = None
+        self.bram_loader: Optional[BRAMLoader] = None
 
     def connect(self) -> bool:
         """Connect to Moku device"""
@@ -310,8 +410,15 @@ class BRAMLoaderDeployment:
             self.cloud_compile.load_bitstream(str(self.bitstream_path))
             print("✓ Bitstream deployed to Slot 1")
 
+            # Fresh bitstream: BRAM contents from earlier loads are gone
+            if self.record is not None:
+                self.record.forget(self.moku_ip)
+
             # Initialize BRAM loader helper
-            self.bram_loader = BRAMLoader(self.cloud_compile)
+            self.bram_loader = BRAMLoader(self.cloud_compile, streamed=self.streamed,
+                                          record=self.record, device=self.moku_ip,
+                                          bitstream=bitstream_id(self.bitstream_path),
+                                          state_reader=self.monitor_fsm_state)
             return True
 
         except Exception as e:
@@ -423,14 +530,15 @@ class BRAMLoaderDeployment:
                 if current % 50 == 0 or current == total:
                     print(f"  Progress: {current}/{total} words ({100*current//total}%)")
 
+            assert self.bram_loader is not None  # created by deploy_instruments()
             success = self.bram_loader.load_from_file(self.buffer_path, progress_callback)
 
-            # Monitor state during/after loading
+            # Monitor state after loading (stream loads already checked CRC_ERR)
             time.sleep(0.1)
             state = self.monitor_fsm_state()
             if state:
                 print(f"FSM State after load: {state['state_name']} ({state['voltage']:.3f}V)")
-                if state['state_name'] != 'DONE':
+                if state['state_name'] != 'DONE' and not state['is_fault']:
                     print("WARNING: Expected DONE state after loading")
 
             if not success:
@@ -451,7 +559,7 @@ class BRAMLoaderDeployment:
         print("  - IDLE:    0.0V (waiting for data)")
         print("  - LOADING: 1.0V (writing to BRAM)")
         print("  - DONE:    2.0V (loading complete)")
-        print("  - FAULT:  <0V (error condition)")
+        print("  - FAULT:  <0V (CRC_ERR: upload did not match the buffer)")
         print()
         print("Next steps:")
         print("  1. View Ch2 on oscilloscope to see state transitions")
@@ -461,6 +569,29 @@ class BRAMLoaderDeployment:
 
         return True
 
+    def watch_buffer(self, poll_s: float = 0.5):
+        """
+        Reload the buffer file whenever it changes (Ctrl-C to stop).
+
+        Args:
+            poll_s: File modification poll interval in seconds
+        """
+        buffer_path, loader = self.buffer_path, self.bram_loader
+        if buffer_path is None or loader is None:
+            print("ERROR: Nothing to watch (no buffer file or no deployed bitstream)")
+            return
+        print(f"Watching {buffer_path} for changes (Ctrl-C to stop)...")
+        last_mtime = buffer_path.stat().st_mtime
+        try:
+            while True:
+                time.sleep(poll_s)
+                mtime = buffer_path.stat().st_mtime
+                if mtime != last_mtime:
+                    last_mtime = mtime
+                    loader.load_from_file(buffer_path)
+        except KeyboardInterrupt:
+            print()
+
     def disconnect(self):
         """Disconnect from Moku"""
         if self.multi_instrument:
@@ -497,6 +628,12 @@ Examples:
     parser.add_argument('--ip', type=str, help='Moku device IP address')
     parser.add_argument('--bitstream', type=Path, help='Path to MCC bitstream (.tar)')
     parser.add_argument('--buffer', type=Path, help='Optional path to BRAM buffer (.bin)')
+    parser.add_argument('--legacy', action='store_true',
+                        help='Per-word strobe protocol (bitstreams without stream mode)')
+    parser.add_argument('--full', action='store_true',
+                        help='Always send the whole buffer (no delta uploads)')
+    parser.add_argument('--watch', action='store_true',
+                        help='After deployment, reload the buffer whenever the file changes')
 
     args = parser.parse_args()
 
@@ -518,9 +655,13 @@ Examples:
         return False
 
     # Run deployment
-    deployment = BRAMLoaderDeployment(args.ip, args.bitstream, args.buffer)
+    deployment = BRAMLoaderDeployment(args.ip, args.bitstream, args.buffer,
+                                      streamed=not args.legacy, delta=not args.full)
     success = deployment.run_deployment()
 
+    if success and args.watch and args.buffer:
+        deployment.watch_buffer()
+
     # Keep connection open for manual testing
     if success:
         input("\nPress Enter to disconnect and exit...")
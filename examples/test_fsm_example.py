@@ -11,6 +11,9 @@ Author: AI-generated validation test
 Date: 2025-10-24
 """
 
+import sys
+from pathlib import Path
+
 import cocotb
 from cocotb.triggers import RisingEdge, ClockCycles
 from conftest import (
@@ -19,6 +22,9 @@ from conftest import (
     run_with_timeout
 )
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from models.reference import observer_table
+
 
 # ============================================================================
 # Helper Functions
@@ -45,13 +51,11 @@ def calculate_expected_voltage(state_index: int, num_normal_states: int = 6,
         v_min: Minimum voltage
         v_max: Maximum voltage
 
-    Note: Must match VHDL fsm_observer.vhd logic which uses num_normal, not num_states!
+    Note: Uses the fsm_observer reference model (models/reference), so the
+    result is the RTL's quantized output, not the ideal stairstep voltage.
     """
-    if num_normal_states > 1:
-        v_step = (v_max - v_min) / (num_normal_states - 1)
-    else:
-        v_step = 0.0
-    return v_min + (state_index * v_step)
+    table = observer_table(num_normal_states, v_min, v_max, num_normal_states)
+    return table.voltage(state_index)
 
 
 # ============================================================================
@@ -0,0 +1,75 @@
+"""
+Host side of the volo_bram_loader control register protocol.
+
+Main Classes:
+    BRAMUploader: Batched stream-mode uploads with readback-confirmed pacing
+    ControlWriter: Bulk (set_controls) or per-register writes on CloudCompile
+    UploadStats: Calls, confirmations and time of one upload
+    UploadRecord: Per device/bitstream block hashes for delta uploads
+    BufferBuilder: Assemble LUTs/words/files into one word array with CRC
+
+Quick Start:
+    >>> from models.bram_loader import BRAMUploader
+    >>> stats = BRAMUploader(cloud_compile).upload(words)
+    >>>
+    >>> # Delta upload: only blocks that changed since the last load
+    >>> plan = UploadRecord().plan(ip, bitstream_id(bitstream_path), words)
+    >>> BRAMUploader(cloud_compile).upload_runs(words, plan.runs)
+    >>>
+    >>> # Build a buffer from volo_lut_pkg-style tables (needs numpy)
+    >>> builder = BufferBuilder()
+    >>> builder.add_lut("intensity", linear_voltage_lut(0.0, 3.3))
+    >>> buffer = builder.build()      # buffer.words, buffer.crc32
+"""
+
+from .buffer import (
+    NUMPY_AVAILABLE,
+    BramBuffer,
+    BufferBuilder,
+    BufferSection,
+    linear_voltage_lut,
+    load_words,
+    words_crc32,
+)
+from .delta import (
+    DeltaPlan,
+    UploadRecord,
+    bitstream_id,
+    block_hashes,
+)
+from .protocol import (
+    MAX_WORDS,
+    stream_batches,
+    stream_call_count,
+    strobe_batches,
+    verify_batch,
+)
+from .uploader import (
+    BRAMUploader,
+    BRAMUploadError,
+    ControlWriter,
+    UploadStats,
+)
+
+__all__ = [
+    'MAX_WORDS',
+    'stream_batches',
+    'stream_call_count',
+    'strobe_batches',
+    'verify_batch',
+    'BRAMUploader',
+    'BRAMUploadError',
+    'ControlWriter',
+    'UploadStats',
+    'DeltaPlan',
+    'UploadRecord',
+    'bitstream_id',
+    'block_hashes',
+    'NUMPY_AVAILABLE',
+    'BramBuffer',
+    'BufferBuilder',
+    'BufferSection',
+    'linear_voltage_lut',
+    'load_words',
+    'words_crc32',
+]
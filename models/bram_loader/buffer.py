@@ -0,0 +1,247 @@
+"""
+BRAM buffer files and LUT packing without per-word Python objects.
+
+Buffers are little-endian 32-bit words (WORD_DTYPE "<u4"), the layout of
+the .bin files BRAMLoader.load_from_file() reads. With numpy, load_words()
+maps the file with np.memmap and BufferBuilder assembles sections into one
+preallocated word array; LUT entries are written through a "<u2" view of
+that array, so a volo_lut_pkg 101 x 16-bit table packs two entries per
+word (even index in bits [15:0], odd index in [31:16]) without copies.
+Without numpy, load_words() falls back to array("I") and the builder is
+unavailable.
+
+CRC-32 (zlib/IEEE 802.3, over the little-endian bytes in address order)
+identifies a buffer; it is what volo_bram_loader computes over the words
+it writes.
+
+Usage:
+    builder = BufferBuilder()
+    builder.add_lut("intensity", linear_voltage_lut(0.0, 3.3))
+    builder.add_file("waveform", Path("buffers/pulse.bin"))
+    buffer = builder.build()
+    buffer.save(Path("buffers/calibration.bin"))
+    print(buffer.describe())
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
+from typing import Dict, List, Sequence, Union
+import zlib
+
+from ..reference.fsm_observer import voltage_to_digital
+from .protocol import MAX_WORDS, WORD_MASK
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+WORD_DTYPE = "<u4"
+WORD_BYTES = 4
+LUT_ENTRIES = 101           # volo_lut_pkg lut_101x16_t
+LUT_WORDS = (LUT_ENTRIES + 1) // 2
+
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for BRAM buffer building (pip install numpy)")
+
+
+def word_bytes(words: Union[Sequence[int], "np.ndarray"]):
+    """
+    Little-endian bytes of a word sequence, without copying when possible.
+
+    Args:
+        words: numpy array, array("I") or sequence of ints
+
+    Returns:
+        bytes-like object of len(words) * 4 bytes
+    """
+    if NUMPY_AVAILABLE and isinstance(words, np.ndarray):
+        if words.dtype != np.dtype(WORD_DTYPE) or not words.flags.c_contiguous:
+            words = np.ascontiguousarray(words, dtype=WORD_DTYPE)
+        return words.data.cast("B")
+    if not (isinstance(words, array) and words.typecode == "I"):
+        words = array("I", (w & WORD_MASK for w in words))
+    if sys.byteorder == "big":
+        words = array("I", words)
+        words.byteswap()
+    return memoryview(words).cast("B")
+
+
+def words_crc32(words: Union[Sequence[int], "np.ndarray"], crc: int = 0) -> int:
+    """
+    CRC-32 of the words' little-endian bytes (same as the loader RTL).
+
+    Args:
+        words: Words in write order
+        crc: CRC of earlier words to continue from (as zlib.crc32)
+    """
+    return zlib.crc32(word_bytes(words), crc) & 0xFFFFFFFF
+
+
+def load_words(path: Path, max_words: int = MAX_WORDS):
+    """
+    Read a buffer file as 32-bit little-endian words.
+
+    Args:
+        path: .bin file (size must be a multiple of 4 bytes)
+        max_words: Words beyond this are ignored
+
+    Returns:
+        Read-only np.memmap of WORD_DTYPE (array("I") without numpy)
+
+    Raises:
+        ValueError: File size is not a multiple of 4 bytes
+    """
+    size = Path(path).stat().st_size
+    if size % WORD_BYTES:
+        raise ValueError(f"Buffer size must be multiple of 4 bytes (got {size})")
+    count = min(size // WORD_BYTES, max_words)
+    if NUMPY_AVAILABLE:
+        if count == 0:
+            return np.zeros(0, dtype=WORD_DTYPE)
+        return np.memmap(path, dtype=WORD_DTYPE, mode="r", shape=(count,))
+    words = array("I")
+    with open(path, "rb") as f:
+        words.frombytes(f.read(count * WORD_BYTES))
+    if sys.byteorder == "big":
+        words.byteswap()
+    return words
+
+
+def linear_voltage_lut(min_voltage: float, max_voltage: float):
+    """
+    volo_lut_pkg.create_linear_voltage_lut(): 101 signed 16-bit codes.
+
+    Uses the bit-exact volo_voltage_pkg.voltage_to_digital() model.
+    """
+    _require_numpy()
+    step = (max_voltage - min_voltage) / 100.0
+    return np.array([voltage_to_digital(min_voltage + i * step) for i in range(LUT_ENTRIES)],
+                    dtype="<i2")
+
+
+@dataclass(frozen=True)
+class BufferSection:
+    """One named region of a BRAM buffer"""
+    name: str
+    offset: int      # First word
+    words: int
+    kind: str        # "words", "lut", "file"
+
+
+@dataclass
+class BramBuffer:
+    """
+    An assembled BRAM image: words plus section map and CRC.
+
+    words is a read-only view into the builder's array; pass it straight to
+    BRAMUploader.upload() / UploadRecord.plan().
+    """
+    words: "np.ndarray"
+    sections: Dict[str, BufferSection] = field(default_factory=dict)
+    crc32: int = 0
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def section(self, name: str):
+        """Words of one section (view)"""
+        s = self.sections[name]
+        return self.words[s.offset:s.offset + s.words]
+
+    def lut(self, name: str, signed: bool = True):
+        """The 101 entries of a LUT section (view)"""
+        entries = self.section(name).view("<i2" if signed else "<u2")
+        return entries[:LUT_ENTRIES]
+
+    def save(self, path: Path):
+        """Write the buffer as a .bin file"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.words.tofile(path)
+
+    def describe(self) -> List[str]:
+        lines = [f"{len(self.words)} words ({len(self.words) * WORD_BYTES} bytes), CRC32 0x{self.crc32:08X}"]
+        for s in self.sections.values():
+            lines.append(f"  0x{s.offset:03X}-0x{s.offset + s.words - 1:03X}  {s.kind:5s}  {s.name}")
+        return lines
+
+
+class BufferBuilder:
+    """
+    Assemble sections (raw words, LUTs, files) into one BRAM word array.
+
+    Sections are placed back to back unless an offset is given; each add_*
+    returns the BufferSection it placed.
+
+    Args:
+        max_words: Capacity (default: the 1024-word loader buffer)
+    """
+
+    def __init__(self, max_words: int = MAX_WORDS):
+        _require_numpy()
+        self.words = np.zeros(max_words, dtype=WORD_DTYPE)
+        self.sections: Dict[str, BufferSection] = {}
+        self.used = 0
+
+    def _place(self, name: str, count: int, offset, kind: str) -> BufferSection:
+        if name in self.sections:
+            raise ValueError(f"Duplicate buffer section '{name}'")
+        offset = self.used if offset is None else offset
+        if offset < 0 or offset + count > len(self.words):
+            raise ValueError(f"Section '{name}' ({count} words at {offset}) exceeds "
+                             f"{len(self.words)}-word buffer")
+        for other in self.sections.values():
+            if offset < other.offset + other.words and other.offset < offset + count:
+                raise ValueError(f"Section '{name}' overlaps '{other.name}'")
+        section = BufferSection(name, offset, count, kind)
+        self.sections[name] = section
+        self.used = max(self.used, offset + count)
+        return section
+
+    def add_words(self, name: str, words: Union[Sequence[int], "np.ndarray"], offset=None) -> BufferSection:
+        """Add raw 32-bit words"""
+        words = np.asarray(words)
+        if words.dtype.kind == "i":
+            words = words.astype("<i4").view(WORD_DTYPE)
+        section = self._place(name, len(words), offset, "words")
+        self.words[section.offset:section.offset + section.words] = words
+        return section
+
+    def add_lut(self, name: str, table: Union[Sequence[int], "np.ndarray"], offset=None) -> BufferSection:
+        """
+        Add a 101-entry volo_lut_pkg table (signed or unsigned 16-bit).
+
+        Entries are packed two per word, even index in the low half.
+        """
+        table = np.asarray(table)
+        if len(table) != LUT_ENTRIES:
+            raise ValueError(f"LUT '{name}' has {len(table)} entries, expected {LUT_ENTRIES}")
+        if table.min() < -0x8000 or table.max() > 0xFFFF:
+            raise ValueError(f"LUT '{name}' entries do not fit 16 bits")
+        section = self._place(name, LUT_WORDS, offset, "lut")
+        halves = self.words.view("<u2")
+        start = 2 * section.offset
+        halves[start:start + LUT_ENTRIES] = table.astype("<i4").astype("<u2")
+        halves[start + LUT_ENTRIES:start + 2 * LUT_WORDS] = 0
+        return section
+
+    def add_file(self, name: str, path: Path, offset=None) -> BufferSection:
+        """Add the words of a .bin file"""
+        words = load_words(path, max_words=len(self.words))
+        section = self._place(name, len(words), offset, "file")
+        self.words[section.offset:section.offset + section.words] = words
+        return section
+
+    def build(self) -> BramBuffer:
+        """Finish: a read-only copy of the words up to the last section, with CRC-32"""
+        words = self.words[:self.used].copy()
+        words.flags.writeable = False
+        return BramBuffer(words=words, sections=dict(self.sections), crc32=words_crc32(words))
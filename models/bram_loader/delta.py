@@ -0,0 +1,169 @@
+"""
+Delta BRAM uploads: resend only the word blocks that changed.
+
+UploadRecord keeps, per device and bitstream, a short hash of every
+BLOCK_WORDS-word block of the last buffer loaded. plan() compares a new
+buffer against it and returns the runs of changed blocks; BRAMUploader
+.upload_runs() sends each run as its own stream-mode load, so a one-word
+LUT tweak costs a handful of calls instead of a full 4 KB upload.
+
+A record is only valid while the BRAM still holds what was loaded:
+deployment code calls forget(device) after every bitstream deploy, and
+the entry is dropped before an upload and written back only once the
+upload has been confirmed.
+
+The record lives in ~/.moku-deploy/bram_uploads.json (next to the
+moku_go device cache).
+
+Usage:
+    record = UploadRecord()
+    bitstream = bitstream_id(bitstream_path)
+    plan = record.plan(ip, bitstream, words)
+    record.forget(ip, bitstream)
+    uploader.upload_runs(words, plan.runs)
+    record.remember(ip, bitstream, words)
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .buffer import WORD_BYTES, word_bytes
+
+BLOCK_WORDS = 8
+RECORD_VERSION = 1
+RECORD_PATH = Path.home() / ".moku-deploy" / "bram_uploads.json"
+
+
+def block_hashes(words: Sequence[int], block_words: int = BLOCK_WORDS) -> List[str]:
+    """Short SHA-256 (16 hex digits) of each block of little-endian words"""
+    data = word_bytes(words)
+    step = block_words * WORD_BYTES
+    return [hashlib.sha256(data[i:i + step]).hexdigest()[:16] for i in range(0, len(data), step)]
+
+
+def bitstream_id(path: Path) -> str:
+    """SHA-256 of a bitstream file (hex), used to key upload records"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class DeltaPlan:
+    """Word runs to upload for a new buffer"""
+    runs: List[Tuple[int, int]] = field(default_factory=list)  # (first word, count)
+    full: bool = True
+    reason: str = ""
+
+    @property
+    def words(self) -> int:
+        return sum(count for _, count in self.runs)
+
+
+class UploadRecord:
+    """
+    Per device/bitstream block hashes of the last buffer loaded.
+
+    Args:
+        path: JSON file holding the records
+        block_words: Words per hashed block
+    """
+
+    def __init__(self, path: Path = RECORD_PATH, block_words: int = BLOCK_WORDS):
+        self.path = Path(path)
+        self.block_words = block_words
+        self.records = self._load()
+
+    @staticmethod
+    def key(device: str, bitstream: str) -> str:
+        return f"{device}|{bitstream}"
+
+    def _load(self) -> dict:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != RECORD_VERSION:
+            return {}
+        return data.get("records", {})
+
+    def save(self):
+        """Write the records (atomic replace)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"version": RECORD_VERSION, "records": self.records},
+                                       indent=2, sort_keys=True))
+        tmp_path.replace(self.path)
+
+    def get(self, device: str, bitstream: str) -> Optional[dict]:
+        return self.records.get(self.key(device, bitstream))
+
+    def plan(self, device: str, bitstream: str, words: Sequence[int], base_addr: int = 0) -> DeltaPlan:
+        """
+        Compare words against the last load on device/bitstream.
+
+        Args:
+            device: Device identifier (IP address or serial)
+            bitstream: bitstream_id() of the deployed bitstream
+            words: New buffer
+            base_addr: BRAM word address of words[0]
+
+        Returns:
+            DeltaPlan; full=True (one run covering everything) when there is
+            no usable record
+        """
+        full = DeltaPlan(runs=[(0, len(words))] if len(words) else [], full=True)
+        record = self.get(device, bitstream)
+        if record is None:
+            full.reason = "no record for this device/bitstream"
+            return full
+        if (record["base_addr"], record["word_count"], record["block_words"]) != \
+                (base_addr, len(words), self.block_words):
+            full.reason = "buffer layout changed"
+            return full
+
+        runs: List[Tuple[int, int]] = []
+        new_hashes = block_hashes(words, self.block_words)
+        for block, (old, new) in enumerate(zip(record["hashes"], new_hashes)):
+            if old == new:
+                continue
+            first = block * self.block_words
+            count = min(self.block_words, len(words) - first)
+            if runs and runs[-1][0] + runs[-1][1] == first:
+                runs[-1] = (runs[-1][0], runs[-1][1] + count)
+            else:
+                runs.append((first, count))
+        return DeltaPlan(runs=runs, full=False,
+                         reason=f"{len(runs)} changed runs" if runs else "unchanged")
+
+    def remember(self, device: str, bitstream: str, words: Sequence[int], base_addr: int = 0):
+        """Record a confirmed load (and save)"""
+        self.records[self.key(device, bitstream)] = {
+            "base_addr": base_addr,
+            "word_count": len(words),
+            "block_words": self.block_words,
+            "hashes": block_hashes(words, self.block_words),
+        }
+        self.save()
+
+    def forget(self, device: str, bitstream: Optional[str] = None):
+        """
+        Drop records of device (all bitstreams unless one is given) and save.
+
+        Call after a bitstream deploy and before an upload that might fail.
+        """
+        if bitstream is not None:
+            keys = [self.key(device, bitstream)]
+        else:
+            keys = [k for k in self.records if k.split("|", 1)[0] == device]
+        dropped = [self.records.pop(k) for k in keys if k in self.records]
+        if dropped:
+            self.save()
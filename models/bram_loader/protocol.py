@@ -0,0 +1,147 @@
+"""
+Control register protocol of VHDL/volo_bram_loader.vhd (CR10-CR14).
+
+Two protocols share the registers:
+
+- Strobe (legacy): per word, write the address to CR11, the data to CR12
+  and pulse CR13[0]. Four register writes per word.
+- Stream: CR10[1] selects auto-increment mode. The base address is
+  latched at start and every change of the CR13[31:16] sequence tag
+  commits CR12 (and CR14 when CR13[1] is set) at the next addresses.
+  One bulk write of three registers carries two words.
+
+Either way the loader keeps a CRC-32 of the words it writes; verify_batch()
+asks it to compare that against the host's CRC (buffer.words_crc32) and
+to fall into CRC_ERR on a mismatch, visible on the FSM observer output.
+
+The encoders here return the writes as ordered batches of (register, value)
+pairs. Each batch is meant for one bulk `set_controls` call; the order
+inside a batch is the order the registers must land in (data before tag).
+
+Usage:
+    from models.bram_loader.protocol import stream_batches
+
+    for batch in stream_batches(words, base_addr=0):
+        cloud_compile.set_controls([{"id": r, "value": v} for r, v in batch])
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+
+# Registers
+CR_START = 10        # [0] start, [1] stream mode, [31:16] word count
+CR_ADDR = 11         # [11:0] word address (stream: base address)
+CR_DATA = 12         # First (or only) data word
+CR_STROBE = 13       # [0] write strobe; stream: [1] pair, [31:16] tag
+CR_DATA_B = 14       # Stream: second data word of a pair
+
+# Control10
+START_BIT = 0x0001
+STREAM_BIT = 0x0002
+VERIFY_BIT = 0x0004          # In DONE: compare upload CRC with Control12
+CRC_CONTINUE_BIT = 0x0008    # Keep the running CRC across this start
+WORD_COUNT_SHIFT = 16
+
+# Control13
+WRITE_STROBE_BIT = 0x0001
+PAIR_BIT = 0x0002
+SEQ_SHIFT = 16
+SEQ_MASK = 0xFFFF
+
+ADDR_MASK = 0x0FFF
+MAX_WORDS = 1024     # 4KB buffer
+WORD_MASK = 0xFFFFFFFF
+
+ControlBatch = List[Tuple[int, int]]
+
+
+def _check_words(words: Sequence[int], base_addr: int):
+    if len(words) > MAX_WORDS:
+        raise ValueError(f"Buffer too large ({len(words)} words, max {MAX_WORDS})")
+    if not 0 <= base_addr <= ADDR_MASK or base_addr + len(words) > ADDR_MASK + 1:
+        raise ValueError(f"Words 0x{base_addr:03X}+{len(words)} exceed the 12-bit BRAM address space")
+
+
+def start_value(word_count: int, stream: bool = True, continue_crc: bool = False) -> int:
+    """Control10 value that starts a load of word_count words"""
+    return ((word_count << WORD_COUNT_SHIFT) | START_BIT | (STREAM_BIT if stream else 0)
+            | (CRC_CONTINUE_BIT if continue_crc else 0))
+
+
+def tag_value(seq: int, pair: bool) -> int:
+    """Control13 value for stream commit number seq"""
+    return ((seq & SEQ_MASK) << SEQ_SHIFT) | (PAIR_BIT if pair else 0)
+
+
+def stream_batches(words: Sequence[int], base_addr: int = 0,
+                   continue_crc: bool = False) -> Iterator[ControlBatch]:
+    """
+    Encode a load in stream mode.
+
+    Yields, in order:
+        1. [(CR10, 0)] so the start bit has a rising edge (reload from DONE)
+        2. Session: base address, tag 0, then start + stream + word count
+        3. One batch per pair of words: CR12, CR14, then the new tag
+           (an odd last word goes alone, without the pair flag)
+
+    Args:
+        words: 32-bit words (at most 1024; list or numpy array)
+        base_addr: BRAM word address of words[0]
+        continue_crc: Extend the previous load's CRC instead of restarting it
+
+    Returns:
+        Iterator of ordered (register, value) batches
+    """
+    _check_words(words, base_addr)
+    yield [(CR_START, 0)]
+    yield [(CR_ADDR, base_addr), (CR_STROBE, tag_value(0, False)),
+           (CR_START, start_value(len(words), continue_crc=continue_crc))]
+    for seq, i in enumerate(range(0, len(words), 2), start=1):
+        if i + 1 < len(words):
+            yield [(CR_DATA, int(words[i]) & WORD_MASK), (CR_DATA_B, int(words[i + 1]) & WORD_MASK),
+                   (CR_STROBE, tag_value(seq, True))]
+        else:
+            yield [(CR_DATA, int(words[i]) & WORD_MASK), (CR_STROBE, tag_value(seq, False))]
+
+
+def strobe_batches(words: Sequence[int], base_addr: int = 0) -> Iterator[ControlBatch]:
+    """
+    Encode a load with the legacy strobe protocol (one write per batch).
+
+    Args:
+        words: 32-bit words (at most 1024)
+        base_addr: BRAM word address of words[0]
+
+    Returns:
+        Iterator of single-write batches
+    """
+    _check_words(words, base_addr)
+    yield [(CR_START, start_value(len(words), stream=False))]
+    for addr, word in enumerate(words, start=base_addr):
+        yield [(CR_ADDR, addr)]
+        yield [(CR_DATA, int(word) & WORD_MASK)]
+        yield [(CR_STROBE, WRITE_STROBE_BIT)]
+        yield [(CR_STROBE, 0)]
+
+
+def verify_batch(expected_crc: int, word_count: int, stream: bool = True,
+                 continue_crc: bool = False) -> ControlBatch:
+    """
+    Ask the loader (in DONE) to check its upload CRC.
+
+    Control10 keeps the start bit high so the write is not a new start;
+    a mismatch moves the FSM to CRC_ERR.
+
+    Args:
+        expected_crc: words_crc32() of the words written since the CRC restart
+        word_count, stream, continue_crc: As in the Control10 start value
+    """
+    return [(CR_DATA, expected_crc & WORD_MASK),
+            (CR_START, start_value(word_count, stream, continue_crc) | VERIFY_BIT)]
+
+
+def stream_call_count(word_count: int) -> int:
+    """Bulk calls stream_batches() needs for word_count words"""
+    return 2 + (word_count + 1) // 2
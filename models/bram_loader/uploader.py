@@ -0,0 +1,208 @@
+"""
+Batched BRAM uploads to a running volo_bram_loader over the Moku API.
+
+BRAMUploader sends the stream protocol (protocol.stream_batches) with one
+bulk `set_controls` call per batch, falling back to per-register
+`set_control` calls on API versions without bulk writes. Instead of fixed
+sleeps it paces the upload by reading back Control13: once the register
+file holds the last sequence tag, every earlier write has landed, and the
+loader commits a tag within a few clock cycles - far less than one
+network round trip. MCC bitstreams have no status registers, so the
+control register readback is the only acknowledgement available.
+
+With verify=True the uploader finally sends the CRC-32 of what it wrote
+(protocol.verify_batch); the loader compares it with its own running CRC
+and moves to CRC_ERR on a mismatch, which shows as a negative voltage on
+the FSM observer output - one oscilloscope reading checks the upload.
+
+Usage:
+    uploader = BRAMUploader(cloud_compile)
+    stats = uploader.upload(words)
+    print(f"{stats.words} words in {stats.seconds * 1e3:.0f} ms ({stats.calls} calls)")
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+from .buffer import words_crc32
+from .protocol import CR_STROBE, ControlBatch, stream_batches, verify_batch
+
+
+class BRAMUploadError(RuntimeError):
+    """The loader did not acknowledge a batch in time"""
+
+
+@dataclass
+class UploadStats:
+    """Cost of one upload"""
+    words: int = 0
+    calls: int = 0       # Network calls (writes + readbacks)
+    confirms: int = 0    # Readback confirmations
+    seconds: float = 0.0
+    crc32: Optional[int] = None  # Upload CRC sent for verification
+
+    @property
+    def words_per_s(self) -> float:
+        return self.words / self.seconds if self.seconds > 0 else 0.0
+
+    def add(self, other: "UploadStats"):
+        self.words += other.words
+        self.calls += other.calls
+        self.confirms += other.confirms
+        self.seconds += other.seconds
+        if other.crc32 is not None:
+            self.crc32 = other.crc32
+
+
+class ControlWriter:
+    """
+    Register access on a CloudCompile instrument, one network call per batch.
+
+    Args:
+        cloud_compile: Moku CloudCompile instance (or anything with set_control)
+        bulk: Use set_controls when the API has it
+    """
+
+    def __init__(self, cloud_compile, bulk: bool = True):
+        self.cc = cloud_compile
+        self.bulk = bulk and callable(getattr(cloud_compile, "set_controls", None))
+        self.calls = 0
+
+    def write(self, batch: ControlBatch):
+        """Write a batch of (register, value) pairs in order"""
+        if self.bulk:
+            self.cc.set_controls([{"id": reg, "value": value} for reg, value in batch])
+            self.calls += 1
+        else:
+            for reg, value in batch:
+                self.cc.set_control(reg, value)
+                self.calls += 1
+
+    def read(self, reg: int) -> int:
+        """Read back a control register"""
+        self.calls += 1
+        result = self.cc.get_control(reg)
+        if isinstance(result, dict):  # {"id": .., "value": ..} on some API versions
+            result = result.get("value", 0)
+        return int(result)
+
+
+class BRAMUploader:
+    """
+    Stream-mode BRAM uploads with readback-confirmed pacing.
+
+    Args:
+        cloud_compile: Moku CloudCompile instance
+        confirm_every: Read back Control13 after this many data batches
+            (and always after the last one); 0 = only at the end
+        timeout_s: Give up if a readback does not match within this time
+        bulk: Use set_controls bulk writes when available
+    """
+
+    def __init__(self, cloud_compile, confirm_every: int = 64,
+                 timeout_s: float = 1.0, bulk: bool = True):
+        self.writer = ControlWriter(cloud_compile, bulk=bulk)
+        self.confirm_every = confirm_every
+        self.timeout_s = timeout_s
+        self.crc = 0  # Running CRC of the loader since its last CRC restart
+
+    def confirm(self, reg: int, value: int):
+        """
+        Poll a control register until it reads back value.
+
+        Raises:
+            BRAMUploadError: Value not seen within timeout_s
+        """
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            actual = self.writer.read(reg)
+            if actual == value:
+                return
+            if time.monotonic() > deadline:
+                raise BRAMUploadError(
+                    f"Control{reg} reads 0x{actual:08X}, expected 0x{value:08X} after {self.timeout_s}s")
+
+    def upload(self, words: Sequence[int], base_addr: int = 0,
+               progress_callback: Optional[Callable[[int, int], None]] = None,
+               verify: bool = True, continue_crc: bool = False) -> UploadStats:
+        """
+        Load words into BRAM starting at base_addr.
+
+        Args:
+            words: 32-bit words (at most 1024)
+            base_addr: BRAM word address of words[0]
+            progress_callback: Optional callback(words_sent, total)
+            verify: Send the upload CRC for the loader to check
+            continue_crc: Extend the CRC of the previous upload (multi-run loads)
+
+        Returns:
+            UploadStats for this upload
+
+        Raises:
+            ValueError: Buffer does not fit the BRAM
+            BRAMUploadError: Loader did not acknowledge a batch
+        """
+        t0 = time.perf_counter()
+        calls0 = self.writer.calls
+        stats = UploadStats(words=len(words))
+        sent = 0
+        last_tag = None
+
+        self.crc = words_crc32(words, self.crc if continue_crc else 0)
+        for n, batch in enumerate(stream_batches(words, base_addr, continue_crc)):
+            self.writer.write(batch)
+            if n < 2:
+                continue  # Session setup
+            reg, last_tag = batch[-1]
+            sent = min(sent + 2, len(words))
+            if self.confirm_every and (n - 1) % self.confirm_every == 0 and sent < len(words):
+                self.confirm(reg, last_tag)
+                stats.confirms += 1
+            if progress_callback:
+                progress_callback(sent, len(words))
+
+        if last_tag is not None:
+            self.confirm(CR_STROBE, last_tag)
+            stats.confirms += 1
+        if verify:
+            self.writer.write(verify_batch(self.crc, len(words), continue_crc=continue_crc))
+            stats.crc32 = self.crc
+
+        stats.calls = self.writer.calls - calls0
+        stats.seconds = time.perf_counter() - t0
+        return stats
+
+    def upload_runs(self, words: Sequence[int], runs: Sequence[Tuple[int, int]], base_addr: int = 0,
+                    progress_callback: Optional[Callable[[int, int], None]] = None,
+                    verify: bool = True) -> UploadStats:
+        """
+        Load only the given runs of words (see delta.UploadRecord.plan).
+
+        Each run is a separate stream-mode load; the loader reloads from
+        DONE on every start, so BRAM outside the runs keeps its contents.
+        The CRC continues across the runs and is verified once at the end.
+
+        Args:
+            words: Full buffer
+            runs: (first word, count) pairs to send
+            base_addr: BRAM word address of words[0]
+            progress_callback: Optional callback(words_sent, total_in_runs)
+            verify: Send the CRC of all runs for the loader to check
+
+        Returns:
+            Combined UploadStats of all runs
+        """
+        stats = UploadStats()
+        total = sum(count for _, count in runs)
+        for i, (first, count) in enumerate(runs):
+            done = stats.words
+            callback = None
+            if progress_callback:
+                callback = lambda sent, _, done=done: progress_callback(done + sent, total)
+            stats.add(self.upload(words[first:first + count], base_addr + first, callback,
+                                  verify=verify and i == len(runs) - 1, continue_crc=i > 0))
+        return stats
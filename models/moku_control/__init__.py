@@ -0,0 +1,25 @@
+"""
+Moku control register access for asyncio code.
+
+Main Classes:
+    AsyncControlSession: Pipelined, coalescing register writes and
+        awaitable button pulses on a CloudCompile instrument
+    StandInCloudCompile: Local stand-in instrument with round-trip latency
+    PerRegisterStandIn: Stand-in for API versions without set_controls
+
+Quick Start:
+    >>> from models.moku_control import AsyncControlSession
+    >>> async with AsyncControlSession(cloud_compile) as session:
+    ...     await session.pulse(0, 0x80000000)
+"""
+
+from .session import AsyncControlSession, SessionStats
+from .standin import AppliedWrite, PerRegisterStandIn, StandInCloudCompile
+
+__all__ = [
+    'AsyncControlSession',
+    'SessionStats',
+    'StandInCloudCompile',
+    'PerRegisterStandIn',
+    'AppliedWrite',
+]
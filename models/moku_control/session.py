@@ -0,0 +1,277 @@
+"""
+Asynchronous control register session for a Moku CloudCompile instrument.
+
+The Moku API is blocking: every set_control() is one HTTP round trip, so
+scripts that press buttons thousands of times spend their time waiting on
+the network one call after another. AsyncControlSession wraps the
+instrument for asyncio code:
+
+- Pipelining: calls run on a small thread pool, up to max_in_flight at a
+  time, so writes to independent registers overlap their round trips.
+- Coalescing: writes staged in the same tick (one event loop pass, or
+  tick_s seconds) go out together as one bulk set_controls call, and
+  repeated writes to one register in a tick collapse to the last value.
+- Ordering: a register is never sent while an earlier write to it is
+  still in flight, so writes to one register land in program order.
+- Awaitable pulses: pulse() writes the pressed value, waits until the
+  instrument has acknowledged it, then writes the released value, which
+  replaces the fixed press/release sleep.
+
+Usage:
+    async with AsyncControlSession(cloud_compile) as session:
+        await session.set_many({3: 0, 4: 4095 << 16})
+        await session.pulse(0, 0x80000000)        # arm_probe button
+        session.write(8, intensity)               # fire-and-forget
+        await session.flush()
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class SessionStats:
+    """Traffic of one session"""
+    writes: int = 0       # write() calls
+    coalesced: int = 0    # Writes replaced by a later value in the same tick
+    calls: int = 0        # Network calls made
+    reads: int = 0
+
+    @property
+    def writes_per_call(self) -> float:
+        return self.writes / self.calls if self.calls else 0.0
+
+
+class _WriteFuture(asyncio.Future):
+    """Future of a staged write that remembers whether its outcome was collected"""
+
+    collected = False
+
+    def __await__(self):
+        self.collected = True
+        return super().__await__()
+
+    __iter__ = __await__
+
+    def result(self):
+        self.collected = True
+        return super().result()
+
+    def exception(self):
+        self.collected = True
+        return super().exception()
+
+
+class AsyncControlSession:
+    """
+    Pipelined, coalescing control register writes on a CloudCompile instance.
+
+    Args:
+        cloud_compile: Moku CloudCompile (or anything with set_control/get_control)
+        max_in_flight: Concurrent network calls (1 = serialized, still coalesced)
+        tick_s: Extra time to collect writes before sending (0 = one loop pass)
+        bulk: Use set_controls for multi-register batches when the API has it
+    """
+
+    def __init__(self, cloud_compile, max_in_flight: int = 4, tick_s: float = 0.0,
+                 bulk: bool = True):
+        self.cc = cloud_compile
+        self.max_in_flight = max_in_flight
+        self.tick_s = tick_s
+        self.bulk = bulk and callable(getattr(cloud_compile, "set_controls", None))
+        self.stats = SessionStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._staged: Dict[int, Tuple[int, List[asyncio.Future]]] = {}
+        self._in_flight_regs: set = set()
+        self._tasks: set = set()
+        self._flush_handle = None
+        # Failed calls with the futures of their writes, until flush()
+        self._failed: List[Tuple[BaseException, List[_WriteFuture]]] = []
+
+    async def __aenter__(self) -> "AsyncControlSession":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def start(self):
+        """Bind to the running event loop (done by `async with`)"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                                thread_name_prefix="moku-control")
+
+    async def close(self):
+        """Send staged writes, wait for them, and stop the worker threads"""
+        if self._loop is None:
+            return
+        try:
+            await self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._loop = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write(self, reg: int, value: int) -> asyncio.Future:
+        """
+        Stage a register write for the current tick.
+
+        Returns:
+            Future resolved once the value (or a later value coalesced with
+            it) has been acknowledged by the instrument
+        """
+        self.start()
+        future = _WriteFuture(loop=self._loop)
+        self.stats.writes += 1
+        if reg in self._staged:
+            self.stats.coalesced += 1
+            self._staged[reg][1].append(future)
+            self._staged[reg] = (value, self._staged[reg][1])
+        else:
+            self._staged[reg] = (value, [future])
+        self._schedule_flush()
+        return future
+
+    async def set(self, reg: int, value: int):
+        """Write one register and wait for the acknowledgement"""
+        await self.write(reg, value)
+
+    async def set_many(self, values: Dict[int, int]):
+        """Write several registers (one bulk call when possible) and wait"""
+        await asyncio.gather(*(self.write(reg, value) for reg, value in values.items()))
+
+    async def pulse(self, reg: int, pressed: int, released: int = 0, hold_s: float = 0.0):
+        """
+        Press and release a button register.
+
+        The released value is only written after the pressed value has been
+        acknowledged (plus hold_s), so the two are never coalesced and the
+        FPGA sees the press for at least one round trip.
+        """
+        await self.write(reg, pressed)
+        if hold_s > 0:
+            await asyncio.sleep(hold_s)
+        await self.write(reg, released)
+
+    async def flush(self):
+        """
+        Send everything staged now and wait for all calls to finish.
+
+        Raises:
+            The first call error since the last flush whose writes nobody
+            awaited (fire-and-forget writes are reported here; an error
+            already raised to a waiter is not raised again)
+        """
+        if self._loop is None:
+            return
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._dispatch()
+        while self._staged or self._tasks:
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            else:
+                await asyncio.sleep(0)
+            self._dispatch()
+        failed, self._failed = self._failed, []
+        for error, futures in failed:
+            if not any(future.collected for future in futures):
+                raise error
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def read(self, reg: int) -> int:
+        """Read back a control register, after any pending write to it"""
+        self.start()
+        while reg in self._staged or reg in self._in_flight_regs:
+            await self.flush()
+        assert self._loop is not None and self._slots is not None
+        async with self._slots:
+            self.stats.calls += 1
+            self.stats.reads += 1
+            result = await self._loop.run_in_executor(self._executor, self.cc.get_control, reg)
+        if isinstance(result, dict):  # {"id": .., "value": ..} on some API versions
+            result = result.get("value", 0)
+        return int(result)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self):
+        assert self._loop is not None
+        if self._flush_handle is None:
+            if self.tick_s > 0:
+                self._flush_handle = self._loop.call_later(self.tick_s, self._tick)
+            else:
+                self._flush_handle = self._loop.call_soon(self._tick)
+
+    def _tick(self):
+        self._flush_handle = None
+        self._dispatch()
+
+    def _dispatch(self):
+        """Send staged registers that have no write in flight"""
+        ready = [reg for reg in self._staged if reg not in self._in_flight_regs]
+        if not ready:
+            return
+        batch = [(reg, *self._staged.pop(reg)) for reg in ready]
+        if self.bulk and len(batch) > 1:
+            batches = [batch]
+        else:
+            batches = [[entry] for entry in batch]
+        assert self._loop is not None
+        for b in batches:
+            self._in_flight_regs.update(reg for reg, _, _ in b)
+            task = self._loop.create_task(self._send(b))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _call(self, batch: List[Tuple[int, int]]):
+        if len(batch) > 1:
+            self.cc.set_controls([{"id": reg, "value": value} for reg, value in batch])
+        else:
+            self.cc.set_control(*batch[0])
+
+    async def _send(self, batch):
+        assert self._loop is not None and self._slots is not None
+        error = None
+        try:
+            async with self._slots:
+                self.stats.calls += 1
+                await self._loop.run_in_executor(
+                    self._executor, self._call, [(reg, value) for reg, value, _ in batch])
+        except Exception as e:
+            error = e
+            self._failed.append((e, [f for _, _, futures in batch for f in futures]))
+        finally:
+            for reg, _, futures in batch:
+                self._in_flight_regs.discard(reg)
+                for future in futures:
+                    if future.done():
+                        continue
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+                        # Silence asyncio's "never retrieved" log without
+                        # counting as collected: flush() reports it then
+                        asyncio.Future.exception(future)
+            if self._staged:
+                self._schedule_flush()
@@ -0,0 +1,141 @@
+"""
+Local stand-in for a Moku CloudCompile instrument.
+
+StandInCloudCompile answers set_control / set_controls / get_control /
+get_controls like the Moku API, from a register file in memory, after a
+configurable round-trip latency. Calls are handled by one server thread in
+arrival order, as the instrument applies them, and every applied write is
+logged with its time, so session code (AsyncControlSession, BRAMUploader)
+can be exercised and timed without hardware.
+
+Usage:
+    server = StandInCloudCompile(latency_s=0.002)
+    async with AsyncControlSession(server) as session:
+        await session.pulse(0, 0x80000000)
+    server.history(0)    # [0x80000000, 0]
+    server.close()
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+NUM_CONTROLS = 32
+
+
+@dataclass(frozen=True)
+class AppliedWrite:
+    """One register write as applied by the stand-in"""
+    time_s: float
+    call: int      # Index of the network call that carried it
+    reg: int
+    value: int
+
+
+class PerRegisterStandIn:
+    """
+    In-process CloudCompile stand-in with round-trip latency.
+
+    Half the latency is spent before a call reaches the server thread and
+    half after it is applied, so concurrent clients overlap like they do
+    against a real instrument, while the register file changes in a single
+    arrival order.
+
+    This class emulates an API without bulk writes (no set_controls);
+    StandInCloudCompile adds them.
+
+    Args:
+        latency_s: Round-trip time of one call
+    """
+
+    def __init__(self, latency_s: float = 0.002):
+        self.latency_s = latency_s
+        self.controls: Dict[int, int] = {i: 0 for i in range(NUM_CONTROLS)}
+        self.log: List[AppliedWrite] = []
+        self.calls = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._lock = threading.Lock()
+        self._requests: "queue.Queue[Optional[Tuple[str, tuple, Future]]]" = queue.Queue()
+        self._server = threading.Thread(target=self._serve, name="moku-standin", daemon=True)
+        self._server.start()
+
+    # ------------------------------------------------------------------
+    # CloudCompile API
+    # ------------------------------------------------------------------
+
+    def set_control(self, idx: int, value: int, strict: bool = True):
+        return self._request("set", ([(idx, value)],))
+
+    def get_control(self, idx: int, strict: bool = True) -> dict:
+        return self._request("get", (idx,))
+
+    def get_controls(self) -> list:
+        return self._request("get_all", ())
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def history(self, reg: int) -> List[int]:
+        """Values written to reg, in applied order"""
+        return [w.value for w in self.log if w.reg == reg]
+
+    def close(self):
+        self._requests.put(None)
+        self._server.join()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _request(self, op: str, args: tuple):
+        with self._lock:
+            self._concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self._concurrent)
+        try:
+            time.sleep(self.latency_s / 2)       # Request on the wire
+            done: Future = Future()
+            self._requests.put((op, args, done))
+            result = done.result()
+            time.sleep(self.latency_s / 2)       # Response on the wire
+            return result
+        finally:
+            with self._lock:
+                self._concurrent -= 1
+
+    def _serve(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            op, args, done = request
+            call = self.calls
+            self.calls += 1
+            if op == "set":
+                now = time.perf_counter()
+                for reg, value in args[0]:
+                    if not 0 <= reg < NUM_CONTROLS:
+                        done.set_exception(ValueError(f"Control{reg} does not exist"))
+                        break
+                    self.controls[reg] = value & 0xFFFFFFFF
+                    self.log.append(AppliedWrite(now, call, reg, value & 0xFFFFFFFF))
+                else:
+                    done.set_result(None)
+            elif op == "get":
+                done.set_result({"id": args[0], "value": self.controls[args[0]]})
+            else:
+                done.set_result([{"id": i, "value": v} for i, v in self.controls.items()])
+
+
+class StandInCloudCompile(PerRegisterStandIn):
+    """CloudCompile stand-in with bulk set_controls writes"""
+
+    def set_controls(self, controls, strict: bool = True):
+        return self._request("set", ([(c["id"], c["value"]) for c in controls],))
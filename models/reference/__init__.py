@@ -0,0 +1,49 @@
+"""
+Reference (golden) models of the RTL for fast checks outside GHDL.
+
+Main Classes:
+    ObserverTable: fsm_observer output codes for one set of generics
+    ObserverConfig: fsm_observer generics of a design (DS1140_OBSERVER, ...)
+    DS1140Model: Cycle model of DS1140_PD_volo_main (one instance)
+    DS1140BatchModel: Same model stepped for N instances with NumPy
+
+Quick Start:
+    >>> from models.reference import DS1140_OBSERVER
+    >>> table = DS1140_OBSERVER.table()
+    >>> table.code(1)    # ARMED
+    2731
+"""
+
+from .ds1140_pd import (
+    DS1140BatchModel,
+    DS1140Inputs,
+    DS1140Model,
+    DS1140Outputs,
+    DS1140State,
+)
+from .fsm_observer import (
+    BRAM_LOADER_OBSERVER,
+    DS1120_OBSERVER,
+    DS1140_OBSERVER,
+    ObserverConfig,
+    ObserverTable,
+    digital_to_voltage,
+    observer_table,
+    voltage_to_digital,
+)
+
+__all__ = [
+    'ObserverConfig',
+    'ObserverTable',
+    'observer_table',
+    'voltage_to_digital',
+    'digital_to_voltage',
+    'DS1140_OBSERVER',
+    'DS1120_OBSERVER',
+    'BRAM_LOADER_OBSERVER',
+    'DS1140Model',
+    'DS1140BatchModel',
+    'DS1140Inputs',
+    'DS1140Outputs',
+    'DS1140State',
+]
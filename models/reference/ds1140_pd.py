@@ -0,0 +1,335 @@
+"""
+Cycle-accurate Python reference model of DS1140_PD_volo_main.vhd.
+
+Models everything between the ports and OutputA/B/C at clock-edge
+granularity:
+
+    volo_clk_divider                 (clock_divider(3:0), MAX_DIV=16)
+    volo_voltage_threshold_trigger_core  (rising mode, 0x100 hysteresis)
+    ds1120_pd_fsm                    (READY/ARMED/FIRING/COOLING/DONE/TIMEDOUT/HARDFAULT,
+                                      arm timeout, firing/cooling counters,
+                                      sticky flags, fire/spurious counters)
+    output process                   (intensity clamp to MAX_INTENSITY_3V0)
+    fsm_observer                     (via models.reference.fsm_observer)
+
+The next-state function is written once against a `where(cond, a, b)`
+primitive, so the same code steps one instance with Python ints
+(DS1140Model, used for lockstep checks against the RTL) or thousands of
+independent instances at once with NumPy arrays (DS1140BatchModel, used
+to explore parameter spaces at millions of instance-cycles per second).
+
+Usage:
+    from models.reference.ds1140_pd import DS1140Inputs, DS1140Model
+
+    model = DS1140Model()
+    model.step(DS1140Inputs(reset=1))
+    out = model.step(DS1140Inputs(arm_probe=1, arm_timeout=100))
+    out.state, out.output_c
+
+    # 4096 parameter combinations, 2000 cycles each
+    batch = DS1140BatchModel(4096)
+    batch.run(2000, DS1140Inputs(force_fire=1, firing_duration=fd, clock_divider=div))
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass, fields, replace
+from enum import IntEnum
+from typing import Any, Iterable, List
+
+from .fsm_observer import DS1140_OBSERVER, NO_NORMAL_STATE
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class DS1140State(IntEnum):
+    """ds1120_pd_fsm state encoding (3-bit)"""
+    READY = 0
+    ARMED = 1
+    FIRING = 2
+    COOLING = 3
+    DONE = 4
+    TIMEDOUT = 5
+    HARDFAULT = 7
+
+
+# ds1140_pd_pkg / ds1120_pd_pkg
+MAX_FIRING_CYCLES = 32
+MIN_COOLING_CYCLES = 8
+MAX_ARM_TIMEOUT = 4095
+MAX_INTENSITY_3V0 = 0x4CCD
+MAX_FIRE_COUNT = 15
+MAX_SPURIOUS_COUNT = 15
+TRIGGER_HYSTERESIS = 0x0100
+
+# ds1120_pd_fsm next-state arcs, plus Reset (any state -> READY). No arc
+# enters HARDFAULT, so its exit (HARDFAULT -> READY) cannot be taken and is
+# not part of the coverage target.
+FSM_TRANSITIONS = frozenset({
+    (DS1140State.READY, DS1140State.ARMED),
+    (DS1140State.ARMED, DS1140State.FIRING),
+    (DS1140State.ARMED, DS1140State.TIMEDOUT),
+    (DS1140State.FIRING, DS1140State.COOLING),
+    (DS1140State.COOLING, DS1140State.DONE),
+    (DS1140State.DONE, DS1140State.READY),
+    (DS1140State.TIMEDOUT, DS1140State.READY),
+} | {(state, DS1140State.READY) for state in DS1140State
+     if state not in (DS1140State.READY, DS1140State.HARDFAULT)})
+
+OBSERVER = DS1140_OBSERVER.table()
+FAULT_STATE_THRESHOLD = DS1140_OBSERVER.fault_state_threshold
+
+
+@dataclass
+class DS1140Inputs:
+    """
+    Port values the RTL samples on one rising clock edge.
+
+    Fields may be Python ints or (for DS1140BatchModel) NumPy arrays with one
+    entry per instance. Voltages accept signed or 16-bit unsigned encodings.
+    """
+    reset: Any = 0
+    enable: Any = 1
+    arm_probe: Any = 0
+    force_fire: Any = 0
+    reset_fsm: Any = 0
+    clock_divider: Any = 0
+    arm_timeout: Any = 0
+    firing_duration: Any = 16
+    cooling_duration: Any = 16
+    trigger_threshold: Any = 0x3DCF
+    intensity: Any = 0x2666
+    input_a: Any = 0
+
+
+@dataclass
+class DS1140Registers:
+    """All flip-flops of DS1140_PD_volo_main (reset values as defaults)"""
+    div_counter: Any = 0
+    div_clk_en: Any = 0
+    trig_state: Any = 0
+    trig_prev: Any = 0
+    trig_out: Any = 0
+    crossing_count: Any = 0
+    state: Any = 0
+    arm_cnt: Any = 0
+    fire_cnt: Any = 0
+    cool_cnt: Any = 0
+    triggered: Any = 0
+    timed_out: Any = 0
+    fire_count: Any = 0
+    spurious_count: Any = 0
+    intensity_clamped: Any = 0
+    out_a: Any = 0
+    out_b: Any = 0
+    obs_row: Any = NO_NORMAL_STATE  # Observer prev_voltage, as the last normal state
+
+
+@dataclass
+class DS1140Outputs:
+    """Observable values after a clock edge (voltages as signed 16-bit)"""
+    output_a: Any
+    output_b: Any
+    output_c: Any
+    state: Any
+    fire_count: Any
+    spurious_count: Any
+    was_triggered: Any
+    timed_out: Any
+
+
+def _s16(x):
+    """Reinterpret as signed(15 downto 0)"""
+    return ((x + 0x8000) & 0xFFFF) - 0x8000
+
+
+def _py_where(cond, a, b):
+    return a if cond else b
+
+
+def _step(r: DS1140Registers, i: DS1140Inputs, where) -> DS1140Registers:
+    """Register values after one rising edge of Clk"""
+    S = DS1140State
+    en = i.enable != 0
+
+    # volo_clk_divider: div_sel = "0000" & clock_divider(3 downto 0)
+    sel = i.clock_divider & 0xF
+    div_value = where(sel == 0, 1, sel)
+    wrap = (sel == 0) | (r.div_counter >= div_value - 1)
+    div_counter = where(en, where(wrap, 0, r.div_counter + 1), r.div_counter)
+    div_clk_en = where(en & wrap, 1, 0)
+
+    # volo_voltage_threshold_trigger_core (mode '0' = rising edge)
+    voltage = _s16(i.input_a)
+    thr_high = _s16(i.trigger_threshold)
+    thr_low = _s16(thr_high - TRIGGER_HYSTERESIS)
+    hyst_state = where(voltage > thr_high, 1, where(voltage < thr_low, 0, r.trig_state))
+    trig_state = where(en, hyst_state, r.trig_state)
+    trig_prev = where(en, r.trig_state, r.trig_prev)
+    crossing_count = where(en & (r.trig_state != r.trig_prev),
+                           (r.crossing_count + 1) & 0xFFFF, r.crossing_count)
+    trig_out = where(en & (r.trig_state == 1) & (r.trig_prev == 0), 1, 0)
+
+    # ds1120_pd_fsm next-state logic (clk_en = divider output register)
+    st = r.state
+    arm = i.arm_probe != 0
+    fire = (i.force_fire != 0) | (r.trig_out != 0)
+    rst_fsm = i.reset_fsm != 0
+    parked = (st == S.DONE) | (st == S.TIMEDOUT) | (st == S.HARDFAULT)
+    nxt = where(st == S.READY, where(arm, S.ARMED, S.READY),
+          where(st == S.ARMED, where(fire, S.FIRING, where(r.arm_cnt == 0, S.TIMEDOUT, S.ARMED)),
+          where(st == S.FIRING, where(r.fire_cnt == 0, S.COOLING, S.FIRING),
+          where(st == S.COOLING, where(r.cool_cnt == 0, S.DONE, S.COOLING),
+          where(parked, where(rst_fsm, S.READY, st), S.READY)))))
+
+    go = en & (r.div_clk_en != 0)
+    to_armed = (st == S.READY) & (nxt == S.ARMED)
+    to_firing = (st == S.ARMED) & (nxt == S.FIRING)
+    to_cooling = (st == S.FIRING) & (nxt == S.COOLING)
+    to_timedout = (st == S.ARMED) & (nxt == S.TIMEDOUT)
+
+    state = where(go, nxt, st)
+
+    firing_duration = i.firing_duration & 0xFF
+    cooling_duration = i.cooling_duration & 0xFF
+    arm_cnt = where(go, where(to_armed, i.arm_timeout & 0xFFF,
+                              where((st == S.ARMED) & (r.arm_cnt > 0), r.arm_cnt - 1, r.arm_cnt)),
+                    r.arm_cnt)
+    fire_cnt = where(go, where(to_firing,
+                               where(firing_duration > MAX_FIRING_CYCLES, MAX_FIRING_CYCLES, firing_duration),
+                               where((st == S.FIRING) & (r.fire_cnt > 0), r.fire_cnt - 1, r.fire_cnt)),
+                     r.fire_cnt)
+    cool_cnt = where(go, where(to_cooling,
+                               where(cooling_duration < MIN_COOLING_CYCLES, MIN_COOLING_CYCLES, cooling_duration),
+                               where((st == S.COOLING) & (r.cool_cnt > 0), r.cool_cnt - 1, r.cool_cnt)),
+                     r.cool_cnt)
+
+    clear_flags = go & rst_fsm & (st == S.READY)
+    triggered = where(clear_flags, 0, where(go & to_firing, 1, r.triggered))
+    timed_out = where(clear_flags, 0, where(go & to_timedout, 1, r.timed_out))
+    fire_count = where(go & to_cooling & (r.fire_count < MAX_FIRE_COUNT), r.fire_count + 1, r.fire_count)
+    spurious_count = where(go & (r.trig_out != 0) & (st != S.ARMED) & (r.spurious_count < MAX_SPURIOUS_COUNT),
+                           r.spurious_count + 1, r.spurious_count)
+
+    # Output process (firing_active = current state_reg, old intensity_clamped)
+    firing = en & (st == S.FIRING)
+    intensity = _s16(i.intensity)
+    clamped = where(intensity > MAX_INTENSITY_3V0, MAX_INTENSITY_3V0,
+                    where(intensity < -MAX_INTENSITY_3V0, -MAX_INTENSITY_3V0, intensity))
+    intensity_clamped = where(en, clamped, r.intensity_clamped)
+    out_a = where(firing, thr_high, 0)
+    out_b = where(firing, r.intensity_clamped, 0)
+
+    # fsm_observer: latch the last normal state (no enable)
+    obs_row = where(st < FAULT_STATE_THRESHOLD, st, r.obs_row)
+
+    new = DS1140Registers(
+        div_counter=div_counter, div_clk_en=div_clk_en,
+        trig_state=trig_state, trig_prev=trig_prev, trig_out=trig_out, crossing_count=crossing_count,
+        state=state, arm_cnt=arm_cnt, fire_cnt=fire_cnt, cool_cnt=cool_cnt,
+        triggered=triggered, timed_out=timed_out, fire_count=fire_count, spurious_count=spurious_count,
+        intensity_clamped=intensity_clamped, out_a=out_a, out_b=out_b, obs_row=obs_row,
+    )
+
+    # Reset is asynchronous in the RTL; at edge granularity it forces reset values
+    reset = i.reset != 0
+    return DS1140Registers(**{
+        f.name: where(reset, f.default, getattr(new, f.name)) for f in fields(DS1140Registers)
+    })
+
+
+class DS1140Model:
+    """
+    Single-instance cycle model (Python ints).
+
+    Call step() once per rising clock edge with the inputs the RTL sampled
+    on that edge; it returns the outputs visible after the edge.
+    """
+
+    def __init__(self):
+        self.regs = DS1140Registers()
+        self.cycles = 0
+
+    def reset(self):
+        self.regs = DS1140Registers()
+
+    def step(self, inputs: DS1140Inputs) -> DS1140Outputs:
+        self.regs = _step(self.regs, inputs, _py_where)
+        self.cycles += 1
+        return self.outputs()
+
+    def outputs(self) -> DS1140Outputs:
+        r = self.regs
+        return DS1140Outputs(
+            output_a=int(r.out_a),
+            output_b=int(r.out_b),
+            output_c=int(OBSERVER.codes[r.obs_row][r.state]),
+            state=int(r.state),
+            fire_count=int(r.fire_count),
+            spurious_count=int(r.spurious_count),
+            was_triggered=int(r.triggered),
+            timed_out=int(r.timed_out),
+        )
+
+    def run(self, inputs: DS1140Inputs, cycles: int) -> DS1140Outputs:
+        """Hold `inputs` for `cycles` edges; returns the final outputs"""
+        for _ in range(cycles):
+            self.regs = _step(self.regs, inputs, _py_where)
+        self.cycles += cycles
+        return self.outputs()
+
+    def trace(self, inputs: Iterable[DS1140Inputs]) -> List[DS1140Outputs]:
+        """Outputs after each edge of a per-cycle input sequence"""
+        return [self.step(i) for i in inputs]
+
+
+class DS1140BatchModel:
+    """
+    N independent instances stepped together with NumPy.
+
+    Input fields may be scalars (shared by all instances) or length-N arrays
+    (one parameter per instance), so a parameter grid is one run() call.
+    """
+
+    def __init__(self, n: int):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for DS1140BatchModel - use DS1140Model")
+        self.n = n
+        self.regs = DS1140Registers(**{
+            f.name: np.full(n, f.default, dtype=np.int64) for f in fields(DS1140Registers)
+        })
+        self.cycles = 0
+
+    def step(self, inputs: DS1140Inputs) -> DS1140Outputs:
+        self.regs = _step(self.regs, self.as_arrays(inputs), np.where)
+        self.cycles += 1
+        return self.outputs()
+
+    def run(self, cycles: int, inputs: DS1140Inputs) -> DS1140Outputs:
+        """Hold `inputs` for `cycles` edges; returns the final outputs"""
+        arrays = self.as_arrays(inputs)
+        for _ in range(cycles):
+            self.regs = _step(self.regs, arrays, np.where)
+        self.cycles += cycles
+        return self.outputs()
+
+    def outputs(self) -> DS1140Outputs:
+        r = self.regs
+        return DS1140Outputs(
+            output_a=r.out_a, output_b=r.out_b,
+            output_c=OBSERVER.codes[r.obs_row, r.state].astype(np.int64),
+            state=r.state, fire_count=r.fire_count, spurious_count=r.spurious_count,
+            was_triggered=r.triggered, timed_out=r.timed_out,
+        )
+
+    def as_arrays(self, inputs: DS1140Inputs) -> DS1140Inputs:
+        """Inputs with every field broadcast to a length-N int64 array"""
+        return replace(inputs, **{
+            f.name: np.broadcast_to(np.asarray(getattr(inputs, f.name), dtype=np.int64), (self.n,))
+            for f in fields(DS1140Inputs)
+        })
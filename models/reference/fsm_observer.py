@@ -0,0 +1,275 @@
+"""
+Python reference model of VHDL/fsm_observer.vhd.
+
+The observer maps a 6-bit FSM state to a 16-bit DAC code: normal states
+(below FAULT_STATE_THRESHOLD) form a linear stairstep from V_MIN to V_MAX,
+and fault states output the negated code of the last normal state seen on
+a clock edge (0 after reset). This module reproduces that mapping
+bit-exactly, including volo_voltage_pkg.voltage_to_digital() rounding, so
+tests and hardware decoders use the same numbers as the RTL instead of
+re-deriving them with ad-hoc float math.
+
+One ObserverTable is built (and cached) per generics tuple. It holds the
+64 normal-state codes and a 65 x 64 lookup `codes[fault_from][state]`,
+where row 64 stands for "no normal state since reset". With numpy
+installed the table is an int16 ndarray and whole state traces can be
+converted at once with expected_codes().
+
+Usage:
+    from models.reference import DS1140_OBSERVER, observer_table
+
+    table = observer_table(*DS1140_OBSERVER.generics)
+    table.code(2)                          # FIRING
+    table.code(7, fault_from=3)            # HARDFAULT after COOLING
+    table.expected_codes([0, 1, 2, 7])     # per-cycle trace
+    table.decode_voltage(-1.25)            # ("HARDFAULT", 7, True, 3)
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+import math
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+# volo_voltage_pkg constants
+VOLTAGE_MIN = -5.0
+VOLTAGE_MAX = 5.0
+DIGITAL_SCALE_FACTOR = 32767.0 / 5.0
+DIGITAL_MIN = -32768
+DIGITAL_MAX = 32767
+
+STATE_BITS = 6
+NUM_STATE_CODES = 1 << STATE_BITS   # 64-entry LUT in the RTL
+NO_NORMAL_STATE = NUM_STATE_CODES   # fault_from row used after reset
+
+
+def _vhdl_integer(x: float) -> int:
+    """VHDL real-to-integer conversion: round to nearest, halfway away from zero"""
+    return int(math.floor(x + 0.5)) if x >= 0 else int(math.ceil(x - 0.5))
+
+
+def voltage_to_digital(voltage: float) -> int:
+    """
+    Bit-exact volo_voltage_pkg.voltage_to_digital().
+
+    The package adds +/-0.5 before integer(), which itself rounds, so the
+    result is not simply round(v * 32767 / 5) (e.g. 0.0V -> 1).
+    """
+    voltage = min(max(voltage, VOLTAGE_MIN), VOLTAGE_MAX)
+    digital_real = voltage * DIGITAL_SCALE_FACTOR
+    if digital_real >= 0.0:
+        digital = _vhdl_integer(digital_real + 0.5)
+    else:
+        digital = _vhdl_integer(digital_real - 0.5)
+    return min(max(digital, DIGITAL_MIN), DIGITAL_MAX)
+
+
+def digital_to_voltage(digital: int) -> float:
+    """Inverse scaling used by volo_voltage_pkg.digital_to_voltage()"""
+    return digital / DIGITAL_SCALE_FACTOR
+
+
+def _negate16(code: int) -> int:
+    """signed(15 downto 0) negation (-(-32768) wraps to -32768)"""
+    return ((-code + 0x8000) & 0xFFFF) - 0x8000
+
+
+@dataclass(frozen=True)
+class ObserverConfig:
+    """fsm_observer generics as instantiated by one design"""
+    num_states: int = 8
+    v_min: float = 0.0
+    v_max: float = 2.5
+    fault_state_threshold: int = 8
+    state_names: Tuple[str, ...] = field(default=(), compare=False)
+
+    @property
+    def generics(self) -> Tuple[int, float, float, int]:
+        """(NUM_STATES, V_MIN, V_MAX, FAULT_STATE_THRESHOLD) - the observer_table() key"""
+        return (self.num_states, self.v_min, self.v_max, self.fault_state_threshold)
+
+    def table(self) -> "ObserverTable":
+        table = observer_table(*self.generics)
+        if self.state_names:
+            table = table.with_names(self.state_names)
+        return table
+
+
+# Instances in this repository (generic maps of the *_main.vhd files)
+DS1140_OBSERVER = ObserverConfig(
+    num_states=8, v_min=0.0, v_max=2.5, fault_state_threshold=7,
+    state_names=("READY", "ARMED", "FIRING", "COOLING", "DONE", "TIMEDOUT", "RESERVED", "HARDFAULT"),
+)
+DS1120_OBSERVER = ObserverConfig(
+    num_states=8, v_min=0.0, v_max=2.5, fault_state_threshold=7,
+    state_names=("READY", "ARMED", "FIRING", "COOLING", "DONE", "TIMEDOUT", "RESERVED", "HARDFAULT"),
+)
+BRAM_LOADER_OBSERVER = ObserverConfig(
+    num_states=4, v_min=0.0, v_max=2.0, fault_state_threshold=3,
+    state_names=("IDLE", "LOADING", "DONE", "CRC_ERR"),
+)
+
+
+class ObserverTable:
+    """
+    Precomputed fsm_observer output codes for one generics tuple.
+
+    Build with observer_table() (cached) rather than directly.
+    """
+
+    def __init__(self, num_states: int, v_min: float, v_max: float,
+                 fault_state_threshold: int, state_names: Sequence[str] = ()):
+        self.num_states = num_states
+        self.v_min = v_min
+        self.v_max = v_max
+        self.fault_state_threshold = fault_state_threshold
+        self.state_names = tuple(state_names)
+        self.has_faults = fault_state_threshold < num_states
+        self.num_normal = fault_state_threshold if self.has_faults else num_states
+
+        # calculate_voltage_lut
+        v_step = (v_max - v_min) / (self.num_normal - 1) if self.num_normal > 1 else 0.0
+        normal = [0] * NUM_STATE_CODES
+        for i in range(min(self.num_normal, NUM_STATE_CODES)):
+            normal[i] = voltage_to_digital(v_min + i * v_step)
+        self.normal_codes = tuple(normal)
+
+        # codes[fault_from][state]: int16 ndarray, or rows of array("h")
+        self.codes: Any
+        rows = []
+        for fault_from in range(NUM_STATE_CODES + 1):
+            prev = 0 if fault_from == NO_NORMAL_STATE else normal[fault_from]
+            rows.append([
+                _negate16(prev) if self.is_fault(state) else normal[state]
+                for state in range(NUM_STATE_CODES)
+            ])
+        if NUMPY_AVAILABLE:
+            self.codes = np.array(rows, dtype=np.int16)
+            self.codes.setflags(write=False)
+        else:
+            self.codes = tuple(array("h", row) for row in rows)
+
+    def with_names(self, state_names: Sequence[str]) -> "ObserverTable":
+        """Same table with state names attached (shares the code arrays)"""
+        named = object.__new__(ObserverTable)
+        named.__dict__.update(self.__dict__)
+        named.state_names = tuple(state_names)
+        return named
+
+    def is_fault(self, state: int) -> bool:
+        return self.has_faults and state >= self.fault_state_threshold
+
+    def state_name(self, state: int) -> str:
+        return self.state_names[state] if state < len(self.state_names) else f"STATE_{state}"
+
+    def code(self, state: int, fault_from: Optional[int] = None) -> int:
+        """
+        Output code for `state`.
+
+        Args:
+            state: 6-bit state index
+            fault_from: Last normal state before a fault (None = since reset)
+        """
+        row = NO_NORMAL_STATE if fault_from is None else fault_from
+        return int(self.codes[row][state])
+
+    def voltage(self, state: int, fault_from: Optional[int] = None) -> float:
+        return digital_to_voltage(self.code(state, fault_from))
+
+    def expected_codes(self, states: Sequence[int], fault_from: Optional[int] = None):
+        """
+        Observer output for a per-cycle state trace.
+
+        The RTL latches the code of each normal state on the clock edge, so
+        a fault at cycle t shows the last normal state before t.
+
+        Args:
+            states: State index sampled each cycle
+            fault_from: Last normal state before the trace starts (None = reset)
+
+        Returns:
+            numpy int16 array (or array("h") without numpy), one code per cycle
+        """
+        initial = NO_NORMAL_STATE if fault_from is None else fault_from
+        if NUMPY_AVAILABLE:
+            trace = np.asarray(states, dtype=np.intp)
+            normal = trace < self.fault_state_threshold if self.has_faults \
+                else np.ones(len(trace), dtype=bool)
+            # Index of the last normal cycle strictly before each cycle
+            idx = np.where(normal, np.arange(len(trace)), -1)
+            last = np.maximum.accumulate(idx)
+            last = np.concatenate(([-1], last[:-1])) if len(trace) else last
+            rows = np.where(last >= 0, trace[np.maximum(last, 0)], initial)
+            return self.codes[rows, trace]
+
+        out = array("h")
+        row = initial
+        for state in states:
+            out.append(self.codes[row][state])
+            if not self.is_fault(state):
+                row = state
+        return out
+
+    def decode(self, code: int, tolerance: int = 0) -> Tuple[str, int, bool, Optional[int]]:
+        """
+        Map an observed code back to (state name, state, is_fault, fault_from).
+
+        Negative codes decode as the first fault state, with fault_from the
+        normal state whose code they negate. Raises ValueError if nothing is
+        within `tolerance` counts.
+        """
+        if self.has_faults and code < 0 <= self.v_min:
+            fault_state = self.fault_state_threshold
+            fault_from = self._nearest_normal(-code, tolerance)
+            return self.state_name(fault_state), fault_state, True, fault_from
+        state = self._nearest_normal(code, tolerance)
+        return self.state_name(state), state, False, None
+
+    def decode_voltage(self, voltage: float, tolerance_v: float = 0.15) -> Tuple[str, int, bool, Optional[int]]:
+        """decode() for a measured voltage (e.g. oscilloscope reading of the debug output)"""
+        return self.decode(int(round(voltage * DIGITAL_SCALE_FACTOR)),
+                           tolerance=int(tolerance_v * DIGITAL_SCALE_FACTOR))
+
+    def _nearest_normal(self, code: int, tolerance: int) -> int:
+        best = min(range(self.num_normal), key=lambda i: abs(self.normal_codes[i] - code))
+        if abs(self.normal_codes[best] - code) > tolerance:
+            raise ValueError(f"Code {code} is not an observer output "
+                             f"(nearest: state {best} = {self.normal_codes[best]})")
+        return best
+
+    def summary(self) -> List[str]:
+        """One line per state: index, name, code and voltage"""
+        lines = []
+        for state in range(self.num_states):
+            if self.is_fault(state):
+                lines.append(f"  {state:2d} {self.state_name(state):12s} -(last normal state)")
+            else:
+                code = self.normal_codes[state]
+                lines.append(f"  {state:2d} {self.state_name(state):12s} {code:6d} "
+                             f"(0x{code & 0xFFFF:04X}) {digital_to_voltage(code):+.3f}V")
+        return lines
+
+
+@lru_cache(maxsize=None)
+def observer_table(num_states: int = 8, v_min: float = 0.0, v_max: float = 2.5,
+                   fault_state_threshold: int = 8) -> ObserverTable:
+    """
+    Cached ObserverTable for one set of fsm_observer generics.
+
+    Args:
+        num_states: NUM_STATES
+        v_min: V_MIN (volts)
+        v_max: V_MAX (volts)
+        fault_state_threshold: FAULT_STATE_THRESHOLD (>= num_states disables faults)
+    """
+    return ObserverTable(num_states, v_min, v_max, fault_state_threshold)
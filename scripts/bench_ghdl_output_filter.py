@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GHDLOutputFilter.
+
+Generates a synthetic GHDL log (metavalue/null warning floods with
+distinct timestamps, init-time assertions, GHDL info lines, cocotb log
+lines and test results) and reports lines/second for each FilterLevel.
+
+Usage:
+    python scripts/bench_ghdl_output_filter.py                # 1M lines, all levels
+    python scripts/bench_ghdl_output_filter.py --lines 200000
+    python scripts/bench_ghdl_output_filter.py --level normal
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ghdl_output_filter import FilterLevel, GHDLOutputFilter
+
+# (weight, template) - weights roughly follow a long DS1140 simulation log
+LINE_TEMPLATES = [
+    (40, "../../src/ieee2008/numeric_std-body.vhdl:{line}:7:@{t}ns:(assertion warning): "
+         "NUMERIC_STD.TO_INTEGER: metavalue detected, returning 0"),
+    (15, "../../src/ieee2008/numeric_std-body.vhdl:{line}:7:@{t}ns:(assertion warning): "
+         "NUMERIC_STD.\"=\": metavalue detected, returning FALSE"),
+    (5, "../../src/ieee2008/numeric_std-body.vhdl:{line}:7:@{t}ns:(assertion warning): "
+        "NUMERIC_STD.\"<\": null argument detected, returning FALSE"),
+    (2, "../../src/ieee2008/numeric_std-body.vhdl:{line}:7:@0ms:(assertion warning): "
+        "NUMERIC_STD.TO_INTEGER: metavalue detected, returning 0"),
+    (25, "{t}.00ns INFO     cocotb.DS1140_PD_volo_shim  Cycle {n}: state=ARMED output=0x{n:04x}"),
+    (8, "{t}.00ns DEBUG    cocotb.regression  Waiting {n} clock cycles"),
+    (1, "ghdl:info: simulation stopped by --stop-time @{t}ns"),
+    (1, "../../VHDL/fsm_observer.vhd:{line}:13:@{t}ns:(report note): voltage step {n}"),
+    (1, "{t}.00ns INFO     cocotb.regression  Test {n}: PASS"),
+    (1, "{t}.00ns ERROR    cocotb.regression  Test {n}: FAIL expected 0x{n:04x}"),
+    (1, "================================================================"),
+]
+
+
+def generate_log(num_lines: int, seed: int = 1) -> List[str]:
+    """Build a reproducible synthetic GHDL log of `num_lines` lines"""
+    rng = random.Random(seed)
+    weights = [w for w, _ in LINE_TEMPLATES]
+    templates = [t for _, t in LINE_TEMPLATES]
+    lines = []
+    t = 0
+    for i, template in enumerate(rng.choices(templates, weights=weights, k=num_lines)):
+        t += rng.randint(1, 40)
+        lines.append(template.format(line=rng.randint(2000, 4000), t=t, n=i % 4096))
+    return lines
+
+
+def bench_level(level: FilterLevel, lines: List[str]) -> float:
+    """Filter `lines` once at `level` and return lines/second"""
+    output_filter = GHDLOutputFilter(level=level)
+    start = time.perf_counter()
+    output_filter.filter_lines(lines)
+    elapsed = time.perf_counter() - start
+
+    stats = output_filter.stats
+    rate = len(lines) / elapsed if elapsed > 0 else float("inf")
+    print(f"  {level.value:<11s} {rate:>12,.0f} lines/s  {elapsed:6.2f}s  "
+          f"kept {stats.total_lines - stats.filtered_lines:>8,d}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GHDLOutputFilter throughput")
+    parser.add_argument("--lines", type=int, default=1_000_000,
+                        help="Synthetic log size (default: 1,000,000)")
+    parser.add_argument("--level", choices=[lvl.value for lvl in FilterLevel],
+                        action="append", help="Level(s) to run (default: all)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the log")
+    args = parser.parse_args()
+
+    levels = [FilterLevel(v) for v in args.level] if args.level else list(FilterLevel)
+
+    print(f"Generating {args.lines:,d}-line synthetic GHDL log...")
+    lines = generate_log(args.lines, seed=args.seed)
+
+    print("GHDLOutputFilter throughput:")
+    for level in levels:
+        bench_level(level, lines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
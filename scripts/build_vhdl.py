@@ -1,35 +1,57 @@
 #!/usr/bin/env python3
 """
-VHDL Dependency Graph Builder using GHDL native dependency resolution.
+VHDL Dependency Graph Builder.
 
-No manual dependency tracking needed! GHDL automatically determines
-compilation order by analyzing VHDL 'use' statements.
+Extracts the entity/package/use dependency graph from the sources themselves
+(scripts/vhdl_deps.py), analyzes every file in dependency order, and
+elaborates top-level entities in parallel.
 
 Usage:
-    python scripts/build_vhdl_deps.py              # Import all sources (build dependency graph)
-    python scripts/build_vhdl_deps.py --clean      # Clean build artifacts
-    python scripts/build_vhdl_deps.py --entity foo # Build specific entity (elaborate)
-    python scripts/build_vhdl_deps.py --help       # Show help
+    python scripts/build_vhdl.py                  # Analyze all sources (dependency order)
+    python scripts/build_vhdl.py --clean          # Clean build artifacts
+    python scripts/build_vhdl.py --entity foo     # Analyze, then elaborate entity foo
+    python scripts/build_vhdl.py --tops -j 8      # Elaborate every top-level entity, 8 at a time
+    python scripts/build_vhdl.py --help           # Show help
 
-Note: Default mode (no args) only imports sources to build dependency graph.
-      It does NOT compile/elaborate entities. Use --entity to actually build.
+Note: Default mode (no args) analyzes sources but does NOT elaborate
+      entities. Use --entity or --tops to actually build.
 
 Features:
     - Auto-discovers all VHDL files in instruments/, experimental/, and modules/
-    - GHDL resolves dependencies automatically
+      (pruned walk, roots/excludes configurable under [tool.build_vhdl])
+    - Dependency graph extracted from the sources (no manual tracking)
+    - Independent top-level entities elaborate concurrently (--jobs)
+    - Critical-path timing report at the end of every build
+    - Build manifest in the work dir: unchanged trees are a no-op, a changed
+      file re-analyzes only itself and its dependents (--rebuild to force)
     - Works from any directory (finds project root)
     - Skips testbenches and test wrappers
     - Comprehensive error reporting
 
+Analysis itself stays one GHDL process at a time: every `ghdl -a` rewrites
+the work library index (work-obj08.cf), so concurrent analyses into one
+library lose each other's units. The timing report shows the critical path,
+i.e. the best a fully parallel analysis could achieve.
+
 Author: Claude Code (GHDL Build Modernization)
 Date: 2025-01-25
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
 from pathlib import Path
 import subprocess
 import sys
 import shutil
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vhdl_deps import DependencyGraph, VhdlFile, scan_file
+from vhdl_discovery import DiscoveryConfig, discover_sources
 
 
 # ANSI color codes for output
@@ -60,6 +82,12 @@ MODULES_DIR = PROJECT_ROOT / "modules"
 INSTRUMENTS_DIR = PROJECT_ROOT / "instruments"
 EXPERIMENTAL_DIR = PROJECT_ROOT / "experimental"
 WORK_DIR = MODULES_DIR / "work"
+MANIFEST_PATH = WORK_DIR / "build_manifest.json"
+MANIFEST_VERSION = 1
+DISCOVERY_CACHE_PATH = WORK_DIR / "discovery_cache.json"
+
+# Flags for every GHDL analysis/elaboration (part of the manifest key)
+GHDL_ARGS = ["--std=08"]
 
 
 def print_status(icon: str, message: str, color: str = Colors.NC):
@@ -71,7 +99,7 @@ def find_vhdl_files() -> List[Path]:
     """
     Find all VHDL source files across the project.
 
-    Searches in:
+    Searches in (default, override with [tool.build_vhdl] include):
     - instruments/ (top-level instruments with MCC integration)
     - experimental/ (experimental instruments)
     - modules/shared/ (utility modules: core/, packages/, observer/)
@@ -79,52 +107,49 @@ def find_vhdl_files() -> List[Path]:
     - modules/examples/ (educational examples)
     - modules/untested/ (modules without CocotB tests)
 
-    Skips:
-    - Testbench files (containing 'tb' in path)
+    Skips (default, override with [tool.build_vhdl] exclude):
+    - Testbench directories (tb/)
     - Test wrapper files (containing 'wrapper' in name)
-    - Files in cloudcompile_package/ directories
-    - Files in incoming/ directories
+    - cloudcompile_package/ directories
+    - incoming/ directories
+
+    Excluded directories are never descended into, and the result is cached
+    in the work directory until a directory under the search roots changes.
 
     Returns:
         List of Path objects for VHDL source files
     """
-    vhdl_files = []
-
-    # Search locations: (directory, base_path)
-    search_locations = [
-        (INSTRUMENTS_DIR, PROJECT_ROOT),
-        (EXPERIMENTAL_DIR, PROJECT_ROOT),
-        (MODULES_DIR / "shared", MODULES_DIR),
-        (MODULES_DIR / "oddball", MODULES_DIR),
-        (MODULES_DIR / "examples", MODULES_DIR),
-        (MODULES_DIR / "untested", MODULES_DIR),
-    ]
+    config = DiscoveryConfig.from_pyproject(PROJECT_ROOT)
+    return discover_sources(PROJECT_ROOT, config, cache_path=DISCOVERY_CACHE_PATH)
 
-    for location, _ in search_locations:
-        if not location.exists():
-            continue
-
-        # Find all .vhd files recursively
-        for vhd_file in location.rglob("*.vhd"):
-            # Skip testbenches
-            if "/tb/" in str(vhd_file) or "\\tb\\" in str(vhd_file):
-                continue
 
-            # Skip test wrappers
-            if "wrapper" in vhd_file.name.lower():
-                continue
+def run_ghdl_capture(args: List[str]) -> Tuple[bool, str, float]:
+    """
+    Run a GHDL command without printing anything.
 
-            # Skip cloudcompile packages
-            if "cloudcompile_package" in str(vhd_file):
-                continue
+    Safe to call from worker threads; the caller decides how to print.
 
-            # Skip incoming directories
-            if "incoming" in str(vhd_file):
-                continue
+    Args:
+        args: Command arguments (including 'ghdl')
 
-            vhdl_files.append(vhd_file)
+    Returns:
+        (success, combined stdout/stderr, elapsed seconds)
+    """
+    start = time.monotonic()
+    try:
+        result = subprocess.run(
+            args,
+            cwd=MODULES_DIR,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return False, "GHDL not found! Install with your package manager.\n" \
+                      "   brew install ghdl  # macOS\n" \
+                      "   apt install ghdl   # Ubuntu/Debian\n", 0.0
 
-    return sorted(vhdl_files)  # Sort for consistent ordering
+    output = (result.stdout or "") + (result.stderr or "")
+    return result.returncode == 0, output, time.monotonic() - start
 
 
 def run_ghdl_command(args: List[str], description: str) -> bool:
@@ -138,113 +163,442 @@ def run_ghdl_command(args: List[str], description: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        result = subprocess.run(
-            args,
-            cwd=MODULES_DIR,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+    success, output, _ = run_ghdl_capture(args)
 
-        # Print any output (GHDL sometimes has warnings)
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
+    if not success:
+        print_status("❌", f"{description} failed!", Colors.RED)
+    # Print any output (GHDL sometimes has warnings)
+    if output:
+        print(output)
 
-        return True
+    return success
 
-    except subprocess.CalledProcessError as e:
-        print_status("❌", f"{description} failed!", Colors.RED)
-        if e.stdout:
-            print(e.stdout)
-        if e.stderr:
-            print(e.stderr)
-        return False
-    except FileNotFoundError:
-        print_status("❌", "GHDL not found! Install with your package manager.", Colors.RED)
-        print("   brew install ghdl  # macOS")
-        print("   apt install ghdl   # Ubuntu/Debian")
-        return False
 
+@dataclass
+class BuildTimings:
+    """Per-step wall-clock times for the critical-path report"""
+    analysis: Dict[Path, float] = field(default_factory=dict)
+    elaboration: Dict[str, float] = field(default_factory=dict)
+    analysis_wall: float = 0.0
+    elaboration_wall: float = 0.0
 
-def import_all_sources() -> bool:
+
+def analyze_file(vhd_file: Path) -> Tuple[bool, str, float]:
+    """Analyze a single file into the work library"""
+    cmd = [
+        "ghdl",
+        "-a",  # Analyze
+        f"--workdir={WORK_DIR}",
+        *GHDL_ARGS,
+        str(vhd_file),
+    ]
+    return run_ghdl_capture(cmd)
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's contents (hex)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Persistent record of the last build, stored in WORK_DIR.
+
+    For every source: mtime/size (fast path), SHA-256 (authoritative),
+    the units it declares/references and whether it is analyzed in the
+    work library. For every elaborated entity: a fingerprint of the
+    sources it was built from. A no-change run therefore needs only a
+    stat() per file - no hashing, no scanning, no GHDL.
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        data = data or {}
+        self.files: Dict[str, dict] = data.get("files", {})
+        self.elaborated: Dict[str, str] = data.get("elaborated", {})
+
+    @classmethod
+    def load(cls, rebuild: bool = False) -> "BuildManifest":
+        """Load the manifest (empty if missing, stale, or --rebuild)"""
+        if rebuild or not any(WORK_DIR.glob("*.cf")):
+            return cls()
+        try:
+            data = json.loads(MANIFEST_PATH.read_text())
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != MANIFEST_VERSION or data.get("ghdl_args") != GHDL_ARGS:
+            return cls()
+        return cls(data)
+
+    def save(self):
+        """Write the manifest atomically"""
+        WORK_DIR.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "ghdl_args": GHDL_ARGS,
+            "files": self.files,
+            "elaborated": self.elaborated,
+        }
+        tmp_path = MANIFEST_PATH.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True))
+        tmp_path.replace(MANIFEST_PATH)
+
+    def update(self, vhdl_files: List[Path]) -> Tuple[List[VhdlFile], Set[Path], bool]:
+        """
+        Refresh entries for the current file list.
+
+        Args:
+            vhdl_files: Files found by find_vhdl_files()
+
+        Returns:
+            (scan info per file, files whose content changed or were never
+             analyzed, True if files disappeared since the last build)
+        """
+        infos = []
+        changed = set()
+        current = {str(path) for path in vhdl_files}
+        removed = bool(set(self.files) - current)
+
+        for path in vhdl_files:
+            key = str(path)
+            stat = path.stat()
+            entry = self.files.get(key)
+
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                infos.append(self._info_from_entry(path, entry))
+                if not entry["analyzed"]:
+                    changed.add(path)
+                continue
+
+            digest = hash_file(path)
+            if entry and entry["sha256"] == digest:
+                # Touched but identical (git checkout, editor save) - keep analysis
+                entry["mtime_ns"] = stat.st_mtime_ns
+                infos.append(self._info_from_entry(path, entry))
+                if not entry["analyzed"]:
+                    changed.add(path)
+                continue
+
+            info = scan_file(path)
+            self.files[key] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": digest,
+                "provides": sorted(info.provides),
+                "entities": sorted(info.entities),
+                "references": sorted(info.references),
+                "analyzed": False,
+            }
+            infos.append(info)
+            changed.add(path)
+
+        for key in set(self.files) - current:
+            del self.files[key]
+
+        return infos, changed, removed
+
+    @staticmethod
+    def _info_from_entry(path: Path, entry: dict) -> VhdlFile:
+        return VhdlFile(
+            path=path,
+            provides=set(entry["provides"]),
+            entities=set(entry["entities"]),
+            references=set(entry["references"]),
+        )
+
+    def mark_analyzed(self, path: Path, analyzed: bool = True):
+        self.files[str(path)]["analyzed"] = analyzed
+
+    def entity_fingerprint(self, graph: DependencyGraph, entity_name: str) -> Optional[str]:
+        """Hash of every source the entity's elaboration depends on"""
+        top_file = graph.file_for_unit(entity_name)
+        if top_file is None:
+            return None
+        digest = hashlib.sha256()
+        for path in sorted(graph.dependencies_of([top_file])):
+            digest.update(f"{path}={self.files[str(path)]['sha256']}\n".encode())
+        return digest.hexdigest()
+
+
+def scan_sources(manifest: BuildManifest) -> Optional[Tuple[DependencyGraph, Set[Path]]]:
     """
-    Import all VHDL sources into GHDL work library.
+    Discover VHDL files and extract their dependency graph.
 
-    GHDL analyzes the files and builds an internal dependency graph.
-    This is much faster than compilation and lets GHDL figure out
-    what depends on what.
+    Unchanged files reuse the scan results stored in the manifest.
+
+    Args:
+        manifest: Build manifest (updated in place)
 
     Returns:
-        True if successful, False otherwise
+        (DependencyGraph, files needing analysis), or None if no sources were found
     """
     print_status("🔍", "Finding VHDL source files...", Colors.BLUE)
     vhdl_files = find_vhdl_files()
 
     if not vhdl_files:
         print_status("❌", "No VHDL files found!", Colors.RED)
-        return False
+        return None
+
+    infos, changed, removed = manifest.update(vhdl_files)
+    graph = DependencyGraph(infos)
+
+    if removed:
+        # Units of deleted files would linger in the library - start over
+        print("   Source files were removed since the last build - re-analyzing everything")
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+        manifest.elaborated.clear()
+        for path in vhdl_files:
+            manifest.mark_analyzed(path, False)
+        stale = set(graph.order)
+    else:
+        stale = graph.dependents_of(changed)
 
-    print(f"   Found {len(vhdl_files)} VHDL source files")
+    print(f"   Found {len(vhdl_files)} VHDL source files ({len(stale)} need analysis)")
 
-    # Show first few files for confirmation
-    print("   First few files:")
-    for f in vhdl_files[:5]:
+    # Show the files that will be (re-)analyzed
+    shown = [f for f in vhdl_files if f in stale]
+    for f in shown[:5]:
         rel_path = f.relative_to(PROJECT_ROOT)
         print(f"     - {rel_path}")
-    if len(vhdl_files) > 5:
-        print(f"     ... and {len(vhdl_files) - 5} more")
+    if len(shown) > 5:
+        print(f"     ... and {len(shown) - 5} more")
+
+    waves = graph.levels()
+    print(f"   Dependency graph: {len(waves)} levels, "
+          f"widest level has {max(len(w) for w in waves)} independent files")
+    return graph, stale
+
+
+def analyze_all_sources(graph: DependencyGraph, stale: Set[Path], manifest: BuildManifest,
+                        timings: BuildTimings) -> bool:
+    """
+    Analyze stale VHDL sources into the GHDL work library in dependency order.
+
+    Args:
+        graph: Dependency graph from scan_sources()
+        stale: Files to (re-)analyze - changed files plus their dependents
+        manifest: Build manifest, updated as files are analyzed
+        timings: Receives per-file analysis times
+
+    Returns:
+        True if successful, False otherwise
+    """
+    if not stale:
+        print_status("✅", "All sources up to date - nothing to analyze", Colors.GREEN)
+        return True
 
     # Create work directory if it doesn't exist
     WORK_DIR.mkdir(exist_ok=True)
 
-    print_status("📦", "Importing sources into GHDL work library...", Colors.BLUE)
+    order = [path for path in graph.topological_order() if path in stale]
+    print_status("📦", f"Analyzing {len(order)} sources into GHDL work library...", Colors.BLUE)
+
+    # Anything about to be re-analyzed is out of date until it succeeds
+    for vhd_file in order:
+        manifest.mark_analyzed(vhd_file, False)
+
+    start = time.monotonic()
+    try:
+        for vhd_file in order:
+            success, output, elapsed = analyze_file(vhd_file)
+            timings.analysis[vhd_file] = elapsed
+            if output:
+                print(output)
+            if not success:
+                print_status("❌", f"Analysis of {vhd_file.relative_to(PROJECT_ROOT)} failed!",
+                             Colors.RED)
+                return False
+            manifest.mark_analyzed(vhd_file)
+    finally:
+        timings.analysis_wall = time.monotonic() - start
+        manifest.save()
+
+    print_status("✅", "Analysis complete - all units are in the work library", Colors.GREEN)
+    return True
+
+
+def find_top_level_entities(graph: DependencyGraph) -> List[str]:
+    """
+    Entities that no other scanned file instantiates or depends on.
+
+    Args:
+        graph: Dependency graph from scan_sources()
+
+    Returns:
+        Sorted list of entity names (lowercase)
+    """
+    tops = []
+    for path in graph.order:
+        if graph.rdeps[path]:
+            continue
+        # Packages are never elaborated on their own
+        tops.extend(graph.files[path].entities)
+    return sorted(tops)
 
-    # Import all files
+
+def elaborate_entity(entity_name: str) -> Tuple[bool, str, float]:
+    """Elaborate one (already analyzed) entity"""
     cmd = [
         "ghdl",
-        "-i",  # Import
+        "-e",  # Elaborate
         f"--workdir={WORK_DIR}",
-        "--std=08",
-    ] + [str(f) for f in vhdl_files]
+        *GHDL_ARGS,
+        entity_name,
+    ]
+    return run_ghdl_capture(cmd)
 
-    if not run_ghdl_command(cmd, "Import"):
-        return False
 
-    print_status("✅", "Import complete - GHDL has dependency information", Colors.GREEN)
-    return True
+def build_entities(entity_names: List[str], jobs: int, timings: BuildTimings,
+                   graph: Optional[DependencyGraph] = None,
+                   manifest: Optional[BuildManifest] = None) -> bool:
+    """
+    Elaborate entities concurrently.
+
+    All units are already analyzed, so elaboration only reads the work
+    library and each entity can be elaborated by its own GHDL process.
+    Output is printed per entity as each one finishes. With a manifest,
+    entities whose sources are unchanged since their last successful
+    elaboration are skipped.
+
+    Args:
+        entity_names: Entities to elaborate
+        jobs: Maximum number of concurrent GHDL processes
+        timings: Receives per-entity elaboration times
+        graph: Dependency graph (needed for skipping up-to-date entities)
+        manifest: Build manifest recording successful elaborations
+
+    Returns:
+        True if every entity elaborated, False otherwise
+    """
+    fingerprints: Dict[str, Optional[str]] = {}
+    if graph is not None and manifest is not None:
+        pending = []
+        for name in entity_names:
+            fingerprints[name] = manifest.entity_fingerprint(graph, name)
+            if fingerprints[name] and manifest.elaborated.get(name) == fingerprints[name]:
+                print_status("✅", f"'{name}' up to date", Colors.GREEN)
+            else:
+                pending.append(name)
+        entity_names = pending
+
+    if not entity_names:
+        return True
+
+    workers = max(1, min(jobs, len(entity_names)))
+    print_status("🔨", f"Elaborating {len(entity_names)} entities ({workers} parallel jobs)...",
+                 Colors.BLUE)
+
+    all_ok = True
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(elaborate_entity, name): name for name in entity_names}
+        for future in as_completed(futures):
+            name = futures[future]
+            success, output, elapsed = future.result()
+            timings.elaboration[name] = elapsed
+            if success:
+                print_status("✅", f"Built '{name}' ({elapsed:.2f}s)", Colors.GREEN)
+                if manifest is not None and fingerprints.get(name):
+                    manifest.elaborated[name] = fingerprints[name]
+            else:
+                print_status("❌", f"Build {name} failed!", Colors.RED)
+                if manifest is not None:
+                    manifest.elaborated.pop(name, None)
+                all_ok = False
+            if output:
+                print(output)
+    timings.elaboration_wall = time.monotonic() - start
+
+    if manifest is not None:
+        manifest.save()
+    return all_ok
 
 
 def build_entity(entity_name: str) -> bool:
     """
     Build (elaborate) a specific entity.
 
-    GHDL uses its internal dependency graph to compile everything
-    needed for this entity in the correct order.
-
     Args:
         entity_name: Name of the top-level entity to build
 
     Returns:
         True if successful, False otherwise
     """
-    print_status("🔨", f"Building entity '{entity_name}'...", Colors.BLUE)
+    return build_entities([entity_name], jobs=1, timings=BuildTimings())
 
-    cmd = [
-        "ghdl",
-        "-m",  # Make (elaborate)
-        f"--workdir={WORK_DIR}",
-        "--std=08",
-        entity_name
-    ]
 
-    if not run_ghdl_command(cmd, f"Build {entity_name}"):
-        return False
+def critical_path(graph: DependencyGraph, timings: BuildTimings,
+                  entity: Optional[str] = None) -> Tuple[float, List[Path]]:
+    """
+    Longest chain of dependent analyses (weighted by measured time).
 
-    print_status("✅", f"Built '{entity_name}' successfully", Colors.GREEN)
-    return True
+    Args:
+        graph: Dependency graph
+        timings: Measured analysis times
+        entity: If given, only consider the chain ending at this entity's file
+
+    Returns:
+        (total seconds, files along the path in analysis order)
+    """
+    finish: Dict[Path, float] = {}
+    via: Dict[Path, Optional[Path]] = {}
+    for path in graph.topological_order():
+        best_dep = max(graph.deps[path], key=lambda d: finish[d], default=None)
+        start = finish[best_dep] if best_dep is not None else 0.0
+        finish[path] = start + timings.analysis.get(path, 0.0)
+        via[path] = best_dep
+
+    if entity is not None:
+        end = graph.file_for_unit(entity)
+        if end is None:
+            return 0.0, []
+    elif finish:
+        end = max(finish, key=finish.get)
+    else:
+        return 0.0, []
+
+    chain = []
+    node: Optional[Path] = end
+    while node is not None:
+        chain.append(node)
+        node = via[node]
+    return finish[end], list(reversed(chain))
+
+
+def print_timing_report(graph: DependencyGraph, timings: BuildTimings):
+    """Print analysis/elaboration times and the critical path"""
+    print()
+    print_status("⏱ ", "Timing report", Colors.BLUE)
+
+    if timings.analysis:
+        total = sum(timings.analysis.values())
+        print(f"   Analysis:    {len(timings.analysis)} files, {total:.2f}s "
+              f"(wall {timings.analysis_wall:.2f}s)")
+        slowest = sorted(timings.analysis.items(), key=lambda kv: kv[1], reverse=True)[:5]
+        for path, elapsed in slowest:
+            print(f"     {elapsed:6.2f}s  {path.relative_to(PROJECT_ROOT)}")
+
+    if timings.elaboration:
+        total = sum(timings.elaboration.values())
+        print(f"   Elaboration: {len(timings.elaboration)} entities, {total:.2f}s "
+              f"(wall {timings.elaboration_wall:.2f}s)")
+
+    # Critical path = dependency chain analysis + slowest elaboration at its end
+    best_total, best_chain, best_entity = 0.0, [], None
+    for entity, elab_time in (timings.elaboration.items() or [(None, 0.0)]):
+        chain_time, chain = critical_path(graph, timings, entity)
+        if chain_time + elab_time >= best_total:
+            best_total, best_chain, best_entity = chain_time + elab_time, chain, entity
+
+    if best_chain:
+        steps = [f"{p.name} ({timings.analysis.get(p, 0.0):.2f}s)" for p in best_chain]
+        if best_entity is not None:
+            steps.append(f"elaborate {best_entity} ({timings.elaboration[best_entity]:.2f}s)")
+        print(f"   Critical path: {best_total:.2f}s")
+        print("     " + "\n     -> ".join(steps))
 
 
 def clean_build_artifacts():
@@ -287,47 +641,76 @@ def clean_build_artifacts():
         print_status("✅", "Already clean (no artifacts found)", Colors.GREEN)
 
 
-def build_all() -> int:
+def build_all(entities: Optional[List[str]] = None, all_tops: bool = False,
+              jobs: int = 1, rebuild: bool = False) -> int:
     """
-    Build all modules by importing all sources.
+    Analyze out-of-date sources, then optionally elaborate entities in parallel.
 
-    This doesn't elaborate any specific entities, but prepares
-    GHDL's dependency graph so any entity can be quickly built.
+    Args:
+        entities: Entities to elaborate after analysis
+        all_tops: Elaborate every top-level entity found in the graph
+        jobs: Maximum number of concurrent elaborations
+        rebuild: Ignore the build manifest and re-analyze everything
 
     Returns:
         0 on success, 1 on failure
     """
-    if not import_all_sources():
+    manifest = BuildManifest.load(rebuild=rebuild)
+    scanned = scan_sources(manifest)
+    if scanned is None:
         return 1
+    graph, stale = scanned
 
-    print()
-    print_status("✅", "Dependency graph complete!", Colors.GREEN)
-    print("   GHDL has imported all sources and resolved dependencies.")
-    print("   To build a specific entity:")
-    print(f"   {Colors.BLUE}python scripts/build_vhdl_deps.py --entity <entity_name>{Colors.NC}")
+    timings = BuildTimings()
+    if not analyze_all_sources(graph, stale, manifest, timings):
+        return 1
 
-    return 0
+    targets = list(entities or [])
+    if all_tops:
+        targets += [name for name in find_top_level_entities(graph) if name not in targets]
+
+    ok = True
+    if targets:
+        print()
+        ok = build_entities(targets, jobs, timings, graph=graph, manifest=manifest)
+    else:
+        manifest.save()
+        print()
+        print_status("✅", "Dependency graph complete!", Colors.GREEN)
+        print("   All sources analyzed in dependency order.")
+        print("   To build a specific entity:")
+        print(f"   {Colors.BLUE}python scripts/build_vhdl.py --entity <entity_name>{Colors.NC}")
+
+    if timings.analysis or timings.elaboration:
+        print_timing_report(graph, timings)
+    return 0 if ok else 1
 
 
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(
-        description="VHDL Dependency Graph Builder using GHDL native dependency resolution",
+        description="VHDL Dependency Graph Builder (dependency-ordered analysis, parallel elaboration)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Examples:
-  python scripts/build_vhdl_deps.py                    # Import all sources (dependency graph)
-  python scripts/build_vhdl_deps.py --entity foo       # Build entity 'foo'
-  python scripts/build_vhdl_deps.py --clean            # Clean artifacts
+  python scripts/build_vhdl.py                         # Analyze all sources (dependency order)
+  python scripts/build_vhdl.py --entity foo            # Build entity 'foo'
+  python scripts/build_vhdl.py --entity foo --entity bar -j 2   # Build two entities in parallel
+  python scripts/build_vhdl.py --tops -j 8             # Build every top-level entity
+  python scripts/build_vhdl.py --rebuild               # Ignore manifest, re-analyze everything
+  python scripts/build_vhdl.py --clean                 # Clean artifacts
 
   # Or with UV:
-  uv run python scripts/build_vhdl_deps.py
-  uv run python scripts/build_vhdl_deps.py --entity volo_clk_divider
+  uv run python scripts/build_vhdl.py
+  uv run python scripts/build_vhdl.py --entity volo_clk_divider
 
 Features:
   - Auto-discovers all VHDL files in instruments/, experimental/, and modules/
-  - GHDL resolves dependencies automatically (no manual tracking!)
+  - Dependency graph extracted from entity/package/use clauses in the sources
+  - Top-level entities elaborate concurrently (--jobs)
+  - Critical-path timing report after every build
+  - Incremental: only changed files and their dependents are re-analyzed
   - Works from any directory (finds project root)
   - Skips testbenches and test wrappers automatically
         """
@@ -342,7 +725,26 @@ Features:
         "--entity",
         type=str,
         metavar="NAME",
-        help="Build specific entity (elaborates with dependencies)"
+        action="append",
+        help="Build specific entity (elaborates with dependencies); may be repeated"
+    )
+    parser.add_argument(
+        "--tops",
+        action="store_true",
+        help="Elaborate every top-level entity (entities nothing else depends on)"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the build manifest and re-analyze/re-elaborate everything"
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Maximum concurrent elaborations (default: number of CPUs)"
     )
 
     args = parser.parse_args()
@@ -358,18 +760,8 @@ Features:
         clean_build_artifacts()
         return 0
 
-    elif args.entity:
-        # Import sources first, then build entity
-        if not import_all_sources():
-            return 1
-        print()
-        if not build_entity(args.entity):
-            return 1
-        return 0
-
-    else:
-        # Default: import all sources
-        return build_all()
+    return build_all(entities=args.entity, all_tops=args.tops, jobs=args.jobs,
+                     rebuild=args.rebuild)
 
 
 if __name__ == "__main__":
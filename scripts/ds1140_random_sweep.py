@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Constrained-random DS1140-PD scenarios on the Python cycle model.
+
+Generates seeded scenarios (tests/ds1140_pd_tests/ds1140_pd_stimulus.py),
+runs them in batches through DS1140BatchModel and reports field coverage
+and FSM outcomes. No simulator needed; the cocotb P3 test replays the
+same seeds against the RTL.
+
+Usage:
+    python scripts/ds1140_random_sweep.py                       # 2000 scenarios, seed 0
+    python scripts/ds1140_random_sweep.py --count 10000 --seed 7
+    python scripts/ds1140_random_sweep.py --full --illegal 0.1  # pkg limits + clamp paths
+    python scripts/ds1140_random_sweep.py --shard 2/8           # 3rd of 8 CI shards
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+import argparse
+from dataclasses import replace
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+from ds1140_pd_tests.ds1140_pd_stimulus import (
+    DEFAULT_CONSTRAINTS,
+    NUMPY_AVAILABLE,
+    RTL_CONSTRAINTS,
+    DS1140StimulusGenerator,
+    FieldCoverage,
+    run_batch,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Constrained-random DS1140-PD sweep on the cycle model")
+    parser.add_argument("--count", type=int, default=2000, help="Scenarios to run (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="Run seed (default: 0)")
+    parser.add_argument("--batch", type=int, default=4000, help="Scenarios per model batch (default: 4000)")
+    parser.add_argument("--full", action="store_true",
+                        help="Full ds1140_pd_pkg ranges (default: short RTL-sized scenarios)")
+    parser.add_argument("--illegal", type=float, default=0.0, metavar="RATE",
+                        help="Probability of out-of-range field values (default: 0)")
+    parser.add_argument("--shard", type=str, default=None, metavar="K/N",
+                        help="Run only shard K of N (0-based) of the scenario indices")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ numpy is required for batched model runs")
+        sys.exit(1)
+
+    constraints = DEFAULT_CONSTRAINTS if args.full else RTL_CONSTRAINTS
+    if args.illegal:
+        constraints = replace(constraints, illegal_rate=args.illegal)
+    generator = DS1140StimulusGenerator(seed=args.seed, constraints=constraints)
+
+    start, stop = 0, args.count
+    if args.shard:
+        k, n = (int(x) for x in args.shard.split("/"))
+        per_shard = -(-args.count // n)
+        start, stop = k * per_shard, min(args.count, (k + 1) * per_shard)
+
+    coverage = FieldCoverage()
+    outcomes = {}
+    edges = 0
+    t0 = time.perf_counter()
+    for first in range(start, stop, args.batch):
+        scenarios = generator.batch(min(args.batch, stop - first), start=first)
+        result = run_batch(scenarios)
+        for i, scenario in enumerate(scenarios):
+            coverage.sample(scenario, int(result.final.state[i]))
+        for name, n in result.outcome_counts().items():
+            outcomes[name] = outcomes.get(name, 0) + n
+        edges += result.edges * len(scenarios)
+    elapsed = time.perf_counter() - t0
+
+    print(f"🎲 Scenarios {start}-{stop - 1} (seed {args.seed}) in {elapsed:.2f}s "
+          f"({edges / elapsed / 1e6:.2f}M scenario-cycles/s)")
+    print("   Outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items())))
+    for line in coverage.report():
+        print(line)
+    holes = coverage.holes()
+    if holes:
+        print(f"⚠️  {len(holes)} empty bins: {', '.join(holes)}")
+
+
+if __name__ == "__main__":
+    main()
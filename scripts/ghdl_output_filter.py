@@ -10,13 +10,19 @@ Author: Volo Engineering
 Date: 2025-01-26
 """
 
+from collections import OrderedDict
 import re
 import sys
-from typing import List, Set, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
 
 
+# Default bounds for deduplication state (see DedupCache / SignatureCounter)
+DEFAULT_DEDUP_CAPACITY = 100_000
+DEFAULT_SIGNATURE_CAPACITY = 64
+
+
 class FilterLevel(Enum):
     """
     Output filtering levels:
@@ -42,6 +48,149 @@ class FilterStats:
     duplicate_warnings: int = 0
 
 
+class DedupCache:
+    """
+    Bounded LRU set of warning signatures, stored as 64-bit hashes.
+
+    Replaces an unbounded set of normalized lines: memory stays fixed at
+    `capacity` entries no matter how many distinct warnings a long
+    simulation emits. A signature evicted as least-recently-seen is shown
+    once more if it comes back.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_DEDUP_CAPACITY):
+        if capacity < 1:
+            raise ValueError("DedupCache capacity must be >= 1")
+        self.capacity = capacity
+        self.evictions = 0
+        self._entries: "OrderedDict[int, None]" = OrderedDict()
+
+    def seen(self, signature: str) -> bool:
+        """Record `signature`; True if it was already in the cache"""
+        key = hash(signature)
+        entries = self._entries
+        if key in entries:
+            entries.move_to_end(key)
+            return True
+
+        entries[key] = None
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def __contains__(self, signature: str) -> bool:
+        return hash(signature) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SignatureCounter:
+    """
+    Approximate occurrence counts of the most frequent signatures.
+
+    Space-Saving algorithm: at most `capacity` signatures are tracked; a new
+    signature replaces the least frequent one and inherits its count as an
+    error bound. Any signature making up more than 1/capacity of all
+    occurrences is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SIGNATURE_CAPACITY):
+        if capacity < 1:
+            raise ValueError("SignatureCounter capacity must be >= 1")
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, signature: str):
+        counts = self.counts
+        if signature in counts:
+            counts[signature] += 1
+            return
+
+        floor = 0
+        if len(counts) >= self.capacity:
+            victim = min(counts, key=counts.__getitem__)
+            floor = counts.pop(victim)
+            del self.errors[victim]
+        counts[signature] = floor + 1
+        self.errors[signature] = floor
+
+    def most_common(self, n: int = 10) -> List[Tuple[str, int, bool]]:
+        """
+        Top `n` signatures by guaranteed count.
+
+        Returns:
+            (signature, count, exact) tuples; when `exact` is False the count
+            is a lower bound. Signatures seen only once since entering the
+            table after an eviction carry no information and are skipped.
+        """
+        top = []
+        for signature, count in self.counts.items():
+            error = self.errors[signature]
+            guaranteed = count - error
+            if error and guaranteed <= 1:
+                continue
+            top.append((signature, guaranteed, error == 0))
+        top.sort(key=lambda item: item[1], reverse=True)
+        return top[:n]
+
+
+class CombinedPattern:
+    """
+    A list of regex patterns compiled into one alternation, for search().
+
+    Patterns are matched case-insensitively, but instead of re.IGNORECASE
+    (which disables the regex engine's literal-prefix scanning) the patterns
+    are lowercased and run against the lowercased line. Leading/trailing
+    `.*` are dropped, `^`-anchored patterns go into a separate match()
+    alternation, and a leading `\\bword` becomes `word(?<=\\bword)` - all
+    three would otherwise make every position in the line a candidate start.
+    """
+
+    LEADING_WORD_RE = re.compile(r"\\b([a-z_]+)(.*)", re.DOTALL)
+
+    def __init__(self, patterns: List[str]):
+        anchored = []
+        floating = []
+        for pattern in patterns:
+            pattern = self._lower(pattern)
+            if pattern.startswith(".*"):
+                pattern = pattern[2:]
+            if pattern.endswith(".*") and not pattern.endswith("\\.*"):
+                pattern = pattern[:-2]
+
+            if pattern.startswith("^"):
+                anchored.append(pattern[1:])
+                continue
+            word = self.LEADING_WORD_RE.fullmatch(pattern)
+            if word:
+                pattern = f"{word.group(1)}(?<=\\b{word.group(1)}){word.group(2)}"
+            floating.append(pattern)
+
+        self.anchored = self._compile(anchored)
+        self.floating = self._compile(floating)
+
+    @staticmethod
+    def _lower(pattern: str) -> str:
+        """Lowercase a pattern without touching escapes like \\S or \\W"""
+        parts = re.split(r"(\\.)", pattern)
+        return "".join(part if part.startswith("\\") else part.lower() for part in parts)
+
+    @staticmethod
+    def _compile(patterns: List[str]) -> Optional["re.Pattern"]:
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{p})" for p in patterns))
+
+    def search(self, lowered_line: str) -> bool:
+        """True if any pattern matches (the line must already be lowercased)"""
+        if self.anchored is not None and self.anchored.match(lowered_line):
+            return True
+        return self.floating is not None and self.floating.search(lowered_line) is not None
+
+
 class GHDLOutputFilter:
     """
     Filter GHDL output to reduce verbosity while preserving important information.
@@ -49,9 +198,11 @@ class GHDLOutputFilter:
     Key Features:
     - Suppresses repetitive metavalue warnings
     - Removes initialization noise
-    - Deduplicates repeated warnings
+    - Deduplicates repeated warnings (bounded memory, per-signature counts)
     - Preserves errors and important assertions
     - Maintains test PASS/FAIL results
+    - One combined regex per category behind a keyword prefilter
+      (benchmark: scripts/bench_ghdl_output_filter.py)
     """
 
     # Patterns for metavalue-related warnings (highest priority to filter)
@@ -100,27 +251,43 @@ class GHDLOutputFilter:
         r".*✗.*",  # Failure marks
     ]
 
-    def __init__(self, level: FilterLevel = FilterLevel.NORMAL):
+    # Every pattern above that can cause a line to be filtered needs one of
+    # these substrings (dedup needs "warning"/"assertion"). Lines without any
+    # of them are passed through without running the category regexes.
+    PREFILTER_PATTERN = r"warning|assert|metavalue|null|ghdl:info|bound check"
+
+    # Timestamps and line:column numbers, removed for deduplication
+    NORMALIZE_PATTERN = r"@?\d+(?:\.\d+)?\s*(?:ms|us|ns|ps|fs)|:\d+:\d+|\(\d+:\d+\)"
+
+    def __init__(self, level: FilterLevel = FilterLevel.NORMAL,
+                 dedup_capacity: int = DEFAULT_DEDUP_CAPACITY,
+                 signature_capacity: int = DEFAULT_SIGNATURE_CAPACITY):
         """
         Initialize the filter.
 
         Args:
             level: Filtering aggressiveness level
+            dedup_capacity: Max distinct warning signatures remembered for dedup
+            signature_capacity: Max signatures tracked for the summary counts
         """
         self.level = level
         self.stats = FilterStats()
-        self.seen_warnings: Set[str] = set()
-
-        # Compile regex patterns for efficiency
-        self.metavalue_re = [re.compile(p, re.IGNORECASE) for p in self.METAVALUE_PATTERNS]
-        self.null_re = [re.compile(p, re.IGNORECASE) for p in self.NULL_PATTERNS]
-        self.init_re = [re.compile(p, re.IGNORECASE) for p in self.INIT_PATTERNS]
-        self.internal_re = [re.compile(p, re.IGNORECASE) for p in self.GHDL_INTERNAL_PATTERNS]
-        self.preserve_re = [re.compile(p, re.IGNORECASE) for p in self.PRESERVE_PATTERNS]
+        self.seen_warnings = DedupCache(dedup_capacity)
+        self.signatures = SignatureCounter(signature_capacity)
+
+        # One combined pattern per category: a single regex scan per line
+        # instead of one per pattern
+        self.metavalue_re = CombinedPattern(self.METAVALUE_PATTERNS)
+        self.null_re = CombinedPattern(self.NULL_PATTERNS)
+        self.init_re = CombinedPattern(self.INIT_PATTERNS)
+        self.internal_re = CombinedPattern(self.GHDL_INTERNAL_PATTERNS)
+        self.preserve_re = CombinedPattern(self.PRESERVE_PATTERNS)
+        self.prefilter_re = re.compile(self.PREFILTER_PATTERN)
+        self.normalize_re = re.compile(self.NORMALIZE_PATTERN)
 
     def should_preserve(self, line: str) -> bool:
         """Check if line should always be preserved"""
-        return any(regex.match(line) for regex in self.preserve_re)
+        return self.preserve_re.search(line.lower())
 
     def should_filter(self, line: str) -> bool:
         """
@@ -132,52 +299,57 @@ class GHDLOutputFilter:
         Returns:
             True if line should be filtered (not shown), False otherwise
         """
-        # Always preserve important lines
-        if self.should_preserve(line):
-            return False
-
         # No filtering
         if self.level == FilterLevel.NONE:
             return False
 
+        # Cheap prefilter: nothing can filter a line without these keywords
+        lower = line.lower()
+        if self.prefilter_re.search(lower) is None:
+            return False
+
+        # Always preserve important lines
+        if self.preserve_re.search(lower):
+            return False
+
         # Check for duplicate warnings
-        normalized = self.normalize_warning(line)
-        if normalized and normalized in self.seen_warnings:
-            self.stats.duplicate_warnings += 1
-            return True
-        elif normalized:
-            self.seen_warnings.add(normalized)
+        normalized = self.normalize_warning(line, lower)
+        if normalized:
+            self.signatures.add(normalized)
+            if self.seen_warnings.seen(normalized):
+                self.stats.duplicate_warnings += 1
+                return True
 
         # Apply level-based filtering
         if self.level == FilterLevel.AGGRESSIVE:
             # Filter everything we can
-            if self.is_metavalue_warning(line):
+            if self.metavalue_re.search(lower):
                 self.stats.metavalue_warnings += 1
                 return True
-            if self.is_null_warning(line):
+            if self.null_re.search(lower):
                 self.stats.null_warnings += 1
                 return True
-            if self.is_initialization_warning(line):
+            if self.init_re.search(lower):
                 self.stats.initialization_warnings += 1
                 return True
-            if self.is_internal_message(line):
+            if self.internal_re.search(lower):
                 return True
 
         elif self.level == FilterLevel.NORMAL:
             # Filter most noise but keep some warnings
-            if self.is_metavalue_warning(line):
+            if self.metavalue_re.search(lower):
                 self.stats.metavalue_warnings += 1
                 return True
-            if self.is_null_warning(line):
+            if self.null_re.search(lower):
                 self.stats.null_warnings += 1
                 return True
-            if self.is_initialization_warning(line):
+            if self.init_re.search(lower):
                 self.stats.initialization_warnings += 1
                 return True
 
         elif self.level == FilterLevel.MINIMAL:
             # Only filter the worst offenders
-            if self.is_metavalue_warning(line):
+            if self.metavalue_re.search(lower):
                 # Keep first occurrence, filter repeats
                 if self.stats.metavalue_warnings > 0:
                     self.stats.metavalue_warnings += 1
@@ -188,41 +360,39 @@ class GHDLOutputFilter:
 
     def is_metavalue_warning(self, line: str) -> bool:
         """Check if line is a metavalue warning"""
-        return any(regex.search(line) for regex in self.metavalue_re)
+        return self.metavalue_re.search(line.lower())
 
     def is_null_warning(self, line: str) -> bool:
         """Check if line is a null/uninitialized warning"""
-        return any(regex.search(line) for regex in self.null_re)
+        return self.null_re.search(line.lower())
 
     def is_initialization_warning(self, line: str) -> bool:
         """Check if line is an initialization-time warning"""
-        return any(regex.search(line) for regex in self.init_re)
+        return self.init_re.search(line.lower())
 
     def is_internal_message(self, line: str) -> bool:
         """Check if line is a GHDL internal message"""
-        return any(regex.search(line) for regex in self.internal_re)
+        return self.internal_re.search(line.lower())
 
-    def normalize_warning(self, line: str) -> Optional[str]:
+    def normalize_warning(self, line: str, lower: Optional[str] = None) -> Optional[str]:
         """
         Normalize a warning line for deduplication.
         Removes timestamps and line numbers to detect duplicates.
 
         Args:
             line: Warning line to normalize
+            lower: line.lower(), if the caller already has it
 
         Returns:
             Normalized string or None if not a warning
         """
-        if "warning" not in line.lower() and "assertion" not in line.lower():
+        if lower is None:
+            lower = line.lower()
+        if "warning" not in lower and "assertion" not in lower:
             return None
 
-        # Remove timestamps (various formats)
-        normalized = re.sub(r'@?\d+(\.\d+)?\s*(ms|us|ns|ps|fs)', '', line)
-        normalized = re.sub(r'^\s*\d+\.\d+ns\s+', '', normalized)
-
-        # Remove line numbers
-        normalized = re.sub(r':\d+:\d+', '', normalized)
-        normalized = re.sub(r'\(\d+:\d+\)', '', normalized)
+        # Remove timestamps and line numbers in one pass
+        normalized = self.normalize_re.sub('', line)
 
         # Remove extra whitespace
         normalized = ' '.join(normalized.split())
@@ -274,12 +444,13 @@ class GHDLOutputFilter:
             if self.stats.filtered_lines > 0:
                 self.print_summary(output_stream)
 
-    def print_summary(self, output_stream=sys.stdout):
+    def print_summary(self, output_stream=sys.stdout, top_signatures: int = 10):
         """
         Print filtering summary statistics.
 
         Args:
             output_stream: Where to print summary
+            top_signatures: How many of the most frequent warning signatures to list
         """
         if self.level == FilterLevel.NONE:
             return
@@ -300,6 +471,18 @@ class GHDLOutputFilter:
             output_stream.write(f"  - Initialization warnings: {self.stats.initialization_warnings}\n")
         if self.stats.duplicate_warnings > 0:
             output_stream.write(f"  - Duplicate warnings: {self.stats.duplicate_warnings}\n")
+        if self.seen_warnings.evictions > 0:
+            output_stream.write(f"  - Dedup cache full ({self.seen_warnings.capacity} signatures): "
+                                f"{self.seen_warnings.evictions} evicted\n")
+
+        top = self.signatures.most_common(top_signatures)
+        if top:
+            output_stream.write("  Most frequent warnings:\n")
+            for signature, count, exact in top:
+                if len(signature) > 100:
+                    signature = signature[:97] + "..."
+                bound = " " if exact else ">="
+                output_stream.write(f"    {bound:>2}{count:>9}x  {signature}\n")
 
 
 def main():
@@ -321,6 +504,13 @@ def main():
         default="normal",
         help="Filtering level (default: normal)"
     )
+    parser.add_argument(
+        "--dedup-cap",
+        type=int,
+        default=DEFAULT_DEDUP_CAPACITY,
+        metavar="N",
+        help=f"Max distinct warnings remembered for dedup (default: {DEFAULT_DEDUP_CAPACITY})"
+    )
     parser.add_argument(
         "--summary",
         action="store_true",
@@ -330,7 +520,7 @@ def main():
     args = parser.parse_args()
 
     filter_level = FilterLevel(args.level)
-    filter = GHDLOutputFilter(level=filter_level)
+    filter = GHDLOutputFilter(level=filter_level, dedup_capacity=args.dedup_cap)
 
     # Process stdin to stdout
     filter.filter_stream()
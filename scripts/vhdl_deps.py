@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Lightweight VHDL dependency scanner.
+
+Extracts which design units each file provides (entities, packages,
+configurations) and which work-library units it references (use clauses,
+direct entity instantiation, components, architectures/bodies of units
+declared elsewhere), then builds a file-level dependency graph.
+
+This is deliberately a regex scanner, not a VHDL parser - it only needs to
+be good enough to order GHDL analysis and to work out which files are
+invalidated when one changes. GHDL remains the authority on correctness.
+
+Usage:
+    from vhdl_deps import build_graph
+
+    graph = build_graph(vhdl_files)
+    order = graph.topological_order()          # analysis order
+    stale = graph.dependents_of({changed})     # changed file + everything above it
+
+    python scripts/vhdl_deps.py VHDL/*.vhd VHDL/packages/*.vhd   # print graph
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, Set
+
+# Patterns run on lowercased, comment-stripped source
+ENTITY_RE = re.compile(r"\bentity\s+(\w+)\s+is\b")
+PACKAGE_RE = re.compile(r"\bpackage\s+(?!body\b)(\w+)\s+is\b")
+CONFIGURATION_RE = re.compile(r"\bconfiguration\s+(\w+)\s+of\s+(\w+)\s+is\b")
+PACKAGE_BODY_RE = re.compile(r"\bpackage\s+body\s+(\w+)\s+is\b")
+ARCHITECTURE_RE = re.compile(r"\barchitecture\s+\w+\s+of\s+(\w+)\s+is\b")
+USE_WORK_RE = re.compile(r"\buse\s+work\.(\w+)")
+ENTITY_WORK_RE = re.compile(r"\bentity\s+work\.(\w+)")
+COMPONENT_RE = re.compile(r"\bcomponent\s+(\w+)\b(?!\s*;)")
+COMMENT_RE = re.compile(r"--[^\n]*")
+
+
+@dataclass
+class VhdlFile:
+    """Design units provided and referenced by one VHDL source file"""
+    path: Path
+    provides: Set[str] = field(default_factory=set)
+    entities: Set[str] = field(default_factory=set)
+    references: Set[str] = field(default_factory=set)
+
+
+def scan_file(path: Path) -> VhdlFile:
+    """
+    Scan a VHDL file for the units it declares and references.
+
+    Args:
+        path: VHDL source file
+
+    Returns:
+        VhdlFile with lowercase unit names
+    """
+    text = Path(path).read_text(errors="replace")
+    text = COMMENT_RE.sub("", text).lower()
+
+    info = VhdlFile(path=Path(path))
+    info.entities.update(ENTITY_RE.findall(text))
+    info.provides.update(info.entities)
+    info.provides.update(PACKAGE_RE.findall(text))
+    for cfg_name, entity_name in CONFIGURATION_RE.findall(text):
+        info.provides.add(cfg_name)
+        info.references.add(entity_name)
+
+    info.references.update(USE_WORK_RE.findall(text))
+    info.references.update(ENTITY_WORK_RE.findall(text))
+    info.references.update(COMPONENT_RE.findall(text))
+    info.references.update(PACKAGE_BODY_RE.findall(text))
+    info.references.update(ARCHITECTURE_RE.findall(text))
+
+    # A file never depends on itself
+    info.references -= info.provides
+    return info
+
+
+class DependencyGraph:
+    """
+    File-level dependency graph.
+
+    `deps[f]` holds the files that must be analyzed before `f`. References
+    to units not provided by any scanned file (IEEE, vendor libraries,
+    black boxes) are collected in `unresolved` and otherwise ignored.
+    """
+
+    def __init__(self, files: List[VhdlFile]):
+        self.files: Dict[Path, VhdlFile] = {f.path: f for f in files}
+        self.order: List[Path] = [f.path for f in files]
+        self.unit_owner: Dict[str, Path] = {}
+        for f in files:
+            for unit in f.provides:
+                # First definition wins, like a single GHDL work library
+                self.unit_owner.setdefault(unit, f.path)
+
+        self.deps: Dict[Path, Set[Path]] = {}
+        self.unresolved: Dict[Path, Set[str]] = {}
+        for f in files:
+            deps = set()
+            for unit in f.references:
+                owner = self.unit_owner.get(unit)
+                if owner is None:
+                    self.unresolved.setdefault(f.path, set()).add(unit)
+                elif owner != f.path:
+                    deps.add(owner)
+            self.deps[f.path] = deps
+
+        self.rdeps: Dict[Path, Set[Path]] = {path: set() for path in self.order}
+        for path, deps in self.deps.items():
+            for dep in deps:
+                self.rdeps[dep].add(path)
+
+    def levels(self) -> List[List[Path]]:
+        """
+        Group files into analysis waves.
+
+        Every file in a wave depends only on files in earlier waves, so the
+        files within one wave can be analyzed concurrently. Order inside a
+        wave follows the original file order.
+
+        Raises:
+            ValueError: If the graph contains a cycle
+        """
+        remaining = {path: set(deps) for path, deps in self.deps.items()}
+        waves = []
+        while remaining:
+            ready = [path for path in self.order if path in remaining and not remaining[path]]
+            if not ready:
+                cycle = ", ".join(sorted(p.name for p in remaining))
+                raise ValueError(f"Dependency cycle between: {cycle}")
+            waves.append(ready)
+            for path in ready:
+                del remaining[path]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return waves
+
+    def topological_order(self) -> List[Path]:
+        """Files in a valid serial analysis order"""
+        return [path for wave in self.levels() for path in wave]
+
+    def dependents_of(self, changed: Iterable[Path]) -> Set[Path]:
+        """
+        Transitive closure of files that depend on any file in `changed`.
+
+        The result includes the changed files themselves (if in the graph).
+        """
+        stale = set()
+        stack = [Path(p) for p in changed if Path(p) in self.files]
+        while stack:
+            path = stack.pop()
+            if path in stale:
+                continue
+            stale.add(path)
+            stack.extend(self.rdeps.get(path, ()))
+        return stale
+
+    def dependencies_of(self, targets: Iterable[Path]) -> Set[Path]:
+        """Transitive closure of files that `targets` need (including themselves)"""
+        needed = set()
+        stack = [Path(p) for p in targets if Path(p) in self.files]
+        while stack:
+            path = stack.pop()
+            if path in needed:
+                continue
+            needed.add(path)
+            stack.extend(self.deps.get(path, ()))
+        return needed
+
+    def file_for_unit(self, unit: str) -> Optional[Path]:
+        """File that declares `unit` (case-insensitive), if scanned"""
+        return self.unit_owner.get(unit.lower())
+
+
+def build_graph(paths: Iterable[Path]) -> DependencyGraph:
+    """
+    Scan files and build their dependency graph.
+
+    Args:
+        paths: VHDL source files (order is used to break ties)
+
+    Returns:
+        DependencyGraph
+    """
+    return DependencyGraph([scan_file(Path(p)) for p in paths])
+
+
+def main():
+    """Print the dependency graph and analysis waves for the given files"""
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/vhdl_deps.py FILE.vhd [FILE.vhd ...]")
+        return 1
+
+    graph = build_graph(sys.argv[1:])
+    for path in graph.order:
+        deps = ", ".join(sorted(d.name for d in graph.deps[path])) or "-"
+        print(f"{path.name:45s} <- {deps}")
+
+    print()
+    for i, wave in enumerate(graph.levels(), 1):
+        print(f"Wave {i}: {', '.join(p.name for p in wave)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
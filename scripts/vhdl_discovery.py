@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+VHDL source discovery for build_vhdl.py.
+
+Walks the configured source roots with os.scandir, pruning excluded
+directories before descending into them (vendored cloudcompile packages,
+testbench trees, incoming drops), instead of globbing everything and
+filtering afterwards.
+
+Roots and exclusions come from pyproject.toml:
+
+    [tool.build_vhdl]
+    include = ["instruments", "experimental", "modules/shared"]  # globs, relative to the project root
+    exclude = ["tb", "*cloudcompile_package*", "*wrapper*"]      # globs on a name or relative path
+    patterns = ["*.vhd"]                                         # source file globs
+
+Every directory visited is recorded with its mtime. A directory's mtime
+changes whenever an entry is added, removed or renamed in it, so if none of
+them moved, the cached file list is still exact and the walk is skipped.
+
+Usage:
+    from vhdl_discovery import DiscoveryConfig, discover_sources
+
+    config = DiscoveryConfig.from_pyproject(project_root)
+    files = discover_sources(project_root, config, cache_path=work_dir / "discovery_cache.json")
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatchcase
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Dict, List, Optional
+
+try:
+    import tomllib
+    TOML_AVAILABLE = True
+except ImportError:
+    try:
+        import tomli as tomllib
+        TOML_AVAILABLE = True
+    except ImportError:
+        TOML_AVAILABLE = False
+
+
+CACHE_VERSION = 1
+
+DEFAULT_INCLUDE = [
+    "instruments",
+    "experimental",
+    "modules/shared",
+    "modules/oddball",
+    "modules/examples",
+    "modules/untested",
+]
+DEFAULT_EXCLUDE = [
+    "tb",                      # Testbench directories
+    "*wrapper*",               # Test wrapper files
+    "*cloudcompile_package*",  # Vendored cloudcompile packages
+    "*incoming*",              # Unreviewed drops
+]
+DEFAULT_PATTERNS = ["*.vhd"]
+
+
+@dataclass
+class DiscoveryConfig:
+    """Where to look for VHDL sources and what to skip"""
+    include: List[str] = field(default_factory=lambda: list(DEFAULT_INCLUDE))
+    exclude: List[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDE))
+    patterns: List[str] = field(default_factory=lambda: list(DEFAULT_PATTERNS))
+
+    @classmethod
+    def from_pyproject(cls, project_root: Path) -> "DiscoveryConfig":
+        """
+        Read [tool.build_vhdl] from pyproject.toml.
+
+        Missing keys (or a missing TOML parser) fall back to the defaults.
+        """
+        config = cls()
+        pyproject = Path(project_root) / "pyproject.toml"
+        if not TOML_AVAILABLE or not pyproject.exists():
+            return config
+
+        with open(pyproject, "rb") as f:
+            section = tomllib.load(f).get("tool", {}).get("build_vhdl", {})
+        for key in ("include", "exclude", "patterns"):
+            if key in section:
+                setattr(config, key, list(section[key]))
+        return config
+
+    def is_excluded(self, name: str, rel_path: str) -> bool:
+        """True if a directory or file matches an exclude glob (case-insensitive)"""
+        name = name.lower()
+        rel_path = rel_path.lower()
+        return any(
+            fnmatchcase(name, pattern.lower()) or fnmatchcase(rel_path, pattern.lower())
+            for pattern in self.exclude
+        )
+
+    def is_source(self, name: str) -> bool:
+        return any(fnmatchcase(name, pattern) for pattern in self.patterns)
+
+
+class _Walker:
+    """One discovery pass, recording the mtime of every directory it lists"""
+
+    def __init__(self, project_root: Path, config: DiscoveryConfig):
+        self.project_root = project_root
+        self.config = config
+        self.dir_mtimes: Dict[str, int] = {}
+        self.files: List[Path] = []
+
+    def _scandir(self, directory: Path) -> List[os.DirEntry]:
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+            self.dir_mtimes[str(directory)] = os.stat(directory).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            # Record the nearest existing ancestor so creating the root later
+            # invalidates the cache
+            self._record_ancestor(directory)
+            return []
+        return entries
+
+    def _record_ancestor(self, directory: Path):
+        parent = directory.parent
+        while parent != parent.parent and not parent.is_dir():
+            parent = parent.parent
+        if parent.is_dir():
+            self.dir_mtimes[str(parent)] = os.stat(parent).st_mtime_ns
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.project_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def expand_root(self, pattern: str) -> List[Path]:
+        """Expand an include glob one path component at a time"""
+        roots = [self.project_root]
+        for part in Path(pattern).parts:
+            expanded = []
+            for base in roots:
+                if not any(ch in part for ch in "*?["):
+                    candidate = base / part
+                    if candidate.is_dir():
+                        expanded.append(candidate)
+                    else:
+                        self._record_ancestor(candidate)
+                    continue
+                for entry in self._scandir(base):
+                    if entry.is_dir() and fnmatchcase(entry.name, part):
+                        expanded.append(Path(entry.path))
+            roots = expanded
+        return roots
+
+    def walk(self, directory: Path):
+        """Collect source files under `directory`, never entering excluded dirs"""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            for entry in self._scandir(current):
+                path = Path(entry.path)
+                rel_path = self._relative(path)
+                if self.config.is_excluded(entry.name, rel_path):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(path)
+                elif self.config.is_source(entry.name):
+                    self.files.append(path)
+
+    def run(self) -> List[Path]:
+        seen = set()
+        for pattern in self.config.include:
+            for root in self.expand_root(pattern):
+                if root not in seen and not self.config.is_excluded(root.name, self._relative(root)):
+                    seen.add(root)
+                    self.walk(root)
+        return sorted(set(self.files))
+
+
+def _load_cache(cache_path: Path, config: DiscoveryConfig) -> Optional[List[Path]]:
+    """Cached file list, if the config matches and no recorded directory changed"""
+    try:
+        data = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION or data.get("config") != asdict(config):
+        return None
+
+    for directory, mtime_ns in data["dirs"].items():
+        try:
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                return None
+        except OSError:
+            return None
+    return [Path(p) for p in data["files"]]
+
+
+def _save_cache(cache_path: Path, config: DiscoveryConfig, walker: _Walker, files: List[Path]):
+    data = {
+        "version": CACHE_VERSION,
+        "config": asdict(config),
+        "dirs": walker.dir_mtimes,
+        "files": [str(p) for p in files],
+    }
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True))
+        tmp_path.replace(cache_path)
+    except OSError:
+        pass  # The cache is an optimization only
+
+
+def discover_sources(project_root: Path, config: Optional[DiscoveryConfig] = None,
+                     cache_path: Optional[Path] = None) -> List[Path]:
+    """
+    Find VHDL source files under the configured roots.
+
+    Args:
+        project_root: Directory include globs are relative to
+        config: Roots/exclusions (default: read from pyproject.toml)
+        cache_path: JSON file for the discovery cache (None disables caching)
+
+    Returns:
+        Sorted list of source file paths
+    """
+    project_root = Path(project_root)
+    if config is None:
+        config = DiscoveryConfig.from_pyproject(project_root)
+
+    if cache_path is not None:
+        cached = _load_cache(cache_path, config)
+        if cached is not None:
+            return cached
+
+    walker = _Walker(project_root, config)
+    files = walker.run()
+    if cache_path is not None:
+        _save_cache(cache_path, config, walker, files)
+    return files
+
+
+def main():
+    """Print the discovered sources for a project root (default: cwd)"""
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else Path.cwd()
+    config = DiscoveryConfig.from_pyproject(root)
+    for path in discover_sources(root, config):
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
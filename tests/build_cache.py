@@ -0,0 +1,316 @@
+"""
+Content-hash build cache for the CocotB test runner.
+
+Records what went into a test's GHDL work library (toplevel, ghdl_args and a
+SHA-256 of every VHDL source) in a small JSON manifest inside the test's
+build directory. run.py uses it to decide between:
+
+- REUSE:       nothing changed - skip analysis/elaboration entirely
+- INCREMENTAL: some sources changed - let `ghdl -m` re-analyze just those
+               units (and whatever depends on them) in the existing library
+- CLEAN:       toplevel/ghdl_args changed, no library yet, or --rebuild
+
+SharedLibrary pre-analyzes the sources that several test configs have in
+common (volo_voltage_pkg, fsm_observer, ...) once, and each test's work
+library is seeded from it. All sources reference each other through
+`work.`, so the shared units have to land in each test's own work library
+rather than in a separately named library; seeding copies GHDL's library
+files, after which `ghdl -m` sees those units as already analyzed.
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+import hashlib
+import json
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from vhdl_deps import build_graph
+
+MANIFEST_NAME = "build_manifest.json"
+MANIFEST_VERSION = 2
+
+# GHDL library name used by the cocotb runner (hdl_library default)
+HDL_LIBRARY = "top"
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's contents (hex)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildAction(Enum):
+    """What run.py has to do to get an up-to-date work library"""
+    REUSE = "reuse"
+    INCREMENTAL = "incremental"
+    CLEAN = "clean"
+
+
+@dataclass
+class BuildPlan:
+    """Result of comparing the current sources against the stored manifest"""
+    action: BuildAction
+    manifest: dict
+    changed_sources: List[str] = field(default_factory=list)
+    reason: str = ""
+
+
+class BuildCache:
+    """
+    Per-build-directory manifest of source hashes.
+
+    Usage:
+        cache = BuildCache(build_dir)
+        plan = cache.plan(config.sources, config.toplevel, config.ghdl_args)
+        if plan.action != BuildAction.REUSE:
+            cache.invalidate()
+            runner.build(..., clean=plan.action == BuildAction.CLEAN)
+            cache.save(plan.manifest)
+    """
+
+    def __init__(self, build_dir: Path):
+        self.build_dir = Path(build_dir)
+        self.manifest_path = self.build_dir / MANIFEST_NAME
+
+    def compute(self, sources: List[Path], toplevel: str, ghdl_args: List[str],
+                seed: Optional[str] = None) -> dict:
+        """Build the manifest describing the current inputs"""
+        return {
+            "version": MANIFEST_VERSION,
+            "toplevel": toplevel,
+            "ghdl_args": list(ghdl_args),
+            "seed": seed,
+            "sources": {str(src): hash_file(src) for src in sources},
+        }
+
+    def load(self) -> Optional[dict]:
+        """Load the stored manifest (None if missing or unreadable)"""
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def save(self, manifest: dict):
+        """Record a successful build"""
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        tmp_path.replace(self.manifest_path)
+
+    def invalidate(self):
+        """Forget the stored manifest (call before a build that might fail)"""
+        try:
+            self.manifest_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def clean(self):
+        """Remove the whole build directory"""
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+
+    def has_work_library(self) -> bool:
+        """True if GHDL has left a library index (*.cf) in the build dir"""
+        return self.build_dir.exists() and any(self.build_dir.glob("*.cf"))
+
+    def plan(self, sources: List[Path], toplevel: str, ghdl_args: List[str],
+             rebuild: bool = False, seed: Optional[str] = None) -> BuildPlan:
+        """
+        Decide how much of the build can be skipped.
+
+        Args:
+            sources: VHDL sources in analysis order
+            toplevel: Top-level entity to elaborate
+            ghdl_args: GHDL analysis/elaboration flags
+            rebuild: Force a clean build (--rebuild)
+            seed: SharedLibrary.seed_id() the library is seeded from, if any
+
+        Returns:
+            BuildPlan with the action and the manifest to save on success
+        """
+        current = self.compute(sources, toplevel, ghdl_args, seed=seed)
+
+        if rebuild:
+            return BuildPlan(BuildAction.CLEAN, current, reason="--rebuild requested")
+
+        previous = self.load()
+        if previous is None or not self.has_work_library():
+            return BuildPlan(BuildAction.CLEAN, current, reason="no cached work library")
+
+        if previous["toplevel"] != toplevel or previous["ghdl_args"] != current["ghdl_args"]:
+            return BuildPlan(BuildAction.CLEAN, current, reason="toplevel or ghdl_args changed")
+
+        if previous.get("seed") != seed:
+            return BuildPlan(BuildAction.CLEAN, current, reason="shared library changed")
+
+        if set(previous["sources"]) - set(current["sources"]):
+            # A unit that is no longer listed would linger in the library
+            return BuildPlan(BuildAction.CLEAN, current, reason="source list shrank")
+
+        changed = [
+            path for path, digest in current["sources"].items()
+            if previous["sources"].get(path) != digest
+        ]
+        if not changed:
+            return BuildPlan(BuildAction.REUSE, current, reason="sources unchanged")
+
+        return BuildPlan(
+            BuildAction.INCREMENTAL,
+            current,
+            changed_sources=changed,
+            reason=f"{len(changed)} source(s) changed",
+        )
+
+
+class SharedLibrary:
+    """
+    Work library of sources shared between test configs, analyzed once.
+
+    The library lives in its own build directory with a manifest of source
+    hashes. ensure() re-analyzes only files whose contents changed plus the
+    files that depend on them (per vhdl_deps), in dependency order.
+
+    Usage:
+        shared = SharedLibrary(sim_build / "_shared", get_shared_sources(), DEFAULT_GHDL_ARGS)
+        if shared.ensure():
+            used = shared.used_by(config.sources, config.ghdl_args)
+            seed = shared.seed_id(used)
+            ...
+            shared.seed_into(build_dir)
+    """
+
+    def __init__(self, build_dir: Path, sources: List[Path], ghdl_args: List[str]):
+        self.build_dir = Path(build_dir)
+        self.sources = list(sources)
+        self.ghdl_args = list(ghdl_args)
+        self.manifest_path = self.build_dir / MANIFEST_NAME
+        self.graph = build_graph(self.sources)
+        self.hashes = {}
+
+    def _load_manifest(self) -> Optional[dict]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _analyze(self, path: Path) -> bool:
+        """Analyze one file into the shared library"""
+        cmd = ["ghdl", "-a", f"--work={HDL_LIBRARY}", *self.ghdl_args, str(path)]
+        try:
+            result = subprocess.run(cmd, cwd=self.build_dir, capture_output=True, text=True)
+        except FileNotFoundError:
+            print("❌ GHDL not found - shared library disabled")
+            return False
+
+        if result.returncode != 0:
+            print(f"❌ Shared library: analysis of {path.name} failed")
+            print(result.stdout + result.stderr)
+            return False
+        return True
+
+    def ensure(self, rebuild: bool = False, read_only: bool = False) -> bool:
+        """
+        Bring the shared library up to date.
+
+        Args:
+            rebuild: Re-analyze everything from scratch
+            read_only: Never analyze; only report whether the library is current
+                       (used by --jobs workers, whose parent already built it)
+
+        Returns:
+            True if the library is current and can be used for seeding
+        """
+        if not self.sources:
+            return False
+
+        self.hashes = {str(src): hash_file(src) for src in self.sources}
+        previous = self._load_manifest()
+        has_library = self.build_dir.exists() and any(self.build_dir.glob("*.cf"))
+
+        if (rebuild or previous is None or not has_library
+                or previous["ghdl_args"] != self.ghdl_args
+                or set(previous["sources"]) != set(self.hashes)):
+            stale = set(self.graph.order)
+            clean = True
+        else:
+            changed = [
+                Path(path) for path, digest in self.hashes.items()
+                if previous["sources"].get(path) != digest
+            ]
+            stale = self.graph.dependents_of(changed)
+            clean = False
+
+        if not stale:
+            return True
+        if read_only:
+            return False
+
+        if clean:
+            shutil.rmtree(self.build_dir, ignore_errors=True)
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            self.manifest_path.unlink()
+        except FileNotFoundError:
+            pass
+
+        order = [path for path in self.graph.topological_order() if path in stale]
+        print(f"📚 Analyzing {len(order)} shared source(s) into {self.build_dir.name}/...")
+        for path in order:
+            if not self._analyze(path):
+                return False
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "ghdl_args": self.ghdl_args,
+            "sources": self.hashes,
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        tmp_path.replace(self.manifest_path)
+        return True
+
+    def used_by(self, sources: List[Path], ghdl_args: List[str]) -> List[Path]:
+        """Shared sources a test config can take from this library"""
+        if list(ghdl_args) != self.ghdl_args:
+            return []
+        return [src for src in sources if src in self.graph.files]
+
+    def seed_id(self, used: List[Path]) -> Optional[str]:
+        """
+        Fingerprint of the shared units a test uses (and what they depend on).
+
+        Changes only when one of those files changes, so editing
+        volo_voltage_pkg.vhd does not reseed tests that never use it.
+        """
+        if not used or not self.hashes:
+            return None
+        needed = sorted(str(p) for p in self.graph.dependencies_of(used))
+        digest = hashlib.sha256()
+        for path in needed:
+            digest.update(f"{path}={self.hashes[path]}\n".encode())
+        return digest.hexdigest()
+
+    def seed_into(self, dest: Path):
+        """Copy the shared library files into a test build directory"""
+        dest = Path(dest)
+        dest.mkdir(parents=True, exist_ok=True)
+        for item in self.build_dir.iterdir():
+            if item.suffix in (".cf", ".o"):
+                # copy2 keeps mtimes so GHDL does not consider the units out of date
+                shutil.copy2(item, dest / item.name)
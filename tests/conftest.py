@@ -17,9 +17,20 @@ Author: Claude Code (CocotB migration)
 Date: 2025-01-22
 """
 
+from dataclasses import dataclass, field
+from enum import Enum
+import os
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, with_timeout
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, Edge, First, Timer, with_timeout
+
+try:
+    from cocotb.simtime import get_sim_time  # cocotb 2.x
+except ImportError:
+    from cocotb.utils import get_sim_time
 
 
 # Default clock period for all tests
@@ -347,6 +358,9 @@ async def capture_signal_sequence(signal, clk, num_cycles):
     Example:
         sequence = await capture_signal_sequence(dut.state, dut.clk, 20)
         assert sequence == [0, 0, 1, 2, 3, 0, 0, ...]  # Verify state transitions
+
+    For long captures of several signals use waveform_recorder.WaveformRecorder
+    (run-length encoded array buffers, VCD/Parquet export).
     """
     values = []
     for _ in range(num_cycles):
@@ -355,6 +369,168 @@ async def capture_signal_sequence(signal, clk, num_cycles):
     return values
 
 
+# =============================================================================
+# Edge-Triggered Signal Monitoring
+# =============================================================================
+#
+# The helpers above resume Python on every clock edge. The *_by_edge
+# versions below return the same results but only wake up when the observed
+# signal changes: they measure the clock period from two edges, then wait on
+# First(Edge(signal), Timer(window end)) and derive which clock sample each
+# change lands in from simulation time. Cost is proportional to signal
+# transitions, not to clock cycles - use them for long observation windows
+# and waits for rare events.
+# =============================================================================
+
+SignalChanges = List[Tuple[int, object]]
+
+
+async def _sample_changes(signal, clk, num_cycles,
+                          until: Optional[Callable[[object], bool]] = None):
+    """
+    Edge-triggered equivalent of reading `signal` after each of the next
+    `num_cycles` rising edges of `clk`.
+
+    Returns:
+        (changes, stop_cycle): `changes` lists (cycle, value) pairs - the value
+        sampled at 0-based `cycle` and every cycle after it until the next
+        entry. If `until(value)` holds for a sample, capture stops there and
+        `stop_cycle` is that cycle (the caller resumes at its clock edge, as
+        with a per-cycle loop); otherwise `stop_cycle` is None.
+    """
+    if num_cycles <= 0:
+        return [], None
+
+    # Samples 0 and 1 are taken directly; their edges also give the period
+    await RisingEdge(clk)
+    t0 = get_sim_time()
+    changes = [(0, signal.value)]
+    if until and until(changes[0][1]):
+        return changes, 0
+    if num_cycles == 1:
+        return changes, None
+
+    await RisingEdge(clk)
+    period = get_sim_time() - t0
+    value = signal.value
+    if value != changes[-1][1]:
+        changes.append((1, value))
+    if until and until(value):
+        return changes, 1
+
+    # Sample k is taken at t0 + k*period and sees the last change before it
+    deadline = t0 + (num_cycles - 1) * period
+    while True:
+        now = get_sim_time()
+        if now >= deadline:
+            return changes, None
+        await First(Edge(signal), Timer(int(deadline - now), "step"))
+        now = get_sim_time()
+        if now >= deadline:
+            return changes, None
+
+        cycle = int((now - t0) // period) + 1
+        value = signal.value
+        if until and until(value):
+            # Make sure it still holds at the sampling edge (glitch-safe)
+            await RisingEdge(clk)
+            value = signal.value
+            if until(value):
+                _record_change(changes, cycle, value)
+                return changes, cycle
+        _record_change(changes, cycle, value)
+
+
+def _record_change(changes: SignalChanges, cycle: int, value):
+    # Several changes before one clock edge: only the last one is sampled
+    if changes[-1][0] == cycle:
+        changes.pop()
+    if value != changes[-1][1]:
+        changes.append((cycle, value))
+
+
+def expand_signal_changes(changes, num_cycles) -> list:
+    """
+    Expand (cycle, value) changes into one value per cycle
+
+    Example:
+        expand_signal_changes([(0, 0), (3, 1)], 5)  # [0, 0, 0, 1, 1]
+    """
+    values = []
+    for i, (cycle, value) in enumerate(changes):
+        end = changes[i + 1][0] if i + 1 < len(changes) else num_cycles
+        values.extend([value] * (end - cycle))
+    return values
+
+
+async def count_pulses_by_edge(signal, clk, num_cycles):
+    """
+    Edge-triggered count_pulses(): number of cycles `signal` is high
+
+    Same result as count_pulses(), but wakes up only when `signal` changes.
+
+    Args:
+        signal: Signal to monitor (e.g., dut.clk_en)
+        clk: Clock signal the per-cycle version would sample on
+        num_cycles: Number of clock cycles to observe
+
+    Returns:
+        int: Number of pulses detected
+
+    Example:
+        pulses = await count_pulses_by_edge(dut.clk_en, dut.clk, 100_000)
+    """
+    changes, _ = await _sample_changes(signal, clk, num_cycles)
+    count = 0
+    for i, (cycle, value) in enumerate(changes):
+        if value == 1:
+            end = changes[i + 1][0] if i + 1 < len(changes) else num_cycles
+            count += end - cycle
+    return count
+
+
+async def wait_for_value_by_edge(signal, expected_value, clk, timeout_cycles=1000):
+    """
+    Edge-triggered wait_for_value(): resumes at the clock edge where the
+    value is first sampled, without polling every cycle
+
+    Args:
+        signal: Signal to monitor
+        expected_value: Value to wait for
+        clk: Clock signal
+        timeout_cycles: Maximum cycles to wait (default: 1000)
+
+    Returns:
+        bool: True if value reached, False if timeout
+
+    Example:
+        success = await wait_for_value_by_edge(dut.done, 1, dut.clk, timeout_cycles=1_000_000)
+    """
+    _, cycle = await _sample_changes(signal, clk, timeout_cycles,
+                                     until=lambda value: value == expected_value)
+    return cycle is not None
+
+
+async def capture_signal_changes(signal, clk, num_cycles):
+    """
+    Edge-triggered capture_signal_sequence(), returned as changes only
+
+    Args:
+        signal: Signal to capture
+        clk: Clock signal
+        num_cycles: Number of cycles to capture
+
+    Returns:
+        list: (cycle, value) pairs; use expand_signal_changes() for one value per cycle
+
+    Example:
+        changes = await capture_signal_changes(dut.state, dut.clk, 10_000)
+        assert [v for _, v in changes] == [0, 1, 2, 3, 0]  # State transitions
+    """
+    changes, _ = await _sample_changes(signal, clk, num_cycles)
+    return [(cycle, int(value)) for cycle, value in changes]
+
+
 # =============================================================================
 # Initialization Helpers
 # =============================================================================
@@ -518,6 +694,248 @@ async def init_mcc_inputs(dut):
     dut.InputD.value = 0
 
 
+class LatencyMode(Enum):
+    """
+    How mcc_set_regs() / mcc_disable() model network latency.
+
+    - RANDOM: Unseeded random delays (10-200ms before writes, 1-10ms per register)
+    - FAST:   Every delay becomes a few clock cycles (functional passes)
+    - MODEL:  Same delay ranges as RANDOM, drawn from a seeded RNG (reproducible)
+    """
+    RANDOM = "random"
+    FAST = "fast"
+    MODEL = "model"
+
+
+# Suite-wide selection (inherited by the simulator from run.py's environment)
+MCC_LATENCY_ENV = "MCC_LATENCY"              # random | fast | model
+MCC_FAST_CYCLES_ENV = "MCC_FAST_CYCLES"      # Clock cycles per delay in FAST mode
+MCC_LATENCY_SEED_ENV = "MCC_LATENCY_SEED"    # RNG seed in MODEL mode
+
+DEFAULT_FAST_CYCLES = 4
+DEFAULT_LATENCY_SEED = 0
+
+# Realistic Moku network latency ranges (ms)
+NETWORK_DELAY_MS = (10.0, 200.0)   # Before the first register write
+PER_REG_DELAY_MS = (1.0, 10.0)     # Between sequential register writes
+
+
+@dataclass
+class MccLatency:
+    """
+    Network latency model shared by all MCC register helpers.
+
+    Tests normally don't create this directly - get_mcc_latency() builds it
+    from the environment once per simulation:
+
+        MCC_LATENCY=fast uv run python tests/run.py ds1140_pd_volo
+        MCC_LATENCY=model MCC_LATENCY_SEED=7 uv run python tests/run.py ds1140_pd_volo
+
+    or a test can switch modes explicitly with set_mcc_latency().
+    """
+    mode: LatencyMode = LatencyMode.RANDOM
+    fast_cycles: int = DEFAULT_FAST_CYCLES
+    seed: int = DEFAULT_LATENCY_SEED
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.mode == LatencyMode.MODEL:
+            self.rng = random.Random(self.seed)
+        else:
+            self.rng = random.Random()
+
+    @classmethod
+    def from_env(cls) -> "MccLatency":
+        """Build the model from MCC_LATENCY / MCC_FAST_CYCLES / MCC_LATENCY_SEED"""
+        mode_str = os.environ.get(MCC_LATENCY_ENV, LatencyMode.RANDOM.value).lower()
+        try:
+            mode = LatencyMode(mode_str)
+        except ValueError:
+            mode = LatencyMode.RANDOM
+        fast_cycles = int(os.environ.get(MCC_FAST_CYCLES_ENV, DEFAULT_FAST_CYCLES))
+        seed = int(os.environ.get(MCC_LATENCY_SEED_ENV, DEFAULT_LATENCY_SEED))
+        return cls(mode=mode, fast_cycles=fast_cycles, seed=seed)
+
+    def delay_ms(self, override_ms: Optional[float], delay_range) -> float:
+        """
+        Delay to apply, in ms (unused in FAST mode).
+
+        An explicit override always wins; otherwise the delay is drawn from
+        `delay_range` (seeded in MODEL mode).
+        """
+        if override_ms is not None:
+            return override_ms
+        return self.rng.uniform(*delay_range)
+
+    async def wait(self, dut, override_ms: Optional[float], delay_range) -> Optional[float]:
+        """
+        Wait out one network delay.
+
+        Returns:
+            The delay in ms, or None in FAST mode (waited `fast_cycles` clocks)
+        """
+        if self.mode == LatencyMode.FAST:
+            if self.fast_cycles > 0:
+                await ClockCycles(_mcc_clk(dut), self.fast_cycles)
+            return None
+
+        delay = self.delay_ms(override_ms, delay_range)
+        if delay > 0:
+            await Timer(int(delay * 1_000_000), units="ns")
+        return delay
+
+
+_mcc_latency: Optional[MccLatency] = None
+
+
+def get_mcc_latency() -> MccLatency:
+    """Current suite-wide latency model (created from the environment on first use)"""
+    global _mcc_latency
+    if _mcc_latency is None:
+        _mcc_latency = MccLatency.from_env()
+    return _mcc_latency
+
+
+def set_mcc_latency(mode: LatencyMode, fast_cycles: int = DEFAULT_FAST_CYCLES,
+                    seed: int = DEFAULT_LATENCY_SEED) -> MccLatency:
+    """
+    Override the latency model for the rest of the simulation.
+
+    MODEL mode restarts its seeded sequence, so calling this at the start of
+    a test makes that test's delays independent of earlier tests.
+
+    Example:
+        set_mcc_latency(LatencyMode.MODEL, seed=42)
+    """
+    global _mcc_latency
+    _mcc_latency = MccLatency(mode=mode, fast_cycles=fast_cycles, seed=seed)
+    return _mcc_latency
+
+
+def _mcc_clk(dut):
+    return dut.Clk if hasattr(dut, "Clk") else dut.clk
+
+
+class MccRegisterFile:
+    """
+    Cached Control register handles of one DUT.
+
+    `getattr(dut, "ControlN")` walks the simulator hierarchy every time;
+    this resolves each handle once, which keeps the per-register reads of
+    mcc_write_regs(diff_only=True) cheap.
+    Obtain it with mcc_regs(dut) rather than constructing it directly.
+    """
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.handles: Dict[int, object] = {}
+
+    def handle(self, reg_num: int):
+        handle = self.handles.get(reg_num)
+        if handle is None:
+            handle = self.handles[reg_num] = getattr(self.dut, f"Control{reg_num}")
+        return handle
+
+    def write(self, reg_num: int, value: int):
+        """Set one register (takes effect with the other writes of this delta cycle)"""
+        self.handle(reg_num).value = value
+
+    def read(self, reg_num: int) -> int:
+        return int(self.handle(reg_num).value)
+
+    def read_resolved(self, reg_num: int) -> Optional[int]:
+        """Current value, or None while the register is unresolved (X/U)"""
+        try:
+            return self.read(reg_num)
+        except ValueError:
+            return None
+
+
+# One register file per DUT (cocotb runs a single DUT per simulation)
+_mcc_register_files: Dict[int, MccRegisterFile] = {}
+
+
+def mcc_regs(dut) -> MccRegisterFile:
+    """Cached MccRegisterFile for `dut`"""
+    regs = _mcc_register_files.get(id(dut))
+    if regs is None or regs.dut is not dut:
+        regs = _mcc_register_files[id(dut)] = MccRegisterFile(dut)
+    return regs
+
+
+def _format_reg_image(image: Dict[int, int]) -> str:
+    return " ".join(f"CR{reg_num}=0x{value:08X}" for reg_num, value in sorted(image.items()))
+
+
+async def mcc_write_regs(dut, control_regs, diff_only=True,
+                         set_mcc_ready=False,
+                         simulate_network_delay=False,
+                         total_delay_ms=None,
+                         settle_cycles=2):
+    """
+    Apply a whole Control register image in a single delta cycle
+
+    Bulk counterpart of mcc_set_regs() for reconfiguration-heavy tests
+    (intensity sweeps, runtime updates): all registers are written with no
+    await in between, so the DUT sees them change together - like one
+    atomic update - and only one summary line is logged.
+
+    Args:
+        dut: Device Under Test (CustomWrapper entity)
+        control_regs: Dict of {reg_num: value} to apply
+        diff_only: Skip registers that already hold the value on the DUT,
+                   however they were written (default: True). Direct
+                   writes become visible after the next await.
+        set_mcc_ready: Write CR0 with bit 31 cleared, then set CR0[31]=1
+                       after settling, like mcc_set_regs() (default: False)
+        simulate_network_delay: Wait one network delay before the update
+                                (one transaction, so no per-register delay)
+        total_delay_ms: Override that delay (see MccLatency)
+        settle_cycles: Clock cycles to wait after the update (default: 2)
+
+    Returns:
+        Dict of {reg_num: value} actually written
+
+    Example - Intensity sweep:
+        for level in range(0, 0x8000, 0x1000):
+            await mcc_write_regs(dut, {**base_image, 5: level})
+            ...
+    """
+    regs = mcc_regs(dut)
+
+    if simulate_network_delay:
+        await get_mcc_latency().wait(dut, total_delay_ms, NETWORK_DELAY_MS)
+
+    image = {}
+    for reg_num, value in control_regs.items():
+        if reg_num == 0 and set_mcc_ready:
+            value = value & 0x7FFFFFFF  # MCC_READY is set after settling
+        image[reg_num] = value
+    if diff_only:
+        image = {n: v for n, v in image.items() if regs.read_resolved(n) != v}
+
+    for reg_num, value in image.items():
+        regs.write(reg_num, value)
+
+    unchanged = len(control_regs) - len(image)
+    if image:
+        dut._log.info(f"⚡ Control ← {_format_reg_image(image)}"
+                      + (f" ({unchanged} unchanged)" if unchanged else ""))
+
+    clk = _mcc_clk(dut)
+    if settle_cycles > 0:
+        await ClockCycles(clk, settle_cycles)
+
+    if set_mcc_ready:
+        cr0_ready = regs.read(0) | 0x80000000
+        validate_control0(cr0_ready, context="mcc_write_regs()")
+        regs.write(0, cr0_ready)
+        dut._log.info(f"✓ MCC_READY asserted (CR0 = 0x{cr0_ready:08X})")
+        await ClockCycles(clk, 2)
+
+    return image
+
+
 async def mcc_set_regs(dut, control_regs,
                        set_mcc_ready=True,
                        simulate_network_delay=True,
@@ -529,10 +947,13 @@ async def mcc_set_regs(dut, control_regs,
     This simulates the real-world MCC register update process over network.
     Use this for BOTH initial configuration and runtime register updates.
 
-    Network Latency Simulation:
+    Network Latency Simulation (see MccLatency / MCC_LATENCY):
     - Total delay before first write: 10-200ms (random if not specified)
     - Per-register delay: 1-10ms (random if not specified)
     - Realistic for Moku network communication
+    - MCC_LATENCY=model draws the same ranges from a seeded RNG
+    - MCC_LATENCY=fast replaces every delay (including explicit ones) with
+      MCC_FAST_CYCLES clock cycles
 
     MCC_READY Convention (CR0[31]):
     - CR0[31] = 0: Module disabled (safe during "all-zero" bitstream load)
@@ -570,17 +991,14 @@ async def mcc_set_regs(dut, control_regs,
         await mcc_set_regs(dut, {...},
                           simulate_network_delay=False)  # No delay, immediate update
     """
-    import random
-    from cocotb.triggers import Timer, ClockCycles
+    latency = get_mcc_latency()
+    regs = mcc_regs(dut)
 
     # Total delay before starting register writes
-    if simulate_network_delay and total_delay_ms is None:
-        total_delay_ms = random.uniform(10, 200)  # 10-200ms realistic range
-
-    if simulate_network_delay and total_delay_ms > 0:
-        delay_ns = int(total_delay_ms * 1_000_000)
-        dut._log.info(f"⏱  Network latency: {total_delay_ms:.1f}ms")
-        await Timer(delay_ns, units="ns")
+    if simulate_network_delay:
+        delay = await latency.wait(dut, total_delay_ms, NETWORK_DELAY_MS)
+        if delay:
+            dut._log.info(f"⏱  Network latency: {delay:.1f}ms")
 
     # Write each register with optional per-register delay
     for reg_num, value in sorted(control_regs.items()):
@@ -588,30 +1006,24 @@ async def mcc_set_regs(dut, control_regs,
         if reg_num == 0 and set_mcc_ready:
             value = value & 0x7FFFFFFF  # Clear bit 31
 
-        getattr(dut, f"Control{reg_num}").value = value
+        regs.write(reg_num, value)
         dut._log.info(f"  Control{reg_num} ← 0x{value:08X}")
 
         # Per-register delay (simulate sequential network writes)
         if simulate_network_delay:
-            if per_reg_delay_ms is None:
-                delay = random.uniform(1, 10)  # 1-10ms per register
-            else:
-                delay = per_reg_delay_ms
-
-            if delay > 0:
-                await Timer(int(delay * 1_000_000), units="ns")
+            await latency.wait(dut, per_reg_delay_ms, PER_REG_DELAY_MS)
 
     await ClockCycles(dut.Clk, 2)
 
     # Set MCC_READY flag (CR0[31]=1) to enable module
     if set_mcc_ready:
-        cr0_current = int(dut.Control0.value)
+        cr0_current = regs.read(0)
         cr0_ready = cr0_current | 0x80000000  # Set bit 31
 
         # Validate Control0 has all 3 required bits (warns if ClkEn missing)
         validate_control0(cr0_ready, context="mcc_set_regs()")
 
-        dut.Control0.value = cr0_ready
+        regs.write(0, cr0_ready)
         dut._log.info(f"✓ MCC_READY asserted (CR0 = 0x{cr0_ready:08X})")
         await ClockCycles(dut.Clk, 2)
 
@@ -687,6 +1099,33 @@ async def wait_for_first_clk_en(dut, clk_en_signal="clk_en", timeout_cycles=1000
     return False
 
 
+async def wait_for_first_clk_en_by_edge(dut, clk_en_signal="clk_en", timeout_cycles=1000):
+    """
+    Edge-triggered wait_for_first_clk_en() (wakes up on clk_en changes only)
+
+    Args:
+        dut: Device Under Test
+        clk_en_signal: Name of clock enable signal (default: "clk_en")
+        timeout_cycles: Maximum cycles to wait (default: 1000)
+
+    Returns:
+        bool: True if pulse detected, False if timeout
+
+    Example:
+        success = await wait_for_first_clk_en_by_edge(dut, timeout_cycles=100_000)
+    """
+    clk = _mcc_clk(dut)
+    clk_en = getattr(dut, clk_en_signal)
+
+    _, cycle = await _sample_changes(clk_en, clk, timeout_cycles, until=lambda value: value == 1)
+    if cycle is not None:
+        dut._log.info(f"✓ First clk_en pulse detected (after {cycle} cycles)")
+        return True
+
+    dut._log.warning(f"✗ Timeout: No clk_en pulse detected in {timeout_cycles} cycles")
+    return False
+
+
 async def mcc_disable(dut, simulate_network_delay=True, delay_ms=None):
     """
     Safely disable MCC module by clearing CR0[31] (MCC_READY flag)
@@ -699,7 +1138,7 @@ async def mcc_disable(dut, simulate_network_delay=True, delay_ms=None):
     Args:
         dut: Device Under Test (CustomWrapper)
         simulate_network_delay: Enable network latency (default: True)
-        delay_ms: Override delay (default: 1-10ms random)
+        delay_ms: Override delay (default: 1-10ms random; ignored with MCC_LATENCY=fast)
 
     Returns:
         None
@@ -712,17 +1151,13 @@ async def mcc_disable(dut, simulate_network_delay=True, delay_ms=None):
     Example - Immediate disable (no network delay):
         await mcc_disable(dut, simulate_network_delay=False)
     """
-    import random
-    from cocotb.triggers import Timer, ClockCycles
-
     if simulate_network_delay:
-        if delay_ms is None:
-            delay_ms = random.uniform(1, 10)
-        await Timer(int(delay_ms * 1_000_000), units="ns")
+        await get_mcc_latency().wait(dut, delay_ms, PER_REG_DELAY_MS)
 
-    cr0_current = int(dut.Control0.value)
+    regs = mcc_regs(dut)
+    cr0_current = regs.read(0)
     cr0_disabled = cr0_current & 0x7FFFFFFF  # Clear bit 31
-    dut.Control0.value = cr0_disabled
+    regs.write(0, cr0_disabled)
 
     clk = dut.Clk if hasattr(dut, "Clk") else dut.clk
     await ClockCycles(clk, 2)
@@ -11,6 +11,12 @@ Author: EZ-EMFI Team
 Date: 2025-10-28
 """
 
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from models.reference import DS1140_OBSERVER
+
 MODULE_NAME = "DS1140-PD"
 
 # Default clock period
@@ -33,6 +39,12 @@ class TestValues:
     P2_FIRING_DURATION = 16
     P2_COOLING_DURATION = 16
     P2_WAIT_CYCLES = 50
+    FULL_CYCLE_CAPTURE_CYCLES = 60  # Recorded window of the full-cycle test (covers all of it)
+    FULL_CYCLE_STATES = ["READY", "ARMED", "FIRING", "COOLING", "DONE", "READY"]
+
+    # P3 constrained-random scenarios (override: DS1140_RANDOM_COUNT / DS1140_RANDOM_SEED)
+    P3_RANDOM_SCENARIOS = 20
+    P3_RANDOM_SEED = 0
 
     # Voltage values (16-bit signed, ±5V full scale)
     DEFAULT_THRESHOLD = 0x3DCF  # 2.4V
@@ -40,14 +52,16 @@ class TestValues:
     INTENSITY_ABOVE_CLAMP = 0x7000  # Way above 3.0V limit
     MAX_INTENSITY_3V0 = 0x4CCD  # 3.0V clamp limit
 
-    # FSM state voltages (from fsm_observer, NUM_STATES=8, V_MAX=2.5V)
-    # Voltage = state * (2.5V / 7) for states 0-6
-    FSM_VOLTAGE_READY = 0.0      # State 0
-    FSM_VOLTAGE_ARMED = 0.357    # State 1: ~2.5/7
-    FSM_VOLTAGE_FIRING = 0.714   # State 2: ~2*2.5/7
-    FSM_VOLTAGE_COOLING = 1.071  # State 3: ~3*2.5/7
-    FSM_VOLTAGE_DONE = 1.429     # State 4: ~4*2.5/7
-    FSM_VOLTAGE_TIMEDOUT = 1.786 # State 5: ~5*2.5/7
+    # FSM state voltages from the fsm_observer reference model
+    # (NUM_STATES=8, FAULT_STATE_THRESHOLD=7 → 7 normal states, 2.5V / 6 per step)
+    FSM_OBSERVER = DS1140_OBSERVER.table()
+    FSM_VOLTAGE_READY = FSM_OBSERVER.voltage(0)     # State 0: 0.0V
+    FSM_VOLTAGE_ARMED = FSM_OBSERVER.voltage(1)     # State 1: ~0.417V
+    FSM_VOLTAGE_FIRING = FSM_OBSERVER.voltage(2)    # State 2: ~0.833V
+    FSM_VOLTAGE_COOLING = FSM_OBSERVER.voltage(3)   # State 3: 1.25V
+    FSM_VOLTAGE_DONE = FSM_OBSERVER.voltage(4)      # State 4: ~1.667V
+    FSM_VOLTAGE_TIMEDOUT = FSM_OBSERVER.voltage(5)  # State 5: ~2.083V
+    FSM_CODE_TOLERANCE = 16  # Digital counts when decoding OutputC back to a state
 
 class ErrorMessages:
     """Error message templates"""
@@ -56,3 +70,5 @@ class ErrorMessages:
     VOLTAGE_OUT_OF_RANGE = "Voltage {} out of expected range [{}, {}]"
     OUTPUT_NOT_CLAMPED = "Intensity should be clamped to {}V, got {}V"
     THREE_OUTPUTS_FAILED = "Three outputs test failed: OutputA={}, OutputB={}, OutputC={}"
+    RECORDER_MISMATCH = "WaveformRecorder OutputC {} != per-cycle capture {}"
+    STATE_SEQUENCE = "Expected FSM states {} on OutputC, got {}"
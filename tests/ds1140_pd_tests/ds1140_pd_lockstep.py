@@ -0,0 +1,168 @@
+"""
+Lockstep comparison of DS1140_PD_volo_main against the Python cycle model.
+
+A background coroutine samples the DUT input ports on every rising edge of
+Clk, steps models.reference.DS1140Model with them, and compares OutputA/B/C
+once the edge has settled (ReadOnly). Comparison starts at the first edge
+that samples Reset = 1, so uninitialized signals before the first reset
+are ignored.
+
+Enable with DS1140_LOCKSTEP=1 (or `python tests/run.py ds1140_pd_volo --lockstep`).
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sys
+from typing import List, Optional
+
+import cocotb
+from cocotb.triggers import ReadOnly, RisingEdge
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from models.reference.ds1140_pd import DS1140Inputs, DS1140Model, DS1140State
+
+try:
+    from cocotb.simtime import get_sim_time  # cocotb 2.x
+except ImportError:
+    from cocotb.utils import get_sim_time
+
+
+MAX_REPORTED_MISMATCHES = 10
+
+# DS1140Inputs field -> DUT port
+INPUT_PORTS = {
+    "reset": "Reset",
+    "enable": "Enable",
+    "arm_probe": "arm_probe",
+    "force_fire": "force_fire",
+    "reset_fsm": "reset_fsm",
+    "clock_divider": "clock_divider",
+    "arm_timeout": "arm_timeout",
+    "firing_duration": "firing_duration",
+    "cooling_duration": "cooling_duration",
+    "trigger_threshold": "trigger_threshold",
+    "intensity": "intensity",
+    "input_a": "InputA",
+}
+
+# DS1140Outputs field -> DUT port (signed 16-bit)
+OUTPUT_PORTS = {
+    "output_a": "OutputA",
+    "output_b": "OutputB",
+    "output_c": "OutputC",
+}
+
+
+def lockstep_enabled() -> bool:
+    return os.environ.get("DS1140_LOCKSTEP", "0") not in ("", "0")
+
+
+@dataclass
+class LockstepMismatch:
+    """One output that differed from the model after a clock edge"""
+    cycle: int
+    time_ns: float
+    port: str
+    rtl: Optional[int]       # None = unresolved (X/U)
+    model: int
+    model_state: int
+
+    def __str__(self) -> str:
+        rtl = "X" if self.rtl is None else self.rtl
+        return (f"cycle {self.cycle} ({self.time_ns:.0f}ns): {self.port} RTL={rtl} "
+                f"model={self.model} (model state {DS1140State(self.model_state).name})")
+
+
+class DS1140Lockstep:
+    """
+    Check DUT outputs against DS1140Model on every clock edge.
+
+    Usage:
+        lockstep = DS1140Lockstep(dut)
+        lockstep.start()
+        ...                       # drive the DUT as usual
+        lockstep.check("Arm and trigger")   # raises on mismatches since the last check
+    """
+
+    def __init__(self, dut, model: Optional[DS1140Model] = None):
+        self.dut = dut
+        self.model = model or DS1140Model()
+        self.inputs = {field: getattr(dut, port) for field, port in INPUT_PORTS.items()}
+        self.outputs = {field: getattr(dut, port) for field, port in OUTPUT_PORTS.items()}
+        self.synced = False
+        self.cycles = 0              # Edges seen since start()
+        self.checked_cycles = 0      # Edges compared against the model
+        self.mismatches: List[LockstepMismatch] = []
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = cocotb.start_soon(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            if hasattr(self._task, "cancel"):
+                self._task.cancel()
+            else:
+                self._task.kill()  # cocotb 1.x
+            self._task = None
+
+    def _sample_inputs(self) -> Optional[DS1140Inputs]:
+        try:
+            return DS1140Inputs(**{field: int(h.value) for field, h in self.inputs.items()})
+        except ValueError:
+            return None  # Unresolved input: model can't follow
+
+    async def _run(self):
+        clk = self.dut.Clk
+        while True:
+            await RisingEdge(clk)
+            self.cycles += 1
+            inputs = self._sample_inputs()  # Values the RTL sampled on this edge
+
+            if inputs is None:
+                self.synced = False
+                continue
+            if not self.synced:
+                if not inputs.reset:
+                    continue
+                self.synced = True
+            expected = self.model.step(inputs)
+
+            await ReadOnly()
+            self.checked_cycles += 1
+            for field, handle in self.outputs.items():
+                try:
+                    raw = int(handle.value)
+                    rtl = ((raw + 0x8000) & 0xFFFF) - 0x8000
+                except ValueError:
+                    rtl = None
+                model = getattr(expected, field)
+                if rtl != model:
+                    self.mismatches.append(LockstepMismatch(
+                        self.cycles, get_sim_time("ns"), OUTPUT_PORTS[field], rtl, model, expected.state))
+
+    def check(self, context: str = ""):
+        """
+        Raise AssertionError if any mismatch was seen since the last check.
+
+        Args:
+            context: Label for the error message (e.g. the sub-test name)
+        """
+        if not self.mismatches:
+            return
+        mismatches, self.mismatches = self.mismatches, []
+        lines = [str(m) for m in mismatches[:MAX_REPORTED_MISMATCHES]]
+        if len(mismatches) > MAX_REPORTED_MISMATCHES:
+            lines.append(f"... {len(mismatches) - MAX_REPORTED_MISMATCHES} more")
+        prefix = f"{context}: " if context else ""
+        raise AssertionError(f"{prefix}{len(mismatches)} lockstep mismatches vs DS1140Model\n  "
+                             + "\n  ".join(lines))
@@ -0,0 +1,432 @@
+"""
+Seeded constrained-random stimulus for the DS1140-PD register space.
+
+Each scenario is a random register image (clock divider, arm timeout,
+firing/cooling durations, trigger threshold, intensity) plus a short
+input timeline (reset, optional spurious trigger, arm, then a threshold
+trigger, force fire or nothing, optionally reset_fsm). Values respect the
+ds1140_pd_pkg limits (MAX_FIRING_CYCLES, MIN_COOLING_CYCLES,
+MAX_ARM_TIMEOUT, MAX_INTENSITY_3V0) unless an illegal rate is requested to
+exercise the RTL clamps.
+
+Scenario i of seed s depends only on (s, i). Any slice of a run can
+therefore be regenerated on its own, e.g. to shard a CI job or replay one
+failure, and generation costs one small Random() per scenario.
+
+The same timeline drives three consumers:
+    drive_scenario()    the cocotb DUT (DS1140_PD_volo_main friendly signals)
+    predict()           DS1140Model, one scenario
+    run_batch()         DS1140BatchModel, thousands of scenarios at once
+
+Usage:
+    gen = DS1140StimulusGenerator(seed=7, constraints=RTL_CONSTRAINTS)
+    coverage = FieldCoverage()
+    for scenario in gen.batch(20):
+        coverage.sample(scenario)
+        await drive_scenario(dut, scenario)
+        ...
+    for line in coverage.report():
+        dut._log.info(line)
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass, fields, replace
+from enum import IntEnum
+from pathlib import Path
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from ds1140_pd_tests.ds1140_pd_lockstep import INPUT_PORTS
+from models.reference.ds1140_pd import (
+    MAX_ARM_TIMEOUT,
+    MAX_FIRING_CYCLES,
+    MAX_INTENSITY_3V0,
+    MIN_COOLING_CYCLES,
+    TRIGGER_HYSTERESIS,
+    DS1140BatchModel,
+    DS1140Inputs,
+    DS1140Model,
+    DS1140Outputs,
+    DS1140State,
+)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+RESET_EDGES = 2
+GLITCH_EDGES = 3
+SETTLE_STEPS = 8         # Extra divided FSM steps at the end of each scenario
+CORNER_RATE = 0.25       # Probability of picking a corner value for a field
+
+
+class ScenarioKind(IntEnum):
+    """What happens after arming"""
+    TRIGGER = 0     # InputA crosses trigger_threshold
+    FORCE = 1       # force_fire held high
+    TIMEOUT = 2     # Nothing: arm timeout expires
+    SPURIOUS = 3    # InputA crosses before arming, then timeout
+
+
+@dataclass(frozen=True)
+class FieldRange:
+    """Legal range of one register field, and the wider range of its register bits"""
+    lo: int
+    hi: int
+    reg_lo: int
+    reg_hi: int
+    corners: Tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class StimulusConstraints:
+    """
+    Field ranges for a stimulus run.
+
+    DEFAULT_CONSTRAINTS spans the full ds1140_pd_pkg limits (for the batch
+    model); RTL_CONSTRAINTS keeps arm timeout and divider small so every
+    scenario finishes in a few hundred clock cycles under GHDL.
+    """
+    clock_divider: FieldRange = FieldRange(0, 15, 0, 0xFF, (0, 1, 15))
+    arm_timeout: FieldRange = FieldRange(0, MAX_ARM_TIMEOUT, 0, 0xFFFF, (0, 1, MAX_ARM_TIMEOUT))
+    firing_duration: FieldRange = FieldRange(0, MAX_FIRING_CYCLES, 0, 0xFF,
+                                             (0, 1, MAX_FIRING_CYCLES - 1, MAX_FIRING_CYCLES))
+    cooling_duration: FieldRange = FieldRange(MIN_COOLING_CYCLES, 0xFF, 0, 0xFF,
+                                              (MIN_COOLING_CYCLES, MIN_COOLING_CYCLES + 1, 0xFF))
+    trigger_threshold: FieldRange = FieldRange(-0x8000, 0x7FFF, -0x8000, 0x7FFF,
+                                               (-0x8000, 0, 0x3DCF, 0x7FFF))
+    intensity: FieldRange = FieldRange(-MAX_INTENSITY_3V0, MAX_INTENSITY_3V0, -0x8000, 0x7FFF,
+                                       (-MAX_INTENSITY_3V0, 0, MAX_INTENSITY_3V0))
+    max_trigger_delay: int = 16      # Divided FSM steps between arming and the trigger
+    illegal_rate: float = 0.0        # Probability of a field outside its legal range
+    reset_fsm_rate: float = 0.5      # Probability of ending with a reset_fsm pulse
+
+
+DEFAULT_CONSTRAINTS = StimulusConstraints()
+RTL_CONSTRAINTS = StimulusConstraints(
+    clock_divider=FieldRange(0, 3, 0, 0xFF, (0, 1, 3)),
+    arm_timeout=FieldRange(0, 32, 0, 0xFFFF, (0, 1, 32)),
+    cooling_duration=FieldRange(MIN_COOLING_CYCLES, 24, 0, 0xFF, (MIN_COOLING_CYCLES, 24)),
+    max_trigger_delay=8,
+)
+
+REGISTER_FIELDS = ("clock_divider", "arm_timeout", "firing_duration",
+                   "cooling_duration", "trigger_threshold", "intensity")
+
+
+@dataclass(frozen=True)
+class DS1140Scenario:
+    """One randomized register image and input timeline"""
+    seed: int
+    index: int
+    kind: ScenarioKind
+    clock_divider: int
+    arm_timeout: int
+    firing_duration: int
+    cooling_duration: int
+    trigger_threshold: int       # Signed
+    intensity: int               # Signed
+    trigger_delay: int           # Divided FSM steps after arming
+    reset_fsm_at_end: bool
+
+    @property
+    def div_value(self) -> int:
+        """Clock edges per FSM step (volo_clk_divider)"""
+        return (self.clock_divider & 0xF) or 1
+
+    def control_regs(self) -> Dict[int, int]:
+        """Register image as CR20-CR28 values (DS1140_PD_volo_shim bit layout)"""
+        return {
+            20: 0, 21: 0, 22: 0,
+            23: (self.clock_divider & 0xFF) << 24,
+            24: (self.arm_timeout & 0xFFFF) << 16,
+            25: (self.firing_duration & 0xFF) << 24,
+            26: (self.cooling_duration & 0xFF) << 24,
+            27: (self.trigger_threshold & 0xFFFF) << 16,
+            28: (self.intensity & 0xFFFF) << 16,
+        }
+
+    def _levels(self) -> Tuple[int, int]:
+        """InputA below the hysteresis band, and InputA above the threshold"""
+        low = max(-0x8000, self.trigger_threshold - 2 * TRIGGER_HYSTERESIS)
+        high = min(0x7FFF, self.trigger_threshold + 0x80)
+        return low, high
+
+    def segments(self) -> List[Tuple[int, DS1140Inputs]]:
+        """
+        Input timeline as (edges, inputs) segments.
+
+        Always the same 8 segments (zero-length when unused) so the batch
+        runner can index them per scenario.
+        """
+        base = DS1140Inputs(
+            clock_divider=self.clock_divider & 0xFF,
+            arm_timeout=self.arm_timeout & 0xFFFF,
+            firing_duration=self.firing_duration & 0xFF,
+            cooling_duration=self.cooling_duration & 0xFF,
+            trigger_threshold=self.trigger_threshold & 0xFFFF,
+            intensity=self.intensity & 0xFFFF,
+        )
+        low, high = (v & 0xFFFF for v in self._levels())
+        div = self.div_value
+        spurious = self.kind == ScenarioKind.SPURIOUS
+        fire_steps = min(self.firing_duration & 0xFF, MAX_FIRING_CYCLES) + 1
+        cool_steps = max(self.cooling_duration & 0xFF, MIN_COOLING_CYCLES) + 1
+        action_steps = (self.arm_timeout & 0xFFF) + fire_steps + cool_steps + SETTLE_STEPS
+
+        action = replace(base, input_a=low)
+        if self.kind == ScenarioKind.TRIGGER:
+            action = replace(base, input_a=high)
+        elif self.kind == ScenarioKind.FORCE:
+            action = replace(base, input_a=low, force_fire=1)
+
+        return [
+            (RESET_EDGES, replace(base, reset=1, input_a=low)),
+            (GLITCH_EDGES if spurious else 0, replace(base, input_a=high)),
+            (GLITCH_EDGES if spurious else 0, replace(base, input_a=low)),
+            (div + 1, replace(base, arm_probe=1, input_a=low)),
+            (self.trigger_delay * div, replace(base, input_a=low)),
+            (action_steps * div, action),
+            ((div + 1) if self.reset_fsm_at_end else 0, replace(base, reset_fsm=1, input_a=low)),
+            (2 * div + 2, replace(base, input_a=low)),
+        ]
+
+    @property
+    def total_edges(self) -> int:
+        return sum(edges for edges, _ in self.segments())
+
+    def describe(self) -> str:
+        return (f"#{self.index} {self.kind.name} div={self.clock_divider} timeout={self.arm_timeout} "
+                f"fire={self.firing_duration} cool={self.cooling_duration} "
+                f"thr=0x{self.trigger_threshold & 0xFFFF:04X} int=0x{self.intensity & 0xFFFF:04X} "
+                f"delay={self.trigger_delay}{' +reset_fsm' if self.reset_fsm_at_end else ''}")
+
+
+class DS1140StimulusGenerator:
+    """
+    Reproducible constrained-random DS1140 scenarios.
+
+    Args:
+        seed: Run seed; scenario i is a pure function of (seed, i, constraints)
+        constraints: Field ranges (default: full ds1140_pd_pkg limits)
+        kinds: Scenario kinds to draw from (uniformly)
+    """
+
+    def __init__(self, seed: int = 0, constraints: StimulusConstraints = DEFAULT_CONSTRAINTS,
+                 kinds: Sequence[ScenarioKind] = tuple(ScenarioKind)):
+        self.seed = seed
+        self.constraints = constraints
+        self.kinds = tuple(kinds)
+
+    def _field(self, rng: random.Random, spec: FieldRange) -> int:
+        c = self.constraints
+        if c.illegal_rate and rng.random() < c.illegal_rate:
+            illegal = [(spec.reg_lo, spec.lo - 1), (spec.hi + 1, spec.reg_hi)]
+            illegal = [(lo, hi) for lo, hi in illegal if lo <= hi]
+            if illegal:
+                lo, hi = rng.choice(illegal)
+                return rng.randint(lo, hi)
+        if spec.corners and rng.random() < CORNER_RATE:
+            corners = [v for v in spec.corners if spec.lo <= v <= spec.hi]
+            if corners:
+                return rng.choice(corners)
+        return rng.randint(spec.lo, spec.hi)
+
+    def scenario(self, index: int) -> DS1140Scenario:
+        # String seeds hash with SHA-512: stable across processes and Python runs
+        rng = random.Random(f"ds1140:{self.seed}:{index}")
+        c = self.constraints
+        values = {name: self._field(rng, getattr(c, name)) for name in REGISTER_FIELDS}
+        return DS1140Scenario(
+            seed=self.seed,
+            index=index,
+            kind=rng.choice(self.kinds),
+            trigger_delay=rng.randint(0, c.max_trigger_delay),
+            reset_fsm_at_end=rng.random() < c.reset_fsm_rate,
+            **values,
+        )
+
+    def batch(self, count: int, start: int = 0) -> List[DS1140Scenario]:
+        """Scenarios start .. start + count - 1"""
+        return [self.scenario(i) for i in range(start, start + count)]
+
+    def __iter__(self) -> Iterator[DS1140Scenario]:
+        index = 0
+        while True:
+            yield self.scenario(index)
+            index += 1
+
+
+# ----------------------------------------------------------------------
+# Coverage
+# ----------------------------------------------------------------------
+
+# (label, lo, hi) inclusive, per field
+FIELD_BINS: Dict[str, Tuple[Tuple[str, int, int], ...]] = {
+    "clock_divider": tuple((str(d), d, d) for d in range(16)) + (("upper bits", 16, 0xFF),),
+    "arm_timeout": (("0", 0, 0), ("1-15", 1, 15), ("16-255", 16, 255),
+                    ("256-4094", 256, MAX_ARM_TIMEOUT - 1), ("max", MAX_ARM_TIMEOUT, MAX_ARM_TIMEOUT),
+                    (">12 bit", MAX_ARM_TIMEOUT + 1, 0xFFFF)),
+    "firing_duration": (("0", 0, 0), ("1-7", 1, 7), ("8-31", 8, MAX_FIRING_CYCLES - 1),
+                        ("max", MAX_FIRING_CYCLES, MAX_FIRING_CYCLES), ("clamped", MAX_FIRING_CYCLES + 1, 0xFF)),
+    "cooling_duration": (("clamped", 0, MIN_COOLING_CYCLES - 1), ("min", MIN_COOLING_CYCLES, MIN_COOLING_CYCLES),
+                         ("9-31", MIN_COOLING_CYCLES + 1, 31), ("32-127", 32, 127), ("128-255", 128, 0xFF)),
+    "trigger_threshold": (("negative", -0x8000, -1), ("0-0xFF", 0, 0xFF), ("0x100-0x3FFF", 0x100, 0x3FFF),
+                          ("0x4000-0x7EFF", 0x4000, 0x7EFF), ("top", 0x7F00, 0x7FFF)),
+    "intensity": (("clamped low", -0x8000, -MAX_INTENSITY_3V0 - 1),
+                  ("-max", -MAX_INTENSITY_3V0, -MAX_INTENSITY_3V0),
+                  ("negative", -MAX_INTENSITY_3V0 + 1, -1), ("0", 0, 0),
+                  ("positive", 1, MAX_INTENSITY_3V0 - 1), ("max", MAX_INTENSITY_3V0, MAX_INTENSITY_3V0),
+                  ("clamped high", MAX_INTENSITY_3V0 + 1, 0x7FFF)),
+    "kind": tuple((k.name, int(k), int(k)) for k in ScenarioKind),
+    "outcome": tuple((s.name, int(s), int(s)) for s in DS1140State),
+}
+
+
+class FieldCoverage:
+    """
+    Hit counts per coverage bin of every register field.
+
+    sample() takes a scenario (and optionally the final FSM state it
+    reached); merge() combines counters, e.g. from parallel jobs.
+    """
+
+    def __init__(self, bins: Dict[str, Tuple[Tuple[str, int, int], ...]] = FIELD_BINS):
+        self.bins = bins
+        self.hits: Dict[str, List[int]] = {name: [0] * len(b) for name, b in bins.items()}
+        self.samples = 0
+
+    def sample_value(self, name: str, value: int):
+        for i, (_, lo, hi) in enumerate(self.bins[name]):
+            if lo <= value <= hi:
+                self.hits[name][i] += 1
+                return
+
+    def sample(self, scenario: DS1140Scenario, outcome: Optional[int] = None):
+        self.samples += 1
+        for name in REGISTER_FIELDS:
+            self.sample_value(name, getattr(scenario, name))
+        self.sample_value("kind", int(scenario.kind))
+        if outcome is not None:
+            self.sample_value("outcome", int(outcome))
+
+    def merge(self, other: "FieldCoverage"):
+        for name, counts in other.hits.items():
+            self.hits[name] = [a + b for a, b in zip(self.hits[name], counts)]
+        self.samples += other.samples
+
+    def holes(self) -> List[str]:
+        """'field:bin' for every bin never hit"""
+        return [f"{name}:{self.bins[name][i][0]}"
+                for name, counts in self.hits.items() for i, n in enumerate(counts) if n == 0]
+
+    def percent(self) -> float:
+        total = sum(len(c) for c in self.hits.values())
+        hit = sum(1 for c in self.hits.values() for n in c if n)
+        return 100.0 * hit / total if total else 0.0
+
+    def report(self) -> List[str]:
+        """One line per field: bins hit and per-bin counts"""
+        lines = [f"Field coverage: {self.percent():.1f}% of bins over {self.samples} scenarios"]
+        for name, counts in self.hits.items():
+            hit = sum(1 for n in counts if n)
+            cells = " ".join(f"{label}={n}" for (label, _, _), n in zip(self.bins[name], counts))
+            lines.append(f"  {name:18s} {hit:2d}/{len(counts):<2d} {cells}")
+        return lines
+
+
+# ----------------------------------------------------------------------
+# Drivers
+# ----------------------------------------------------------------------
+
+def predict(scenario: DS1140Scenario, model: Optional[DS1140Model] = None) -> DS1140Outputs:
+    """Outputs of DS1140Model at the end of the scenario"""
+    model = model or DS1140Model()
+    out = model.outputs()
+    for edges, inputs in scenario.segments():
+        if edges:
+            out = model.run(inputs, edges)
+    return out
+
+
+async def drive_scenario(dut, scenario: DS1140Scenario):
+    """
+    Drive the scenario timeline into DS1140_PD_volo_main.
+
+    Each segment's inputs are written, then held for its edge count, so the
+    DUT samples exactly what predict() feeds the model.
+    """
+    from cocotb.triggers import ClockCycles
+
+    for edges, inputs in scenario.segments():
+        if not edges:
+            continue
+        for field, port in INPUT_PORTS.items():
+            getattr(dut, port).value = getattr(inputs, field)
+        await ClockCycles(dut.Clk, edges)
+
+
+@dataclass
+class BatchResult:
+    """Per-scenario results of run_batch() (NumPy arrays, one entry per scenario)"""
+    final: DS1140Outputs       # Outputs at each scenario's own last edge
+    visited: "np.ndarray"      # Bitmask of FSM states seen (1 << state)
+    edges: int                 # Edges simulated (longest scenario)
+
+    def outcome_counts(self) -> Dict[str, int]:
+        states, counts = np.unique(self.final.state, return_counts=True)
+        return {DS1140State(int(s)).name: int(n) for s, n in zip(states, counts)}
+
+
+def run_batch(scenarios: Sequence[DS1140Scenario]) -> BatchResult:
+    """
+    Run many scenarios together through DS1140BatchModel.
+
+    Each scenario follows its own segment timeline; shorter ones hold their
+    last segment until the longest finishes, and their outputs are captured
+    at their own final edge.
+
+    Raises:
+        RuntimeError: If numpy is not installed
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for run_batch() - use predict() per scenario")
+
+    n = len(scenarios)
+    seg_lists = [s.segments() for s in scenarios]
+    num_segments = len(seg_lists[0])
+    lengths = np.array([[edges for edges, _ in segs] for segs in seg_lists], dtype=np.int64)
+    ends = np.cumsum(lengths, axis=1)                       # (n, segments)
+    totals = ends[:, -1]
+    values = {
+        f.name: np.array([[getattr(inputs, f.name) for _, inputs in segs] for segs in seg_lists],
+                         dtype=np.int64)
+        for f in fields(DS1140Inputs)
+    }
+
+    model = DS1140BatchModel(n)
+    rows = np.arange(n)
+    visited = np.zeros(n, dtype=np.int64)
+    # Filled in per instance at its own final edge
+    initial = model.outputs()
+    final = DS1140Outputs(**{f.name: np.array(getattr(initial, f.name)) for f in fields(DS1140Outputs)})
+    boundaries = set(ends.ravel().tolist())   # Inputs only change where a segment ends
+    inputs = None
+    for edge in range(int(totals.max())):
+        if inputs is None or edge in boundaries:
+            segment = np.minimum((ends <= edge).sum(axis=1), num_segments - 1)
+            inputs = model.as_arrays(DS1140Inputs(**{name: v[rows, segment] for name, v in values.items()}))
+        out = model.step(inputs)
+        visited |= np.left_shift(1, out.state)
+        done = totals == edge + 1
+        if done.any():
+            for f in fields(DS1140Outputs):
+                getattr(final, f.name)[done] = getattr(out, f.name)[done]
+    return BatchResult(final=final, visited=visited, edges=int(totals.max()))
@@ -0,0 +1,336 @@
+"""
+Functional coverage of FSM state transitions for CocotB tests.
+
+FsmCoverage watches one state signal with an Edge trigger (no per-cycle
+polling) and records every distinct state change as a (from, to) pair in a
+N x N hit-count table; the compact bitmap of hit pairs is what gets
+merged. Observer outputs (OutputC) can be watched directly: the decoder
+maps each code back to its state, so fault states are recorded with the
+normal state they were entered from (observer fault paths).
+
+Register fields can be binned alongside: on every entry into
+`sample_state` (e.g. ARMED) the configured field signals are sampled into
+their bins, i.e. the configuration each FSM run actually used.
+
+TestBase integration (FSM_COVERAGE=1, or `python tests/run.py --coverage`):
+    self.add_fsm_coverage(FsmCoverage.for_observer("DS1140-PD", dut.OutputC, DS1140_OBSERVER, ...))
+
+TestBase starts the collectors with the test and writes
+<name>_coverage.json next to the timing artifacts. run.py merges the files
+of all (parallel) test processes and prints the transition matrix; the
+same merge is available standalone:
+
+    python tests/fsm_coverage.py tests/sim_build          # merge + print
+    python tests/fsm_coverage.py ci-job-*/coverage/*.json
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from array import array
+import json
+import os
+from pathlib import Path
+import sys
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import cocotb
+from cocotb.triggers import Edge, ReadOnly
+
+COVERAGE_SUFFIX = "_coverage.json"
+
+# (label, lo, hi) inclusive
+Bins = Tuple[Tuple[str, int, int], ...]
+
+
+def fsm_coverage_enabled() -> bool:
+    return os.environ.get("FSM_COVERAGE", "0") not in ("", "0")
+
+
+def _signed16(raw: int) -> int:
+    return ((raw + 0x8000) & 0xFFFF) - 0x8000
+
+
+class FsmCoverage:
+    """
+    Transition and register-field coverage of one FSM.
+
+    Args:
+        name: Coverage name (files with the same name merge together)
+        state_names: Name per state index; the matrix has one row/column each
+        legal: Expected (from, to) pairs; coverage % is over these, hits
+               outside are reported as unexpected
+        fields: Field name -> (signal handle, bins) sampled on entering sample_state
+        sample_state: State whose entry samples the fields (default: every change)
+        signal: State signal to watch (see for_observer / for_state_signal)
+        decode: Raw signal value -> (state, fault_from or None) (default: identity)
+    """
+
+    def __init__(self, name: str, state_names: Sequence[str],
+                 legal: Optional[Iterable[Tuple[int, int]]] = None,
+                 fields: Optional[Dict[str, Tuple[Any, Bins]]] = None,
+                 sample_state: Optional[int] = None,
+                 signal=None,
+                 decode: Optional[Callable[[int], Tuple[int, Optional[int]]]] = None):
+        self.name = name
+        self.state_names = tuple(state_names)
+        self.num_states = len(self.state_names)
+        self.legal: FrozenSet[Tuple[int, int]] = frozenset(legal or ())
+        self.transitions = array("I", bytes(4 * self.num_states * self.num_states))
+        self.field_handles = {name: handle for name, (handle, _) in (fields or {}).items()}
+        self.field_bins: Dict[str, Bins] = {name: bins for name, (_, bins) in (fields or {}).items()}
+        self.field_hits: Dict[str, array] = {name: array("I", bytes(4 * len(bins)))
+                                             for name, bins in self.field_bins.items()}
+        self.sample_state = sample_state
+        self.signal = signal
+        self.decode = decode or (lambda raw: (raw, None))
+        # Observer fault paths: counts of (last normal state -> fault state)
+        self.fault_paths = array("I", bytes(4 * self.num_states * self.num_states))
+        self.state: Optional[int] = None
+        self._task = None
+
+    @classmethod
+    def for_observer(cls, name: str, signal, observer, **kwargs) -> "FsmCoverage":
+        """
+        Coverage of an FSM seen through its fsm_observer output.
+
+        Args:
+            name: Coverage name
+            signal: Observer output port (e.g. dut.OutputC)
+            observer: models.reference ObserverConfig of the instance
+            **kwargs: legal / fields / sample_state
+        """
+        table = observer.table()
+        names = [table.state_name(s) for s in range(observer.num_states)]
+
+        def decode(raw: int) -> Tuple[int, Optional[int]]:
+            _, state, _, fault_from = table.decode(_signed16(raw))
+            return state, fault_from
+
+        return cls(name, names, signal=signal, decode=decode, **kwargs)
+
+    @classmethod
+    def for_state_signal(cls, name: str, signal, state_names: Sequence[str], **kwargs) -> "FsmCoverage":
+        """Coverage of an FSM from its (binary encoded) state register"""
+        return cls(name, state_names, signal=signal, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Watch the state signal (edge-triggered) until stop()"""
+        if self._task is None and self.signal is not None:
+            self._task = cocotb.start_soon(self._watch())
+
+    def stop(self):
+        if self._task is not None:
+            if hasattr(self._task, "cancel"):
+                self._task.cancel()
+            else:
+                self._task.kill()  # cocotb 1.x
+            self._task = None
+
+    async def _watch(self):
+        self._observe()
+        while True:
+            await Edge(self.signal)
+            await ReadOnly()  # Settle combinational outputs (observer) before decoding
+            self._observe()
+
+    def _observe(self):
+        try:
+            state, fault_from = self.decode(int(self.signal.value))
+        except ValueError:
+            return  # Unresolved, or not a valid state code
+        if not 0 <= state < self.num_states:
+            return
+        if self.state is not None and state != self.state:
+            self.record(self.state, state)
+            if fault_from is not None:
+                self.fault_paths[fault_from * self.num_states + state] += 1
+        self.state = state
+
+    def record(self, from_state: int, to_state: int):
+        """Count one transition (and sample fields on entering sample_state)"""
+        self.transitions[from_state * self.num_states + to_state] += 1
+        if self.sample_state is None or to_state == self.sample_state:
+            for name, handle in self.field_handles.items():
+                try:
+                    value = int(handle.value)
+                except ValueError:
+                    continue
+                if self.field_bins[name][0][1] < 0:  # Signed bins: reinterpret the raw bits
+                    width = len(handle)
+                    value = value - (1 << width) if value >> (width - 1) else value
+                self.sample_field(name, value)
+
+    def sample_field(self, name: str, value: int):
+        for i, (_, lo, hi) in enumerate(self.field_bins[name]):
+            if lo <= value <= hi:
+                self.field_hits[name][i] += 1
+                return
+
+    # ------------------------------------------------------------------
+    # Bitmaps, persistence, merging
+    # ------------------------------------------------------------------
+
+    def count(self, from_state: int, to_state: int) -> int:
+        return self.transitions[from_state * self.num_states + to_state]
+
+    @property
+    def bitmap(self) -> int:
+        """Bit (from * N + to) set for every transition seen"""
+        return sum(1 << i for i, n in enumerate(self.transitions) if n)
+
+    def field_bitmap(self, name: str) -> int:
+        return sum(1 << i for i, n in enumerate(self.field_hits[name]) if n)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "states": list(self.state_names),
+            "legal": sorted(self.legal),
+            "bitmap": hex(self.bitmap),
+            "transitions": list(self.transitions),
+            "fault_paths": list(self.fault_paths),
+            "fields": {
+                name: {"bins": [list(b) for b in bins], "bitmap": hex(self.field_bitmap(name)),
+                       "hits": list(self.field_hits[name])}
+                for name, bins in self.field_bins.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FsmCoverage":
+        coverage = cls(data["name"], data["states"], legal=[tuple(p) for p in data["legal"]])
+        coverage.transitions = array("I", data["transitions"])
+        coverage.fault_paths = array("I", data.get("fault_paths", coverage.fault_paths))
+        for name, f in data["fields"].items():
+            coverage.field_bins[name] = tuple(tuple(b) for b in f["bins"])
+            coverage.field_hits[name] = array("I", f["hits"])
+        return coverage
+
+    def write(self, directory: Path) -> Path:
+        """Write <name>_coverage.json into `directory`"""
+        path = Path(directory) / f"{self.name.replace(' ', '_')}{COVERAGE_SUFFIX}"
+        path.write_text(json.dumps(self.to_dict()))
+        return path
+
+    def merge(self, other: "FsmCoverage"):
+        """Add another run's counts (same FSM: same state list)"""
+        if other.state_names != self.state_names:
+            raise ValueError(f"Cannot merge coverage '{other.name}' into '{self.name}': state lists differ")
+        for i, n in enumerate(other.transitions):
+            self.transitions[i] += n
+        for i, n in enumerate(other.fault_paths):
+            self.fault_paths[i] += n
+        self.legal = self.legal | other.legal
+        for name, hits in other.field_hits.items():
+            if name not in self.field_hits:
+                self.field_bins[name] = other.field_bins[name]
+                self.field_hits[name] = array("I", hits)
+            else:
+                for i, n in enumerate(hits):
+                    self.field_hits[name][i] += n
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def percent(self) -> float:
+        """Covered share of the legal transitions (of all seen pairs if none declared)"""
+        if not self.legal:
+            return 100.0 if self.bitmap else 0.0
+        hit = sum(1 for f, t in self.legal if self.count(f, t))
+        return 100.0 * hit / len(self.legal)
+
+    def holes(self) -> List[str]:
+        """Legal transitions never taken, as 'FROM->TO'"""
+        return [f"{self.state_names[f]}->{self.state_names[t]}"
+                for f, t in sorted(self.legal) if not self.count(f, t)]
+
+    def unexpected(self) -> List[str]:
+        """Transitions taken that are not in the legal set"""
+        if not self.legal:
+            return []
+        n = self.num_states
+        return [f"{self.state_names[i // n]}->{self.state_names[i % n]}"
+                for i, c in enumerate(self.transitions) if c and (i // n, i % n) not in self.legal]
+
+    def matrix_lines(self) -> List[str]:
+        """
+        Transition matrix, rows = from, columns = to.
+
+        Cells: hit count, '.' legal but never taken, blank not expected,
+        '!n' taken although not in the legal set.
+        """
+        width = max(5, max(len(s) for s in self.state_names) + 1)
+        abbrev = [s[:width - 1] for s in self.state_names]
+        lines = [f"{self.name}: {self.percent():.0f}% of {len(self.legal)} legal transitions"
+                 if self.legal else f"{self.name}: {bin(self.bitmap).count('1')} transitions seen"]
+        lines.append(" " * (width + 5) + "".join(f"{a:>{width}}" for a in abbrev))
+        for f in range(self.num_states):
+            cells = []
+            for t in range(self.num_states):
+                c = self.count(f, t)
+                legal = (f, t) in self.legal or not self.legal
+                cells.append(str(c) if c and legal else f"!{c}" if c else "." if legal and f != t else "")
+            lines.append(f"  {abbrev[f]:<{width}} ->" + "".join(f"{cell:>{width}}" for cell in cells))
+        n = self.num_states
+        faults = [f"{self.state_names[i // n]}->{self.state_names[i % n]}={c}"
+                  for i, c in enumerate(self.fault_paths) if c]
+        if faults:
+            lines.append(f"  fault paths (observer): {', '.join(faults)}")
+        for name, bins in self.field_bins.items():
+            hits = self.field_hits[name]
+            covered = sum(1 for n in hits if n)
+            bin_cells = " ".join(f"{label}={n}" for (label, _, _), n in zip(bins, hits))
+            lines.append(f"  {name:18s} {covered:2d}/{len(bins):<2d} {bin_cells}")
+        holes = self.holes()
+        if holes:
+            lines.append(f"  missing: {', '.join(holes)}")
+        unexpected = self.unexpected()
+        if unexpected:
+            lines.append(f"  unexpected: {', '.join(unexpected)}")
+        return lines
+
+
+def load_coverage(paths: Iterable[Path], since: Optional[float] = None) -> Dict[str, FsmCoverage]:
+    """
+    Read and merge *_coverage.json files by coverage name.
+
+    Args:
+        paths: Files, or directories searched recursively
+        since: Ignore files older than this time.time() (stale runs)
+    """
+    merged: Dict[str, FsmCoverage] = {}
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.rglob(f"*{COVERAGE_SUFFIX}")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                if since is not None and file.stat().st_mtime < since:
+                    continue
+                coverage = FsmCoverage.from_dict(json.loads(file.read_text()))
+            except (OSError, ValueError, KeyError):
+                continue
+            if coverage.name in merged:
+                merged[coverage.name].merge(coverage)
+            else:
+                merged[coverage.name] = coverage
+    return merged
+
+
+def print_coverage(merged: Dict[str, FsmCoverage]):
+    for coverage in merged.values():
+        print("\n".join(coverage.matrix_lines()))
+
+
+if __name__ == "__main__":
+    targets = [Path(arg) for arg in sys.argv[1:]] or [Path(__file__).parent / "sim_build"]
+    merged = load_coverage(targets)
+    if not merged:
+        print("No coverage files found (run tests with FSM_COVERAGE=1 / run.py --coverage)")
+        sys.exit(1)
+    print_coverage(merged)
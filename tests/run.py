@@ -8,8 +8,10 @@ Uses CocotB 2.0+ Python API for build and test orchestration.
 Usage:
     python tests/run.py volo_clk_divider              # Run single test
     python tests/run.py --all                        # Run all tests
+    python tests/run.py --all --jobs 8               # Run all tests in 8 worker processes
     python tests/run.py --category=volo_common       # Run category
     python tests/run.py --list                       # List available tests
+    python tests/run.py --all --compare              # Run, then flag throughput regressions
 
 Author: Claude Code (CocotB Python Runner Migration)
 Date: 2025-01-25
@@ -17,16 +19,37 @@ Date: 2025-01-25
 
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 import os
+import re
 import subprocess
 import threading
+import time
 
 # Add tests directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from test_configs import TESTS_CONFIG, get_test_names, get_tests_by_category, get_categories
+from test_configs import (
+    DEFAULT_GHDL_ARGS,
+    TESTS_CONFIG,
+    get_categories,
+    get_shared_sources,
+    get_test_names,
+    get_tests_by_category,
+)
+from build_cache import BuildAction, BuildCache, SharedLibrary
+from run_history import (
+    DEFAULT_THRESHOLD,
+    DEFAULT_WINDOW,
+    RunHistory,
+    RunRecord,
+    current_git_rev,
+    read_sim_time_ns,
+)
+from sim_log import SimLogWriter, default_log_path
+from fsm_coverage import load_coverage
 
 # Import GHDL output filter
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
@@ -46,18 +69,38 @@ class FilteredOutput:
 
     This is BULLETPROOF - it redirects file descriptors 1 and 2 (stdout/stderr)
     through pipes, so even C code (like GHDL) can't bypass it.
+
+    The reader pulls large binary chunks from the pipe, splits them into
+    lines as bytes and coalesces surviving lines into one write, flushed
+    when the buffer fills, when the pipe has been drained, or after
+    FLUSH_INTERVAL under a sustained flood.
+
+    With `raw_log_path`, the complete unfiltered output is also streamed to
+    a compressed, sim-time indexed log (see sim_log.py).
     """
-    def __init__(self, filter_level: FilterLevel = FilterLevel.NORMAL):
+    READ_CHUNK = 1 << 16       # Bytes per os.read()
+    FLUSH_BYTES = 1 << 16      # Flush output once this much is buffered
+    FLUSH_INTERVAL = 0.1       # ...or when it has been buffered this long (s)
+    DRAIN_IDLE_TIMEOUT = 2.0   # On exit, give up if the reader makes no progress this long (s)
+
+    def __init__(self, filter_level: FilterLevel = FilterLevel.NORMAL,
+                 raw_log_path: Optional[Path] = None):
         self.filter = GHDLOutputFilter(level=filter_level)
+        self.raw_log_path = raw_log_path
+        self.raw_log: Optional[SimLogWriter] = None
         self.original_stdout = None
         self.original_stderr = None
         self.pipe_read = None
         self.pipe_write = None
         self.reader_thread = None
         self.stop_reading = False
+        self.last_activity = 0.0
 
     def __enter__(self):
         """Start capturing and filtering output"""
+        if self.raw_log_path is not None:
+            self.raw_log = SimLogWriter(self.raw_log_path)
+
         # Save original file descriptors
         self.original_stdout = os.dup(1)  # Save stdout
         self.original_stderr = os.dup(2)  # Save stderr
@@ -71,7 +114,8 @@ class FilteredOutput:
 
         # Start reader thread to filter and display output
         self.stop_reading = False
-        self.reader_thread = threading.Thread(target=self._read_and_filter)
+        self.last_activity = time.monotonic()
+        self.reader_thread = threading.Thread(target=self._read_and_filter, daemon=True)
         self.reader_thread.start()
 
         return self
@@ -90,16 +134,28 @@ class FilteredOutput:
             # Close pipe write end (signals EOF to reader)
             os.close(self.pipe_write)
 
-            # Wait for reader thread to finish
-            if self.reader_thread and self.reader_thread.is_alive():
-                self.reader_thread.join(timeout=2.0)
+            # Wait for the reader to drain the pipe. No fixed deadline: a
+            # large backlog is drained completely; only a reader that stops
+            # making progress (e.g. a leaked child still holds the pipe open)
+            # is abandoned, and that is reported.
+            while self.reader_thread and self.reader_thread.is_alive():
+                self.reader_thread.join(timeout=0.1)
+                idle = time.monotonic() - self.last_activity
+                if self.reader_thread.is_alive() and idle > self.DRAIN_IDLE_TIMEOUT:
+                    os.write(self.original_stderr,
+                             b"\n[Filter warning: output pipe still open after exit; "
+                             b"trailing output may be missing]\n")
+                    break
+
+            if self.raw_log is not None:
+                self.raw_log.close()
 
             # Close remaining file descriptors
             if self.original_stdout:
                 os.close(self.original_stdout)
             if self.original_stderr:
                 os.close(self.original_stderr)
-            # Note: pipe_read is closed by fdopen in the thread
+            # Note: pipe_read is closed by the reader thread
         except Exception as e:
             print(f"Warning: cleanup error: {e}", file=sys.stderr)
 
@@ -107,17 +163,77 @@ class FilteredOutput:
 
     def _read_and_filter(self):
         """Read from pipe and filter output in real-time"""
-        pipe_file = None
+        should_filter = self.filter.should_filter
+        stats = self.filter.stats
+        pending = b""          # Incomplete last line of the previous chunk
+        out = bytearray()      # Surviving output not yet written
+        buffered_since = None  # When `out` became non-empty
+
+        def flush():
+            nonlocal buffered_since
+            view = memoryview(out)
+            while view:
+                view = view[os.write(self.original_stdout, view):]
+            view.release()
+            out.clear()
+            buffered_since = None
+
+        # A block without any prefilter keyword cannot contain a line the
+        # filter would drop, so it is copied through without decoding
+        keyword_re = re.compile(self.filter.PREFILTER_PATTERN.encode())
+        pass_through = self.filter.level == FilterLevel.NONE
+        raw_log = self.raw_log
+
+        def process(block: bytes):
+            """Filter a run of complete lines (ending in b"\\n") into `out`"""
+            nonlocal buffered_since
+            if raw_log is not None:
+                raw_log.write(block)
+            stats.total_lines += block.count(b"\n")
+            if pass_through or keyword_re.search(block.lower()) is None:
+                out.extend(block)
+            else:
+                lines = block.split(b"\n")
+                lines.pop()  # Empty remainder after the final newline
+                for raw in lines:
+                    if should_filter(raw.decode("utf-8", errors="replace")):
+                        stats.filtered_lines += 1
+                    else:
+                        out.extend(raw)
+                        out.extend(b"\n")
+            if out and buffered_since is None:
+                buffered_since = time.monotonic()
+
         try:
-            # Wrap pipe_read in a file object
-            pipe_file = os.fdopen(self.pipe_read, 'r', buffering=1)
-            for line in pipe_file:
-                # Filter and print to original stdout
-                if not self.filter.should_filter(line.rstrip('\n')):
-                    os.write(self.original_stdout, line.encode())
+            while True:
+                chunk = os.read(self.pipe_read, self.READ_CHUNK)
+                self.last_activity = time.monotonic()
+                if not chunk:
+                    break
+
+                data = pending + chunk
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                if cut:
+                    process(data[:cut])
+
+                # A short read means the pipe is drained: show output now.
+                # Under a flood, coalesce until the size/time threshold.
+                if (len(chunk) < self.READ_CHUNK or len(out) >= self.FLUSH_BYTES
+                        or (buffered_since is not None
+                            and self.last_activity - buffered_since >= self.FLUSH_INTERVAL)):
+                    flush()
+
+            if pending:
+                # Final line without a trailing newline
+                if raw_log is not None:
+                    raw_log.write(pending)
+                stats.total_lines += 1
+                if should_filter(pending.decode("utf-8", errors="replace")):
+                    stats.filtered_lines += 1
                 else:
-                    self.filter.stats.filtered_lines += 1
-                self.filter.stats.total_lines += 1
+                    out.extend(pending)
+            flush()
         except (OSError, ValueError):
             # Pipe closed or invalid - normal shutdown
             pass
@@ -128,20 +244,62 @@ class FilteredOutput:
             except:
                 pass
         finally:
-            if pipe_file:
-                try:
-                    pipe_file.close()
-                except:
-                    pass
+            try:
+                os.close(self.pipe_read)
+            except OSError:
+                pass
 
 
 class TestRunner:
     """CocotB test runner using Python API"""
 
-    def __init__(self, verbose: bool = False, filter_output: bool = True):
+    def __init__(self, verbose: bool = False, filter_output: bool = True, jobs: int = 1,
+                 rebuild: bool = False, worker: bool = False, raw_log: bool = True,
+                 history: bool = True):
         self.verbose = verbose
         self.filter_output = filter_output
+        self.raw_log = raw_log
+        self.history = history
+        self.jobs = jobs
+        self.rebuild = rebuild
+        self.worker = worker
         self.tests_dir = Path(__file__).parent
+        self.durations: Dict[str, float] = {}
+        self._shared_library: Optional[SharedLibrary] = None
+        self._shared_library_checked = False
+
+        # One id for every test of this invocation; --jobs workers inherit it
+        self.run_id = os.environ.setdefault("VOLO_RUN_ID", time.strftime("%Y%m%d-%H%M%S")
+                                            + f"-{os.getpid()}")
+
+    def get_build_dir(self, test_name: str) -> Path:
+        """
+        Per-test build directory (tests/sim_build/<test_name>).
+
+        Each test gets its own GHDL work library so tests never clobber
+        each other's elaborated units - required for --jobs > 1.
+        """
+        return self.tests_dir / "sim_build" / test_name
+
+    def get_shared_library(self) -> Optional[SharedLibrary]:
+        """
+        Shared pre-analyzed library (tests/sim_build/_shared), updated once per process.
+
+        Returns None if there is nothing to share or the shared build failed,
+        in which case tests simply analyze all of their own sources.
+        --jobs workers never build it themselves: the parent process brings
+        it up to date before dispatching, and workers only reuse it.
+        """
+        if not self._shared_library_checked:
+            self._shared_library_checked = True
+            shared = SharedLibrary(
+                self.tests_dir / "sim_build" / "_shared",
+                get_shared_sources(),
+                DEFAULT_GHDL_ARGS,
+            )
+            if shared.ensure(rebuild=self.rebuild and not self.worker, read_only=self.worker):
+                self._shared_library = shared
+        return self._shared_library
 
     def run_test(self, test_name: str) -> bool:
         """
@@ -172,6 +330,7 @@ class TestRunner:
 
         # Create GHDL runner
         runner = get_runner("ghdl")
+        build_dir = self.get_build_dir(test_name)
 
         # Set working directory to tests/
         os.chdir(self.tests_dir)
@@ -202,41 +361,94 @@ class TestRunner:
             filter_level = FilterLevel.NONE
         else:
             filter_level = FilterLevel.NORMAL
+        if not self.filter_output:
+            filter_level = FilterLevel.NONE
+
+        # Complete unfiltered output goes to a compressed log in the build dir
+        raw_log_path = default_log_path(build_dir) if self.raw_log else None
+
+        # Timing for the run history (build vs simulation)
+        started_at = time.time()
+        build_s = None
+        sim_wall_s = None
+        passed = False
 
         try:
             # Build HDL (unfiltered - we want to see build errors)
-            print("\n📦 Building HDL sources...")
-            runner.build(
-                sources=[str(src) for src in config.sources],
-                hdl_toplevel=config.toplevel,
-                always=True,
-                build_args=build_args,
-            )
+            shared = self.get_shared_library()
+            shared_sources = shared.used_by(config.sources, build_args) if shared else []
+            seed = shared.seed_id(shared_sources) if shared_sources else None
+
+            build_start = time.monotonic()
+            cache = BuildCache(build_dir)
+            plan = cache.plan(config.sources, config.toplevel, build_args,
+                              rebuild=self.rebuild, seed=seed)
+
+            if plan.action == BuildAction.REUSE:
+                print(f"\n📦 HDL build up to date ({plan.reason}) - reusing work library")
+            else:
+                if plan.action == BuildAction.INCREMENTAL:
+                    print(f"\n📦 Rebuilding HDL incrementally ({plan.reason})...")
+                    for src in plan.changed_sources:
+                        print(f"  - {Path(src).name}")
+                else:
+                    print(f"\n📦 Building HDL sources ({plan.reason})...")
+
+                clean = plan.action == BuildAction.CLEAN
+                if clean and seed:
+                    # Start from the shared library: only test-specific units get analyzed
+                    cache.clean()
+                    shared.seed_into(build_dir)
+                    print(f"  Seeded from shared library ({len(shared_sources)} of "
+                          f"{len(config.sources)} sources pre-analyzed)")
+                    clean = False
+
+                # Drop the manifest first so a failed build is never mistaken for a good one
+                cache.invalidate()
+                runner.build(
+                    sources=[str(src) for src in config.sources],
+                    hdl_toplevel=config.toplevel,
+                    always=True,
+                    build_args=build_args,
+                    build_dir=build_dir,
+                    clean=clean,
+                )
+                cache.save(plan.manifest)
+            build_s = time.monotonic() - build_start
 
             # Run tests with BULLETPROOF output filtering
             print("\n🧪 Running CocotB tests...")
+            sim_start = time.monotonic()
 
-            if self.filter_output and filter_level != FilterLevel.NONE:
+            if filter_level != FilterLevel.NONE or raw_log_path is not None:
                 # BULLETPROOF: Capture at OS level - even GHDL can't bypass this!
-                with FilteredOutput(filter_level=filter_level) as filtered:
+                with FilteredOutput(filter_level=filter_level, raw_log_path=raw_log_path) as filtered:
                     runner.test(
                         hdl_toplevel=config.toplevel,
+                        hdl_toplevel_lang="vhdl",
                         test_module=config.test_module,
                         test_args=sim_args,
+                        build_dir=build_dir,
                     )
                 # Print filter summary
                 if filtered.filter.stats.filtered_lines > 0:
                     print(f"\n[Filtered {filtered.filter.stats.filtered_lines} lines " +
                           f"({filtered.filter.stats.filtered_lines}/{filtered.filter.stats.total_lines} = " +
                           f"{100*filtered.filter.stats.filtered_lines/filtered.filter.stats.total_lines:.1f}% reduction)]")
+                self.print_raw_log(raw_log_path)
             else:
                 # No filtering - direct output
                 runner.test(
                     hdl_toplevel=config.toplevel,
+                    hdl_toplevel_lang="vhdl",
                     test_module=config.test_module,
                     test_args=sim_args,
+                    build_dir=build_dir,
                 )
 
+            sim_wall_s = time.monotonic() - sim_start
+            passed = True
+
             print("\n" + "=" * 70)
             print(f"✅ Test '{test_name}' PASSED")
             print("=" * 70)
@@ -246,26 +458,189 @@ class TestRunner:
             print("\n" + "=" * 70)
             print(f"❌ Test '{test_name}' FAILED")
             print(f"Error: {e}")
+            if raw_log_path is not None and raw_log_path.exists():
+                print(f"Full output: python tests/sim_log.py {self._display_path(raw_log_path)} --at <time>")
             print("=" * 70)
             return False
 
-    def run_all_tests(self) -> dict:
+        finally:
+            # Also runs when the cocotb runner raises SystemExit on a simulator failure
+            self.record_history(test_name, passed, build_dir, started_at, build_s, sim_wall_s)
+
+    def record_history(self, test_name: str, passed: bool, build_dir: Path, started_at: float,
+                       build_s: Optional[float], sim_wall_s: Optional[float]):
+        """Append this test's timing to tests/.runs/history.sqlite"""
+        if not self.history:
+            return
+        sim_ns = read_sim_time_ns(build_dir, since=started_at)
+        throughput = sim_ns / sim_wall_s if sim_ns and sim_wall_s else None
+        try:
+            history = RunHistory()
+            history.record(RunRecord(
+                test_name=test_name,
+                passed=passed,
+                build_s=build_s,
+                sim_wall_s=sim_wall_s,
+                sim_ns=sim_ns,
+                sim_ns_per_s=throughput,
+                run_id=self.run_id,
+                timestamp=started_at,
+                git_rev=current_git_rev(self.tests_dir),
+            ))
+            history.close()
+        except Exception as e:  # History is best-effort; never fail a test over it
+            print(f"⚠️  Could not record run history: {e}")
+
+    def compare_history(self, test_names: Optional[List[str]] = None,
+                        window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD) -> bool:
         """
-        Run all configured tests.
-        Returns dict of {test_name: passed}
+        Flag tests whose latest run is slower than the rolling median.
+
+        Returns:
+            True if no test regressed beyond `threshold`
         """
-        results = {}
-        test_names = get_test_names()
+        history = RunHistory()
+        comparisons = history.compare(test_names, window=window, threshold=threshold)
+        history.close()
 
-        print(f"\n🚀 Running {len(test_names)} tests...\n")
+        print("\n" + "=" * 70)
+        print(f"PERFORMANCE vs median of last {window} runs (threshold {threshold:.0%})")
+        print("=" * 70)
+        if not comparisons:
+            print("No earlier runs to compare against yet.")
+            return True
+
+        for c in comparisons:
+            status = "❌ REGRESSED" if c.regressed else "✅ OK       "
+            if c.metric == "sim_ns_per_s":
+                detail = f"{c.latest:,.0f} sim-ns/s vs {c.median:,.0f}"
+            else:
+                detail = f"{c.latest:.1f}s sim wall vs {c.median:.1f}s"
+            print(f"{status} {c.test_name:30s} {c.change:+7.1%}  ({detail}, n={c.samples})")
+
+        regressed = [c.test_name for c in comparisons if c.regressed]
+        print("=" * 70)
+        if regressed:
+            print(f"Regressions: {', '.join(regressed)}")
+        return not regressed
+
+    def print_coverage(self, test_names: List[str], since: float) -> None:
+        """Merge the FSM coverage files the given tests wrote since `since` and print them"""
+        merged = load_coverage([self.get_build_dir(name) for name in test_names
+                                if self.get_build_dir(name).exists()], since=since)
+        print("\n" + "=" * 70)
+        print("FSM TRANSITION COVERAGE")
+        print("=" * 70)
+        if not merged:
+            print("No coverage collected (no test registered an FSM collector).")
+            return
+        for coverage in merged.values():
+            for line in coverage.matrix_lines():
+                print(line)
+            print()
+
+    def _display_path(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.tests_dir.parent))
+        except ValueError:
+            return str(path)
+
+    def print_raw_log(self, log_path: Optional[Path]):
+        """Print where the complete raw simulation output was saved"""
+        if log_path is None or not log_path.exists():
+            return
+        size_mb = log_path.stat().st_size / 1e6
+        print(f"📝 Raw simulation log: {self._display_path(log_path)} ({size_mb:.2f} MB)")
+
+    def run_tests(self, test_names: List[str]) -> dict:
+        """
+        Run a list of tests, serially or in parallel depending on self.jobs.
+        Returns dict of {test_name: passed}
+        """
+        if self.jobs > 1 and len(test_names) > 1:
+            return self._run_tests_parallel(test_names)
 
+        results = {}
         for i, test_name in enumerate(test_names, 1):
             print(f"\n[{i}/{len(test_names)}] {test_name}")
+            start = time.monotonic()
             results[test_name] = self.run_test(test_name)
+            self.durations[test_name] = time.monotonic() - start
+        return results
 
-        # Summary
+    def _run_tests_parallel(self, test_names: List[str]) -> dict:
+        """
+        Run each test in its own worker process (up to self.jobs at once).
+
+        Every worker is a fresh `run.py <test_name>` invocation, so the
+        os.chdir() / os.environ changes in run_test() and the fd-level
+        FilteredOutput redirection stay private to that process. Output is
+        captured per worker and printed as one block when the test finishes.
+        """
+        workers = min(self.jobs, len(test_names))
+
+        # Build the shared library here, once, before workers start reusing it
+        self.get_shared_library()
+        print(f"⚙️  Using {workers} worker processes")
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._run_test_subprocess, test_name): test_name
+                for test_name in test_names
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                test_name = futures[future]
+                passed, duration, output = future.result()
+                results[test_name] = passed
+                self.durations[test_name] = duration
+
+                status = "✅ PASS" if passed else "❌ FAIL"
+                print(f"\n[{i}/{len(test_names)}] {test_name} - {status} ({duration:.1f}s)")
+                print(output, end="" if output.endswith("\n") else "\n")
+                sys.stdout.flush()
+
+        # Report in the requested order, not completion order
+        return {test_name: results[test_name] for test_name in test_names}
+
+    def _run_test_subprocess(self, test_name: str) -> Tuple[bool, float, str]:
+        """
+        Run a single test in a child `run.py` process.
+        Returns (passed, wall-clock seconds, combined stdout/stderr)
+        """
+        cmd = [sys.executable, str(Path(__file__).resolve()), test_name, "--worker"]
+        if self.verbose:
+            cmd.append("--verbose")
+        if not self.filter_output:
+            cmd.append("--no-filter")
+        if self.rebuild:
+            cmd.append("--rebuild")
+        if not self.raw_log:
+            cmd.append("--no-raw-log")
+        if not self.history:
+            cmd.append("--no-history")
+
+        # Child inherits GHDL_FILTER_LEVEL / TEST_LEVEL etc. from our environment
+        env = os.environ.copy()
+        env["PYTHONUNBUFFERED"] = "1"
+
+        start = time.monotonic()
+        proc = subprocess.run(
+            cmd,
+            cwd=self.tests_dir,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        duration = time.monotonic() - start
+        output = proc.stdout.decode(errors="replace")
+
+        return proc.returncode == 0, duration, output
+
+    def print_summary(self, results: dict, title: str = "TEST SUMMARY"):
+        """Print pass/fail and wall-clock time for each test"""
         print("\n" + "=" * 70)
-        print("TEST SUMMARY")
+        print(title)
         print("=" * 70)
 
         passed = sum(1 for v in results.values() if v)
@@ -273,12 +648,30 @@ class TestRunner:
 
         for test_name, passed_flag in results.items():
             status = "✅ PASS" if passed_flag else "❌ FAIL"
-            print(f"{status}: {test_name}")
+            duration = self.durations.get(test_name)
+            timing = f" ({duration:.1f}s)" if duration is not None else ""
+            print(f"{status}: {test_name}{timing}")
 
         print("=" * 70)
-        print(f"Results: {passed} passed, {failed} failed, {len(results)} total")
+        total_time = sum(self.durations.get(name, 0.0) for name in results)
+        print(f"Results: {passed} passed, {failed} failed, {len(results)} total "
+              f"({total_time:.1f}s test time)")
         print("=" * 70)
 
+    def run_all_tests(self) -> dict:
+        """
+        Run all configured tests.
+        Returns dict of {test_name: passed}
+        """
+        test_names = get_test_names()
+
+        print(f"\n🚀 Running {len(test_names)} tests...\n")
+
+        start = time.monotonic()
+        results = self.run_tests(test_names)
+        self.print_summary(results)
+        print(f"Wall-clock time: {time.monotonic() - start:.1f}s")
+
         return results
 
     def run_category(self, category: str) -> dict:
@@ -295,18 +688,10 @@ class TestRunner:
 
         print(f"\n🚀 Running {len(tests)} tests in category '{category}'...\n")
 
-        results = {}
-        for i, test_name in enumerate(sorted(tests.keys()), 1):
-            print(f"\n[{i}/{len(tests)}] {test_name}")
-            results[test_name] = self.run_test(test_name)
-
-        # Summary
-        passed = sum(1 for v in results.values() if v)
-        failed = len(results) - passed
-
-        print("\n" + "=" * 70)
-        print(f"Category '{category}': {passed} passed, {failed} failed")
-        print("=" * 70)
+        start = time.monotonic()
+        results = self.run_tests(sorted(tests.keys()))
+        self.print_summary(results, title=f"Category '{category}'")
+        print(f"Wall-clock time: {time.monotonic() - start:.1f}s")
 
         return results
 
@@ -335,9 +720,17 @@ def main():
 Examples:
   python tests/run.py volo_clk_divider              # Run single test
   python tests/run.py --all                        # Run all tests
+  python tests/run.py --all -j 8                   # Run all tests, 8 in parallel
   python tests/run.py --category=volo_modules      # Run category
   python tests/run.py --list                       # List tests
   python tests/run.py volo_clk_divider --verbose   # Verbose output
+  python tests/run.py ds1140_pd_volo --rebuild     # Ignore build cache, rebuild from scratch
+  python tests/run.py --all --compare              # Flag tests slower than their rolling median
+  python tests/run.py --compare                    # Same, from the stored history only
+  python tests/run.py ds1140_pd_volo --lockstep    # Compare RTL to the Python model every cycle
+  python tests/run.py --all -j 8 --coverage        # Merged FSM transition coverage matrix
+  python tests/sim_log.py tests/sim_build/ds1140_pd_volo/sim_output.log.gz --at 2400ns
+                                                   # Inspect full raw output around a sim time
         """,
     )
 
@@ -367,11 +760,84 @@ Examples:
         action="store_true",
         help="Enable verbose output (DEBUG log level)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Run up to N tests in parallel worker processes (0 = one per CPU, default: 1)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the build cache and re-analyze all HDL sources from scratch",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help=argparse.SUPPRESS,  # Set by --jobs for its child processes
+    )
     parser.add_argument(
         "--no-filter",
         action="store_true",
         help="Disable GHDL output filtering (show all warnings)",
     )
+    parser.add_argument(
+        "--no-raw-log",
+        action="store_true",
+        help="Do not save the complete raw simulation output (sim_build/<test>/sim_output.log.*)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not record timings in tests/.runs/history.sqlite",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Flag tests whose simulation throughput regressed vs the rolling median "
+             "(after running the selected tests, or over the stored history alone)",
+    )
+    parser.add_argument(
+        "--compare-window",
+        type=int,
+        default=DEFAULT_WINDOW,
+        metavar="N",
+        help=f"Previous runs in the rolling median (default: {DEFAULT_WINDOW})",
+    )
+    parser.add_argument(
+        "--compare-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar="FRAC",
+        help=f"Allowed throughput loss before flagging (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--latency",
+        type=str,
+        choices=["random", "fast", "model"],
+        default=None,
+        help="MCC register write latency: random 10-200ms (default), fast (a few clock "
+             "cycles) or model (realistic, seeded)",
+    )
+    parser.add_argument(
+        "--latency-seed",
+        type=int,
+        default=None,
+        metavar="SEED",
+        help="Seed for --latency model (default: 0)",
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="Collect FSM transition coverage and print the merged matrix",
+    )
+    parser.add_argument(
+        "--lockstep",
+        action="store_true",
+        help="ds1140_pd_volo: check outputs against the Python cycle model every cycle",
+    )
     parser.add_argument(
         "--filter-level",
         type=str,
@@ -388,8 +854,32 @@ Examples:
     elif args.no_filter:
         os.environ["GHDL_FILTER_LEVEL"] = "none"
 
+    # Read by conftest.get_mcc_latency() inside the simulator
+    if args.latency:
+        os.environ["MCC_LATENCY"] = args.latency
+    if args.latency_seed is not None:
+        os.environ["MCC_LATENCY_SEED"] = str(args.latency_seed)
+    # Read by TestBase.add_fsm_coverage() inside the simulator
+    if args.coverage:
+        os.environ["FSM_COVERAGE"] = "1"
+    coverage_since = time.time()
+
+    # Read by ds1140_pd_tests.ds1140_pd_lockstep
+    if args.lockstep:
+        os.environ["DS1140_LOCKSTEP"] = "1"
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     # Create runner
-    runner = TestRunner(verbose=args.verbose, filter_output=not args.no_filter)
+    runner = TestRunner(
+        verbose=args.verbose,
+        filter_output=not args.no_filter,
+        jobs=jobs,
+        rebuild=args.rebuild,
+        worker=args.worker,
+        raw_log=not args.no_raw_log,
+        history=not args.no_history,
+    )
 
     # Handle commands
     if args.list:
@@ -398,21 +888,33 @@ Examples:
 
     elif args.all:
         results = runner.run_all_tests()
-        # Exit with non-zero if any tests failed
-        return 0 if all(results.values()) else 1
 
     elif args.category:
         results = runner.run_category(args.category)
-        return 0 if all(results.values()) else 1
 
     elif args.test_name:
-        success = runner.run_test(args.test_name)
-        return 0 if success else 1
+        results = {args.test_name: runner.run_test(args.test_name)}
+
+    elif args.compare:
+        # Compare the stored history only
+        ok = runner.compare_history(window=args.compare_window,
+                                    threshold=args.compare_threshold)
+        return 0 if ok else 1
 
     else:
         parser.print_help()
         return 1
 
+    if args.coverage and not args.worker:
+        runner.print_coverage(list(results), since=coverage_since)
+
+    # Exit with non-zero if any tests failed (or regressed, with --compare)
+    ok = bool(results) and all(results.values())
+    if args.compare:
+        ok = runner.compare_history(list(results), window=args.compare_window,
+                                    threshold=args.compare_threshold) and ok
+    return 0 if ok else 1
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Cross-run timing history for the CocotB test runner.
+
+Every test run by run.py appends one row to a local SQLite database
+(tests/.runs/history.sqlite): build time, simulation wall time, simulated
+time (from TestBase's <module>_timing.json) and the resulting throughput in
+simulated ns per wall-clock second.
+
+`run.py --compare` checks each test's latest run against the rolling median
+of its previous runs and flags a regression when throughput dropped by more
+than the threshold (or, for tests without sim-time data, when simulation
+wall time grew by more than the threshold).
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import sqlite3
+import statistics
+import subprocess
+import time
+from typing import List, Optional
+
+DEFAULT_HISTORY_PATH = Path(__file__).parent / ".runs" / "history.sqlite"
+DEFAULT_WINDOW = 10        # Previous runs in the rolling median
+DEFAULT_THRESHOLD = 0.25   # Flag >25% throughput loss
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_runs (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id          TEXT NOT NULL,
+    timestamp       REAL NOT NULL,
+    git_rev         TEXT,
+    test_name       TEXT NOT NULL,
+    passed          INTEGER NOT NULL,
+    build_s         REAL,
+    sim_wall_s      REAL,
+    sim_ns          REAL,
+    sim_ns_per_s    REAL
+);
+CREATE INDEX IF NOT EXISTS idx_test_runs_test ON test_runs (test_name, timestamp);
+"""
+
+
+@dataclass
+class RunRecord:
+    """One test execution"""
+    test_name: str
+    passed: bool
+    build_s: Optional[float]
+    sim_wall_s: Optional[float]
+    sim_ns: Optional[float]
+    sim_ns_per_s: Optional[float]
+    run_id: str = ""
+    timestamp: float = 0.0
+    git_rev: Optional[str] = None
+
+
+@dataclass
+class Comparison:
+    """Latest run of a test versus the median of its previous runs"""
+    test_name: str
+    metric: str            # "sim_ns_per_s" or "sim_wall_s"
+    latest: float
+    median: float
+    samples: int
+    change: float          # Fractional change, signed so that negative = slower
+    regressed: bool
+
+
+def current_git_rev(cwd: Path) -> Optional[str]:
+    """Short git revision of the working tree (None outside git)"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd,
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def read_sim_time_ns(build_dir: Path, since: float) -> Optional[float]:
+    """
+    Total simulated time from TestBase timing artifacts written after `since`.
+
+    Args:
+        build_dir: Test build directory (the simulator's working directory)
+        since: time.time() at test start; older artifacts are ignored
+
+    Returns:
+        Simulated nanoseconds, or None if the test module wrote no timing
+    """
+    total = None
+    for path in Path(build_dir).glob("*_timing.json"):
+        try:
+            if path.stat().st_mtime < since:
+                continue
+            total = (total or 0.0) + float(json.loads(path.read_text())["sim_ns"])
+        except (OSError, ValueError, KeyError):
+            continue
+    return total
+
+
+class RunHistory:
+    """
+    SQLite-backed history of test timings.
+
+    Usage:
+        history = RunHistory()
+        history.record(RunRecord("ds1140_pd_volo", True, build_s=1.2, sim_wall_s=30.5,
+                                 sim_ns=2.4e6, sim_ns_per_s=7.9e4, run_id=run_id))
+        for c in history.compare(["ds1140_pd_volo"]):
+            ...
+    """
+
+    def __init__(self, path: Path = DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel --jobs workers record concurrently; wait for the lock
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, record: RunRecord):
+        """Append one test execution"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO test_runs (run_id, timestamp, git_rev, test_name, passed, build_s,"
+                " sim_wall_s, sim_ns, sim_ns_per_s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.run_id, record.timestamp or time.time(), record.git_rev,
+                 record.test_name, int(record.passed), record.build_s, record.sim_wall_s,
+                 record.sim_ns, record.sim_ns_per_s),
+            )
+
+    def recent(self, test_name: str, limit: int = DEFAULT_WINDOW + 1) -> List[RunRecord]:
+        """Most recent passing runs of a test, newest first"""
+        rows = self.conn.execute(
+            "SELECT test_name, passed, build_s, sim_wall_s, sim_ns, sim_ns_per_s, run_id,"
+            " timestamp, git_rev FROM test_runs WHERE test_name = ? AND passed = 1"
+            " ORDER BY timestamp DESC LIMIT ?",
+            (test_name, limit),
+        ).fetchall()
+        return [RunRecord(name, bool(passed), *rest) for name, passed, *rest in rows]
+
+    def test_names(self) -> List[str]:
+        rows = self.conn.execute("SELECT DISTINCT test_name FROM test_runs ORDER BY test_name")
+        return [row[0] for row in rows]
+
+    def compare(self, test_names: Optional[List[str]] = None, window: int = DEFAULT_WINDOW,
+                threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+        """
+        Compare each test's latest passing run against the median of the
+        `window` runs before it.
+
+        Throughput (sim ns per wall second) is used when both sides have it;
+        otherwise simulation wall time. Tests with no earlier runs are skipped.
+        """
+        comparisons = []
+        for test_name in test_names or self.test_names():
+            runs = self.recent(test_name, window + 1)
+            if len(runs) < 2:
+                continue
+            latest, previous = runs[0], runs[1:]
+
+            baseline = [r.sim_ns_per_s for r in previous if r.sim_ns_per_s]
+            if latest.sim_ns_per_s and baseline:
+                median = statistics.median(baseline)
+                change = latest.sim_ns_per_s / median - 1.0
+                comparisons.append(Comparison(test_name, "sim_ns_per_s", latest.sim_ns_per_s,
+                                              median, len(baseline), change, change < -threshold))
+                continue
+
+            baseline = [r.sim_wall_s for r in previous if r.sim_wall_s]
+            if latest.sim_wall_s and baseline:
+                median = statistics.median(baseline)
+                # Longer wall time is slower: negative = slower, -0.25 = 25% longer
+                change = 1.0 - latest.sim_wall_s / median
+                comparisons.append(Comparison(test_name, "sim_wall_s", latest.sim_wall_s,
+                                              median, len(baseline), change, change < -threshold))
+        return comparisons
@@ -0,0 +1,301 @@
+"""
+Compressed raw simulation logs with a sim-time index.
+
+FilteredOutput shows a filtered view of the simulation live; SimLogWriter
+keeps the complete, unfiltered output next to it on disk, so a failing
+test can be inspected without rerunning it with GHDL_FILTER_LEVEL=none.
+
+The log is a sequence of independently compressed blocks (zstd frames if
+`zstandard` is installed, gzip members otherwise), so it is still a valid
+.zst/.gz file for zstdcat/zcat. A JSON index next to it records, for each
+block, its compressed offset, first line number and the first/last
+simulation time seen in it. SimLogReader uses the index to decompress
+only the blocks around a timestamp.
+
+Compression runs in a background thread; the reader thread of
+FilteredOutput only hands over bytes.
+
+Usage:
+    python tests/sim_log.py tests/sim_build/ds1140_pd_volo/sim_output.log.gz --at 1.5us
+    python tests/sim_log.py <log> --at 2400ns --context 40
+    python tests/sim_log.py <log> --info
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from dataclasses import asdict, dataclass
+import gzip
+import json
+from pathlib import Path
+import queue
+import re
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+INDEX_VERSION = 1
+DEFAULT_BLOCK_SIZE = 1 << 20  # Uncompressed bytes per compressed block
+
+TIME_UNITS_NS = {"fs": 1e-6, "ps": 1e-3, "ns": 1.0, "us": 1e3, "ms": 1e6, "s": 1e9}
+
+# cocotb reduced log format ("  1234.00ns INFO ...") or GHDL's "...:@1234ns:..."
+SIM_TIME_RE = re.compile(
+    rb"^\s*(\d+(?:\.\d+)?)\s*(fs|ps|ns|us|ms)\s|@(\d+(?:\.\d+)?)(fs|ps|ns|us|ms)\b",
+    re.MULTILINE,
+)
+
+
+def default_log_path(build_dir: Path) -> Path:
+    """Raw log location for a test build directory (.zst if zstd is available)"""
+    return Path(build_dir) / ("sim_output.log.zst" if ZSTD_AVAILABLE else "sim_output.log.gz")
+
+
+def index_path_for(log_path: Path) -> Path:
+    return Path(str(log_path) + ".idx.json")
+
+
+def parse_sim_time(text: str) -> float:
+    """
+    Parse a time like "1.5us", "2400ns" or "2400" (ns) into nanoseconds.
+
+    Raises:
+        ValueError: If the text is not a time
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(fs|ps|ns|us|ms|s)?\s*", text)
+    if not match:
+        raise ValueError(f"Not a simulation time: {text!r}")
+    return float(match.group(1)) * TIME_UNITS_NS[match.group(2) or "ns"]
+
+
+def _match_time_ns(match: "re.Match") -> float:
+    value, unit = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+    return float(value) * TIME_UNITS_NS[unit.decode()]
+
+
+def line_time_ns(line: bytes) -> Optional[float]:
+    """Simulation time of a log line, if it carries one"""
+    match = SIM_TIME_RE.search(line)
+    return _match_time_ns(match) if match else None
+
+
+@dataclass
+class LogBlock:
+    """One independently compressed block of the raw log"""
+    offset: int                     # Compressed byte offset in the log file
+    size: int                       # Compressed size
+    first_line: int                 # 0-based number of the block's first line
+    lines: int                      # Complete lines in the block
+    t_first: Optional[float] = None  # First sim time in the block (ns)
+    t_last: Optional[float] = None   # Last sim time in the block (ns)
+
+
+class SimLogWriter:
+    """
+    Background writer for the complete raw output of one simulation.
+
+    Usage:
+        log = SimLogWriter(default_log_path(build_dir))
+        log.write(b"...complete lines...\\n")
+        log.close()   # flushes the last block and writes the index
+    """
+
+    def __init__(self, path: Path, block_size: int = DEFAULT_BLOCK_SIZE):
+        self.path = Path(path)
+        self.block_size = block_size
+        self.codec = "zstd" if self.path.suffix == ".zst" else "gzip"
+        if self.codec == "zstd" and not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is not installed - use a .gz log path")
+
+        self.blocks: List[LogBlock] = []
+        self.total_lines = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._pending = bytearray()
+        # Bounded so a stalled disk applies back-pressure instead of eating memory
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=256)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes):
+        """Queue raw output (safe to call from the FilteredOutput reader thread)"""
+        if data:
+            self._queue.put(bytes(data))
+
+    def close(self):
+        """Flush everything, write the index and stop the background thread"""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._error is None:
+            self._write_index()
+
+    def _run(self):
+        try:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    break
+                self._pending += data
+                if len(self._pending) >= self.block_size:
+                    # Cut at the last complete line; the rest starts the next block
+                    cut = self._pending.rfind(b"\n") + 1 or len(self._pending)
+                    self._flush_block(bytes(self._pending[:cut]))
+                    del self._pending[:cut]
+            if self._pending:
+                self._flush_block(bytes(self._pending))
+                self._pending.clear()
+        except BaseException as e:  # Never let logging take the test run down
+            self._error = e
+            while self._queue.get() is not None:
+                pass
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+    def _flush_block(self, data: bytes):
+        compressed = self._compress(data)
+        first = SIM_TIME_RE.search(data)
+        t_first = _match_time_ns(first) if first else None
+        # Last timestamp: scan whole lines at the end of the block only
+        tail_start = data.find(b"\n", max(len(data) - 4096, 0)) + 1
+        tail = list(SIM_TIME_RE.finditer(data, tail_start if len(data) > 4096 else 0))
+        t_last = _match_time_ns(tail[-1]) if tail else t_first
+
+        lines = data.count(b"\n")
+        self.blocks.append(LogBlock(
+            offset=self.compressed_bytes,
+            size=len(compressed),
+            first_line=self.total_lines,
+            lines=lines,
+            t_first=t_first,
+            t_last=t_last,
+        ))
+        self._file.write(compressed)
+        self.total_lines += lines
+        self.raw_bytes += len(data)
+        self.compressed_bytes += len(compressed)
+
+    def _write_index(self):
+        index = {
+            "version": INDEX_VERSION,
+            "codec": self.codec,
+            "lines": self.total_lines,
+            "raw_bytes": self.raw_bytes,
+            "blocks": [asdict(block) for block in self.blocks],
+        }
+        tmp_path = index_path_for(self.path).with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index))
+        tmp_path.replace(index_path_for(self.path))
+
+
+class SimLogReader:
+    """Random access to a SimLogWriter log by simulation time"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        index = json.loads(index_path_for(self.path).read_text())
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported log index version in {index_path_for(self.path)}")
+        self.codec = index["codec"]
+        self.total_lines = index["lines"]
+        self.raw_bytes = index["raw_bytes"]
+        self.blocks = [LogBlock(**block) for block in index["blocks"]]
+
+    def read_block(self, i: int) -> List[bytes]:
+        """Decompress block `i` into lines (without newlines)"""
+        block = self.blocks[i]
+        with open(self.path, "rb") as f:
+            f.seek(block.offset)
+            compressed = f.read(block.size)
+        if self.codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is needed to read this log")
+            data = zstandard.ZstdDecompressor().decompress(compressed)
+        else:
+            data = gzip.decompress(compressed)
+        lines = data.split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()
+        return lines
+
+    def block_for_time(self, time_ns: float) -> int:
+        """Index of the first block whose output reaches `time_ns`"""
+        for i, block in enumerate(self.blocks):
+            if block.t_last is not None and block.t_last >= time_ns:
+                return i
+        return max(len(self.blocks) - 1, 0)
+
+    def lines_at(self, time_ns: float, context: int = 20) -> Tuple[int, List[bytes]]:
+        """
+        Lines around the first line at or after `time_ns`.
+
+        Only the matching block and its neighbours are decompressed.
+
+        Returns:
+            (line number of the first returned line, lines)
+        """
+        if not self.blocks:
+            return 0, []
+        center = self.block_for_time(time_ns)
+        first = max(center - 1, 0)
+        last = min(center + 1, len(self.blocks) - 1)
+
+        lines = []
+        for i in range(first, last + 1):
+            lines.extend(self.read_block(i))
+        base = self.blocks[first].first_line
+
+        target = len(lines) - 1
+        for n, line in enumerate(lines):
+            t = line_time_ns(line)
+            if t is not None and t >= time_ns:
+                target = n
+                break
+
+        start = max(target - context, 0)
+        return base + start, lines[start:target + context + 1]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect a compressed raw simulation log")
+    parser.add_argument("log", type=Path, help="sim_output.log.zst / .gz from a test build dir")
+    parser.add_argument("--at", type=str, metavar="TIME",
+                        help="Show lines around a simulation time (e.g. 2400ns, 1.5us)")
+    parser.add_argument("--context", type=int, default=20, help="Lines before/after (default: 20)")
+    parser.add_argument("--info", action="store_true", help="Show the block index")
+    args = parser.parse_args()
+
+    reader = SimLogReader(args.log)
+    if args.info or not args.at:
+        print(f"{args.log}: {reader.total_lines} lines, {reader.raw_bytes} bytes raw, "
+              f"{len(reader.blocks)} {reader.codec} blocks")
+        for i, block in enumerate(reader.blocks):
+            print(f"  block {i:4d}: lines {block.first_line}-{block.first_line + block.lines - 1}"
+                  f"  t={block.t_first}..{block.t_last} ns")
+        if not args.at:
+            return 0
+
+    first_line, lines = reader.lines_at(parse_sim_time(args.at), context=args.context)
+    for n, line in enumerate(lines, first_line + 1):
+        print(f"{n:8d}: {line.decode('utf-8', errors='replace')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,15 +5,31 @@ Provides a base class for all CocotB tests that implements:
 - Progressive test levels (P1=basic, P2=intermediate, P3=comprehensive)
 - Controlled verbosity to minimize LLM context consumption
 - Standardized test output formatting
+- Per sub-test / per level timing (wall clock, sim time, clock cycles),
+  written to <module>_timing.json and <module>_timing.xml (JUnit)
+- Optional FSM transition coverage (FSM_COVERAGE=1), written to
+  <name>_coverage.json (see fsm_coverage.py)
 
 Author: Volo Engineering
 Date: 2025-01-26
 """
 
 import cocotb
+from dataclasses import asdict, dataclass
+import json
 import os
+from pathlib import Path
+import time
 from enum import IntEnum
-from typing import Optional
+from typing import Dict, List, Optional
+import xml.etree.ElementTree as ET
+
+from fsm_coverage import FsmCoverage, fsm_coverage_enabled
+
+try:
+    from cocotb.simtime import get_sim_time  # cocotb 2.x
+except ImportError:
+    from cocotb.utils import get_sim_time
 
 
 class TestLevel(IntEnum):
@@ -46,6 +62,21 @@ class VerbosityLevel(IntEnum):
     DEBUG = 4
 
 
+@dataclass
+class SubTestTiming:
+    """Timing of one sub-test (or, with name == level, of a whole level)"""
+    name: str
+    level: str
+    passed: bool
+    wall_s: float
+    sim_ns: float
+    cycles: Optional[int] = None
+
+    @property
+    def sim_ns_per_wall_s(self) -> float:
+        return self.sim_ns / self.wall_s if self.wall_s > 0 else 0.0
+
+
 class TestBase:
     """
     Base class for CocotB tests with verbosity control.
@@ -69,16 +100,18 @@ class TestBase:
                 pass
     """
 
-    def __init__(self, dut, module_name: str):
+    def __init__(self, dut, module_name: str, clk_period_ns: Optional[float] = None):
         """
         Initialize test base.
 
         Args:
             dut: DUT object from CocotB
             module_name: Name of module being tested
+            clk_period_ns: DUT clock period, used to report clock cycles per test
         """
         self.dut = dut
         self.module_name = module_name
+        self.clk_period_ns = clk_period_ns
 
         # Get verbosity from environment (default: MINIMAL for LLM-friendliness)
         verbosity_str = os.environ.get("COCOTB_VERBOSITY", "MINIMAL")
@@ -99,6 +132,29 @@ class TestBase:
         self.passed_count = 0
         self.failed_count = 0
         self.current_phase = None
+        self.current_level: Optional[TestLevel] = None
+
+        # Timing per sub-test and per level (see timing_report())
+        self.timings: List[SubTestTiming] = []
+        self.level_timings: Dict[str, SubTestTiming] = {}
+
+        # FSM coverage collectors (only registered when FSM_COVERAGE=1)
+        self.fsm_coverage: List[FsmCoverage] = []
+
+    def add_fsm_coverage(self, coverage: FsmCoverage) -> Optional[FsmCoverage]:
+        """
+        Register an FSM coverage collector if FSM_COVERAGE is enabled.
+
+        Collectors start with run_all_tests() and are written next to the
+        timing artifacts at the end.
+
+        Returns:
+            The collector, or None when coverage is disabled
+        """
+        if not fsm_coverage_enabled():
+            return None
+        self.fsm_coverage.append(coverage)
+        return coverage
 
     def log(self, message: str, level: VerbosityLevel = VerbosityLevel.NORMAL):
         """
@@ -174,6 +230,9 @@ class TestBase:
                 self.dut._log.info(f"ALL {self.test_count} TESTS PASSED")
             else:
                 self.dut._log.info(f"FAILED: {self.failed_count}/{self.test_count}")
+            slowest = self.slowest_tests(1)
+            if slowest:
+                self.dut._log.info(f"SLOWEST: {slowest[0].name} ({slowest[0].wall_s:.2f}s)")
         else:
             # Normal or verbose summary
             self.log_separator()
@@ -186,6 +245,7 @@ class TestBase:
                 self.dut._log.info("RESULT: ALL TESTS PASSED ✓")
             else:
                 self.dut._log.error(f"RESULT: {self.failed_count} TESTS FAILED ✗")
+            self.log_timing_table()
             self.log_separator()
 
     async def test(self, test_name: str, test_func):
@@ -198,12 +258,26 @@ class TestBase:
         """
         self.log_test_start(test_name)
 
+        wall_start = time.perf_counter()
+        sim_start = get_sim_time("ns")
+        passed = False
         try:
             await test_func()
+            passed = True
             self.log_test_pass(test_name)
         except Exception as e:
             self.log_test_fail(test_name, str(e))
             raise  # Re-raise to fail the test
+        finally:
+            self.timings.append(self._timing(test_name, passed, wall_start, sim_start))
+
+    def _timing(self, name: str, passed: bool, wall_start: float, sim_start: float) -> SubTestTiming:
+        """Build a SubTestTiming from start marks taken with perf_counter/get_sim_time"""
+        sim_ns = get_sim_time("ns") - sim_start
+        cycles = round(sim_ns / self.clk_period_ns) if self.clk_period_ns else None
+        level = self.current_level.name if self.current_level is not None else "-"
+        return SubTestTiming(name=name, level=level, passed=passed,
+                          wall_s=time.perf_counter() - wall_start, sim_ns=sim_ns, cycles=cycles)
 
     def should_run_level(self, level: TestLevel) -> bool:
         """
@@ -218,34 +292,134 @@ class TestBase:
         Run all test phases up to the configured level.
 
         Override run_p1_basic, run_p2_intermediate, etc. in subclasses.
+        Timing artifacts are written even if a phase fails.
         """
-        # Always run P1 (basic tests)
-        if hasattr(self, 'run_p1_basic'):
-            self.log_phase_start("P1 - BASIC TESTS")
-            await self.run_p1_basic()
-
-        # Run P2 if level >= P2
-        if self.should_run_level(TestLevel.P2_INTERMEDIATE) and hasattr(self, 'run_p2_intermediate'):
-            self.log_phase_start("P2 - INTERMEDIATE TESTS")
-            await self.run_p2_intermediate()
-
-        # Run P3 if level >= P3
-        if self.should_run_level(TestLevel.P3_COMPREHENSIVE) and hasattr(self, 'run_p3_comprehensive'):
-            self.log_phase_start("P3 - COMPREHENSIVE TESTS")
-            await self.run_p3_comprehensive()
-
-        # Run P4 if level >= P4
-        if self.should_run_level(TestLevel.P4_EXHAUSTIVE) and hasattr(self, 'run_p4_exhaustive'):
-            self.log_phase_start("P4 - EXHAUSTIVE TESTS")
-            await self.run_p4_exhaustive()
+        phases = [
+            (TestLevel.P1_BASIC, "P1 - BASIC TESTS", "run_p1_basic"),
+            (TestLevel.P2_INTERMEDIATE, "P2 - INTERMEDIATE TESTS", "run_p2_intermediate"),
+            (TestLevel.P3_COMPREHENSIVE, "P3 - COMPREHENSIVE TESTS", "run_p3_comprehensive"),
+            (TestLevel.P4_EXHAUSTIVE, "P4 - EXHAUSTIVE TESTS", "run_p4_exhaustive"),
+        ]
+
+        for coverage in self.fsm_coverage:
+            coverage.start()
+
+        try:
+            for level, phase_name, method in phases:
+                # P1 always runs; higher levels only up to TEST_LEVEL
+                if not self.should_run_level(level) or not hasattr(self, method):
+                    continue
+                self.log_phase_start(phase_name)
+                await self._run_level(level, getattr(self, method))
+        finally:
+            self.write_timing_artifacts()
+            self.write_coverage_artifacts()
 
         # Print summary
         self.log_summary()
+        self.log_coverage()
 
         # Fail if any tests failed
         if self.failed_count > 0:
             raise AssertionError(f"{self.failed_count} tests failed")
 
+    async def _run_level(self, level: TestLevel, run_phase):
+        """Run one phase, recording its total wall/sim time (setup included)"""
+        self.current_level = level
+        wall_start = time.perf_counter()
+        sim_start = get_sim_time("ns")
+        passed = False
+        try:
+            await run_phase()
+            passed = True
+        finally:
+            self.level_timings[level.name] = self._timing(level.name, passed, wall_start, sim_start)
+            self.current_level = None
+
+    def slowest_tests(self, count: int = 5) -> List[SubTestTiming]:
+        """Sub-tests sorted by wall-clock time, slowest first"""
+        return sorted(self.timings, key=lambda t: t.wall_s, reverse=True)[:count]
+
+    def timing_report(self) -> dict:
+        """Timing data as a JSON-serializable dict"""
+        return {
+            "module": self.module_name,
+            "test_level": self.test_level.name,
+            "clk_period_ns": self.clk_period_ns,
+            "wall_s": sum(t.wall_s for t in self.level_timings.values()),
+            "sim_ns": sum(t.sim_ns for t in self.level_timings.values()),
+            "levels": {name: asdict(t) for name, t in self.level_timings.items()},
+            "tests": [asdict(t) for t in self.timings],
+        }
+
+    def write_timing_artifacts(self, directory: Optional[Path] = None):
+        """
+        Write <module>_timing.json and a JUnit <module>_timing.xml.
+
+        Args:
+            directory: Output directory (default: $TEST_TIMING_DIR, else the
+                       simulator's working directory, i.e. the test build dir)
+        """
+        directory = Path(directory or os.environ.get("TEST_TIMING_DIR", "."))
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = self.module_name.replace(" ", "_")
+
+        report = self.timing_report()
+        (directory / f"{stem}_timing.json").write_text(json.dumps(report, indent=2))
+
+        suite = ET.Element(
+            "testsuite",
+            name=self.module_name,
+            tests=str(len(self.timings)),
+            failures=str(sum(1 for t in self.timings if not t.passed)),
+            time=f"{report['wall_s']:.6f}",
+        )
+        for t in self.timings:
+            case = ET.SubElement(suite, "testcase", classname=f"{self.module_name}.{t.level}",
+                                 name=t.name, time=f"{t.wall_s:.6f}")
+            props = ET.SubElement(case, "properties")
+            ET.SubElement(props, "property", name="sim_time_ns", value=f"{t.sim_ns:g}")
+            if t.cycles is not None:
+                ET.SubElement(props, "property", name="cycles", value=str(t.cycles))
+            if not t.passed:
+                ET.SubElement(case, "failure", message="sub-test failed")
+        suites = ET.Element("testsuites")
+        suites.append(suite)
+        ET.ElementTree(suites).write(directory / f"{stem}_timing.xml",
+                                     encoding="utf-8", xml_declaration=True)
+
+    def write_coverage_artifacts(self, directory: Optional[Path] = None):
+        """Stop the FSM coverage collectors and write <name>_coverage.json each"""
+        directory = Path(directory or os.environ.get("TEST_TIMING_DIR", "."))
+        for coverage in self.fsm_coverage:
+            coverage.stop()
+            directory.mkdir(parents=True, exist_ok=True)
+            coverage.write(directory)
+
+    def log_coverage(self):
+        """Log FSM coverage: one line at MINIMAL, the transition matrix at NORMAL+"""
+        for coverage in self.fsm_coverage:
+            if self.verbosity >= VerbosityLevel.NORMAL:
+                for line in coverage.matrix_lines():
+                    self.dut._log.info(line)
+            elif self.verbosity == VerbosityLevel.MINIMAL:
+                self.dut._log.info(f"FSM COVERAGE: {coverage.name} {coverage.percent():.0f}%")
+
+    def log_timing_table(self, count: int = 5):
+        """Log the slowest sub-tests with their wall/sim time and cycles"""
+        slowest = self.slowest_tests(count)
+        if not slowest:
+            return
+        self.dut._log.info(f"SLOWEST {len(slowest)} TESTS:")
+        self.dut._log.info(f"  {'wall':>8}  {'sim':>12}  {'cycles':>9}  {'level':<17} test")
+        for t in slowest:
+            cycles = str(t.cycles) if t.cycles is not None else "-"
+            self.dut._log.info(
+                f"  {t.wall_s:7.2f}s  {t.sim_ns / 1000:10.2f}us  {cycles:>9}  {t.level:<17} {t.name}")
+        for name, t in self.level_timings.items():
+            self.dut._log.info(f"  {name}: {t.wall_s:.2f}s wall, {t.sim_ns / 1000:.2f}us sim, "
+                               f"{t.sim_ns_per_wall_s:,.0f} sim-ns/s")
+
 
 def get_test_runner(dut, module_name: str) -> TestBase:
     """
@@ -14,7 +14,7 @@ Date: 2025-01-27
 
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -23,6 +23,9 @@ VHDL_PKG = VHDL / "packages"
 SHARED = PROJECT_ROOT / "shared"
 TESTS = PROJECT_ROOT / "tests"
 
+# GHDL flags used unless a test overrides ghdl_args
+DEFAULT_GHDL_ARGS = ["--std=08"]
+
 
 @dataclass
 class TestConfig:
@@ -32,7 +35,7 @@ class TestConfig:
     toplevel: str
     test_module: str
     category: str = "misc"
-    ghdl_args: List[str] = field(default_factory=lambda: ["--std=08"])
+    ghdl_args: List[str] = field(default_factory=lambda: list(DEFAULT_GHDL_ARGS))
 
 
 # ==================================================================================
@@ -204,6 +207,25 @@ def get_categories() -> List[str]:
     return sorted(set(config.category for config in TESTS_CONFIG.values()))
 
 
+def get_shared_sources(min_users: int = 2) -> List[Path]:
+    """
+    Get sources listed by at least `min_users` test configs (first-seen order).
+
+    These are analyzed once into the shared work library that run.py seeds
+    every test build from, instead of being re-analyzed per test. Only
+    configs using DEFAULT_GHDL_ARGS take part, since analysis results are
+    not portable across different GHDL flags.
+    """
+    users: Dict[Path, int] = {}
+    for config in TESTS_CONFIG.values():
+        if config.ghdl_args != DEFAULT_GHDL_ARGS:
+            continue
+        for source in config.sources:
+            users[source] = users.get(source, 0) + 1
+
+    return [source for source, count in users.items() if count >= min_users]
+
+
 def validate_test_files() -> dict:
     """
     Validate that all configured test files exist.
@@ -243,6 +265,11 @@ if __name__ == "__main__":
         for test_name in sorted(tests.keys()):
             print(f"    - {test_name}")
 
+    shared = get_shared_sources()
+    print(f"\nShared library sources ({len(shared)}):")
+    for source in shared:
+        print(f"  - {source.relative_to(PROJECT_ROOT)}")
+
     # Validate files
     print("\nValidating test files...")
     issues = validate_test_files()
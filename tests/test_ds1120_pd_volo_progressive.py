@@ -20,17 +20,24 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from conftest import setup_clock, reset_active_high
+from fsm_coverage import FsmCoverage
 from test_base import TestBase, VerbosityLevel
 from ds1120_pd_tests.ds1120_pd_constants import *
+from models.reference import DS1120_OBSERVER
+from models.reference.ds1140_pd import FSM_TRANSITIONS  # Same ds1120_pd_fsm
 
 
 class DS1120PDTests(TestBase):
     """Progressive tests for DS1120-PD VOLO Application"""
 
     def __init__(self, dut):
-        super().__init__(dut, MODULE_NAME)
+        super().__init__(dut, MODULE_NAME, clk_period_ns=DEFAULT_CLK_PERIOD_NS)
+        # FSM_COVERAGE=1: transitions seen on the observer output (OutputB = debug_voltage)
+        self.add_fsm_coverage(FsmCoverage.for_observer(
+            "DS1120-PD", dut.OutputB, DS1120_OBSERVER, legal=FSM_TRANSITIONS))
 
     async def setup(self):
         """Common setup for all tests"""
@@ -4,6 +4,7 @@ Progressive CocotB Test for DS1140-PD VOLO Application
 Tests the refactored EMFI probe driver with progressive test structure:
 - P1 (Basic): Reset, arm/trigger, three outputs, FSM observer, VOLO_READY control
 - P2 (Intermediate): Timeout, full cycle, clock divider, intensity clamping
+- P3 (Comprehensive): Seeded constrained-random register images vs the cycle model
 
 DS1140-PD Key Features:
 - Three outputs: OutputA (trigger), OutputB (intensity), OutputC (FSM debug)
@@ -17,21 +18,49 @@ Date: 2025-10-28
 
 import cocotb
 from cocotb.triggers import ClockCycles
+import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from conftest import setup_clock, reset_active_high
+from conftest import capture_signal_sequence, setup_clock, reset_active_high
+from fsm_coverage import FsmCoverage
 from test_base import TestBase, VerbosityLevel
+from waveform_recorder import WaveformRecorder
 from ds1140_pd_tests.ds1140_pd_constants import *
+from ds1140_pd_tests.ds1140_pd_lockstep import DS1140Lockstep, lockstep_enabled
+from ds1140_pd_tests.ds1140_pd_stimulus import (
+    FIELD_BINS, REGISTER_FIELDS, RTL_CONSTRAINTS, DS1140StimulusGenerator, FieldCoverage,
+    drive_scenario, predict,
+)
+from models.reference.ds1140_pd import FSM_TRANSITIONS, DS1140State
 
 
 class DS1140PDTests(TestBase):
     """Progressive tests for DS1140-PD VOLO Application"""
 
     def __init__(self, dut):
-        super().__init__(dut, MODULE_NAME)
+        super().__init__(dut, MODULE_NAME, clk_period_ns=TestValues.DEFAULT_CLK_PERIOD_NS)
+        # DS1140_LOCKSTEP=1: compare outputs against the Python cycle model every cycle
+        self.lockstep = DS1140Lockstep(dut) if lockstep_enabled() else None
+        # FSM_COVERAGE=1: transitions seen on OutputC, register fields binned on each arm
+        self.add_fsm_coverage(FsmCoverage.for_observer(
+            "DS1140-PD", dut.OutputC, DS1140_OBSERVER, legal=FSM_TRANSITIONS,
+            fields={name: (getattr(dut, name), FIELD_BINS[name]) for name in REGISTER_FIELDS},
+            sample_state=DS1140State.ARMED,
+        ))
+
+    async def test(self, test_name: str, test_func):
+        """Run a sub-test; in lockstep mode it also fails on any model mismatch"""
+        if self.lockstep is None:
+            return await super().test(test_name, test_func)
+
+        async def checked():
+            await test_func()
+            self.lockstep.check(test_name)
+
+        await super().test(test_name, checked)
 
     async def setup(self):
         """Common setup for all tests"""
@@ -55,6 +84,9 @@ class DS1140PDTests(TestBase):
         self.dut.bram_addr.value = 0
         self.dut.bram_data.value = 0
         self.dut.bram_we.value = 0
+        if self.lockstep is not None and not self.lockstep.running:
+            self.lockstep.start()
+            self.log("Lockstep vs DS1140Model enabled", VerbosityLevel.NORMAL)
         self.log("Setup complete", VerbosityLevel.VERBOSE)
 
     # ====================================================================
@@ -239,6 +271,13 @@ class DS1140PDTests(TestBase):
         self.dut.intensity.value = 0x4000  # Direct 16-bit!
         await ClockCycles(self.dut.Clk, 2)
 
+        # Record the outputs for the whole cycle; the per-cycle capture of
+        # OutputC over the same window cross-checks the recorder
+        cycles = TestValues.FULL_CYCLE_CAPTURE_CYCLES
+        sequence = cocotb.start_soon(capture_signal_sequence(self.dut.OutputC, self.dut.Clk, cycles))
+        recorder = WaveformRecorder(self.dut, ["OutputA", "OutputC"], clk=self.dut.Clk)
+        await recorder.start()
+
         # Arm FSM
         self.log("Arming FSM...", VerbosityLevel.VERBOSE)
         self.dut.arm_probe.value = 1
@@ -262,6 +301,20 @@ class DS1140PDTests(TestBase):
         self.dut.reset_fsm.value = 0
         await ClockCycles(self.dut.Clk, 2)
 
+        expected = await sequence
+        recorder.stop()
+        recorded = list(recorder.values("OutputC", 0, cycles))
+        assert recorded == expected, ErrorMessages.RECORDER_MISMATCH.format(recorded, expected)
+
+        table = TestValues.FSM_OBSERVER
+        states = [DS1140State(table.decode(((code + 0x8000) & 0xFFFF) - 0x8000,
+                                           TestValues.FSM_CODE_TOLERANCE)[1]).name
+                  for _, code in recorder.changes("OutputC")]
+        assert states == TestValues.FULL_CYCLE_STATES, ErrorMessages.STATE_SEQUENCE.format(
+            TestValues.FULL_CYCLE_STATES, states)
+        if self.verbosity >= VerbosityLevel.VERBOSE:
+            recorder.log_table(self.dut, 0, 12, "Full cycle: arm and trigger")
+
         self.log("Full cycle verified", VerbosityLevel.VERBOSE)
 
     async def test_divider(self):
@@ -356,6 +409,47 @@ class DS1140PDTests(TestBase):
         self.log("Debug mux view switching verified (or skipped if not implemented)", VerbosityLevel.VERBOSE)
 
 
+    # ====================================================================
+    # P3 - Comprehensive Tests (Constrained-random)
+    # ====================================================================
+
+    async def run_p3_comprehensive(self):
+        """P3 - Constrained-random validation (1 test, N scenarios)"""
+        await self.setup()
+
+        await self.test("Constrained-random scenarios", self.test_random_scenarios)
+
+    async def test_random_scenarios(self):
+        """Seeded random register images: final outputs must match DS1140Model"""
+        seed = int(os.environ.get("DS1140_RANDOM_SEED", TestValues.P3_RANDOM_SEED))
+        count = int(os.environ.get("DS1140_RANDOM_COUNT", TestValues.P3_RANDOM_SCENARIOS))
+        generator = DS1140StimulusGenerator(seed=seed, constraints=RTL_CONSTRAINTS)
+        coverage = FieldCoverage()
+        self.log(f"{count} scenarios, seed {seed}", VerbosityLevel.NORMAL)
+
+        failures = []
+        for scenario in generator.batch(count):
+            expected = predict(scenario)
+            self.log(scenario.describe(), VerbosityLevel.VERBOSE)
+            await drive_scenario(self.dut, scenario)
+
+            # Each scenario ends with settle cycles, so outputs are stable here
+            actual = {port: ((int(getattr(self.dut, port).value) + 0x8000) & 0xFFFF) - 0x8000
+                      for port in ("OutputA", "OutputB", "OutputC")}
+            wanted = {"OutputA": expected.output_a, "OutputB": expected.output_b,
+                      "OutputC": expected.output_c}
+            if actual != wanted:
+                failures.append(f"{scenario.describe()}: RTL {actual} != model {wanted}")
+            coverage.sample(scenario, expected.state)
+
+        for line in coverage.report():
+            self.log(line, VerbosityLevel.NORMAL)
+        assert not failures, f"{len(failures)}/{count} scenarios differ from the model " \
+                             f"(seed {seed}):\n  " + "\n  ".join(failures[:10])
+
+        self.log("Constrained-random scenarios verified", VerbosityLevel.VERBOSE)
+
+
 # CocotB entry point
 @cocotb.test()
 async def test_ds1140_pd_volo(dut):
@@ -31,7 +31,7 @@ class HandshakeShimTests(TestBase):
     """Progressive tests for shim layer handshaking"""
 
     def __init__(self, dut):
-        super().__init__(dut, MODULE_NAME)
+        super().__init__(dut, MODULE_NAME, clk_period_ns=TestTiming.CLOCK_PERIOD_NS)
 
     async def setup(self):
         """Common setup for all tests"""
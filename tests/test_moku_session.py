@@ -0,0 +1,152 @@
+"""
+Unit tests for AsyncControlSession against the local CloudCompile stand-in.
+
+Covers coalescing, bulk batching, per-register ordering, pipelining of
+independent writes, awaitable pulses and read-after-write.
+"""
+
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from models.moku_control import (
+    AsyncControlSession,
+    PerRegisterStandIn,
+    StandInCloudCompile,
+)
+
+
+@pytest.fixture
+def server():
+    server = StandInCloudCompile(latency_s=0.01)
+    yield server
+    server.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestCoalescing:
+    """Writes staged in one tick share a call."""
+
+    def test_same_register_keeps_last_value(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                futures = [session.write(3, v) for v in (1, 2, 3)]
+                await asyncio.gather(*futures)
+                return session.stats
+
+        stats = run(main())
+        assert server.history(3) == [3]
+        assert stats.coalesced == 2
+        assert server.calls == 1
+
+    def test_independent_registers_one_bulk_call(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                await session.set_many({i: i + 100 for i in range(9)})
+
+        run(main())
+        assert server.calls == 1
+        assert [server.controls[i] for i in range(9)] == [i + 100 for i in range(9)]
+
+    def test_without_bulk_api_calls_per_register(self):
+        server = PerRegisterStandIn(latency_s=0.01)
+        try:
+            async def main():
+                async with AsyncControlSession(server) as session:
+                    await session.set_many({0: 1, 1: 2, 2: 3})
+
+            run(main())
+            assert server.calls == 3
+            assert server.max_concurrent == 3  # Pipelined, not serialized
+        finally:
+            server.close()
+
+
+class TestOrdering:
+    """Writes to one register land in program order."""
+
+    def test_writes_across_ticks_stay_ordered(self, server):
+        async def main():
+            async with AsyncControlSession(server, max_in_flight=4) as session:
+                for v in range(10):
+                    session.write(5, v)
+                    session.write(6, v)
+                    await asyncio.sleep(0.002)  # New tick while earlier writes are in flight
+
+        run(main())
+        for reg in (5, 6):
+            history = server.history(reg)
+            assert history == sorted(history)
+            assert history[-1] == 9
+        assert server.controls[5] == 9
+
+    def test_read_after_write(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                session.write(7, 0xABCD0000)
+                return await session.read(7)
+
+        assert run(main()) == 0xABCD0000
+
+
+class TestPulse:
+    """Button pulses are awaitable and never coalesced."""
+
+    def test_pulse_press_then_release(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                await session.pulse(0, 0x80000000)
+
+        run(main())
+        assert server.history(0) == [0x80000000, 0]
+        press, release = [w for w in server.log if w.reg == 0]
+        assert release.call > press.call
+
+    def test_concurrent_pulses_pipeline(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                t0 = time.perf_counter()
+                await asyncio.gather(*(session.pulse(reg, 0x80000000) for reg in range(3)))
+                return time.perf_counter() - t0
+
+        elapsed = run(main())
+        for reg in range(3):
+            assert server.history(reg) == [0x80000000, 0]
+        # Presses share one call and releases another: ~2 round trips, not 6
+        assert server.calls == 2
+        assert elapsed < 4 * server.latency_s
+
+
+class TestErrors:
+    """Call failures reach the awaiting code."""
+
+    def test_error_propagates_to_future_and_flush(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                with pytest.raises(ValueError):
+                    await session.set(99, 1)
+                session.write(99, 2)
+                with pytest.raises(ValueError):
+                    await session.flush()
+
+        run(main())
+
+    def test_awaited_error_not_raised_again(self, server):
+        async def main():
+            async with AsyncControlSession(server) as session:
+                with pytest.raises(ValueError):
+                    await session.set(999, 1)
+                with pytest.raises(ValueError):
+                    await session.set_many({0: 1, 999: 2})
+                await session.set(1, 5)
+                await session.flush()
+
+        run(main())  # Exiting the session must not raise the errors again
+        assert server.controls[1] == 5
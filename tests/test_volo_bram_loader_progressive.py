@@ -21,13 +21,19 @@ Date: 2025-01-28
 
 import cocotb
 from cocotb.triggers import RisingEdge, ClockCycles
+import random
 import sys
 from pathlib import Path
 
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from conftest import setup_clock
+from conftest import DEFAULT_CLK_PERIOD_NS, mcc_write_regs, setup_clock
+from models.bram_loader.buffer import words_crc32
+from models.bram_loader.protocol import (
+    CR_ADDR, CR_DATA, CR_DATA_B, CR_STROBE, stream_batches, tag_value, verify_batch,
+)
 from test_base import TestBase, TestLevel, VerbosityLevel
 from volo_bram_loader_tests.volo_bram_loader_constants import *
 
@@ -36,7 +42,8 @@ class VoloBramLoaderTests(TestBase):
     """Progressive tests for volo_bram_loader module with FSM observer"""
 
     def __init__(self, dut):
-        super().__init__(dut, MODULE_NAME)
+        super().__init__(dut, MODULE_NAME, clk_period_ns=DEFAULT_CLK_PERIOD_NS)
+        self.rng = random.Random(Timing.STREAM_SEED)
 
     async def setup(self):
         """Common setup for all tests"""
@@ -105,6 +112,52 @@ class VoloBramLoaderTests(TestBase):
         self.dut.Control10.value = control10_val
         await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
 
+    async def capture_writes(self, cycles: int, writes: list):
+        """
+        Run cycles clock edges, recording (addr, data) of every BRAM write.
+
+        Values read right after RisingEdge are the ones the BRAM sampled.
+        """
+        for _ in range(cycles):
+            await RisingEdge(self.dut.Clk)
+            if int(self.dut.bram_we.value):
+                writes.append((int(self.dut.bram_addr.value), int(self.dut.bram_data.value)))
+
+    async def apply_batch(self, batch, writes: list):
+        """Write one batch of (register, value) pairs, in order with random skew"""
+        for reg, value in batch:
+            getattr(self.dut, f"Control{reg}").value = value
+            await self.capture_writes(self.rng.randint(0, Timing.STREAM_MAX_SKEW_CYCLES), writes)
+        await self.capture_writes(Timing.STREAM_BATCH_GAP_CYCLES, writes)
+
+    def read_crc(self) -> int:
+        return int(self.dut.crc_out.value)
+
+    def check_crc(self, expected: int):
+        actual = self.read_crc()
+        assert actual == expected, ErrorMessages.CRC_MISMATCH.format(actual, expected)
+
+    async def stream_load(self, words, base_addr: int = 0, continue_crc: bool = False) -> list:
+        """
+        Load words with the stream protocol, as BRAMUploader sends them.
+
+        Registers of one batch land in order with random skew, like one bulk
+        set_controls call; batches are STREAM_BATCH_GAP_CYCLES apart.
+
+        Returns:
+            List of (addr, data) BRAM writes seen during the load
+        """
+        writes = []
+        for batch in stream_batches(words, base_addr, continue_crc):
+            await self.apply_batch(batch, writes)
+        await self.capture_writes(Timing.STATE_TRANSITION_CYCLES, writes)
+        return writes
+
+    def check_stream_writes(self, writes: list, words, base_addr: int):
+        expected = [(base_addr + i, w) for i, w in enumerate(words)]
+        assert writes == expected, ErrorMessages.STREAM_WRITES_MISMATCH.format(
+            [(hex(a), hex(d)) for a, d in writes], [(hex(a), hex(d)) for a, d in expected])
+
     # ========================================================================
     # P1 - Basic Tests (REQUIRED, runs by default)
     # ========================================================================
@@ -116,6 +169,8 @@ class VoloBramLoaderTests(TestBase):
         await self.test("Reset behavior", self.test_reset)
         await self.test("FSM observer in IDLE", self.test_observer_idle)
         await self.test("Single word write", self.test_single_word_write)
+        await self.test("Stream mode load", self.test_stream_load)
+        await self.test("Upload CRC matches Python", self.test_upload_crc)
 
     async def test_reset(self):
         """Test reset puts module in known state"""
@@ -168,6 +223,36 @@ class VoloBramLoaderTests(TestBase):
         self.check_observer_voltage(ObserverVoltages.DONE)
         self.log(f"Observer DONE: {self.get_observer_voltage()}", VerbosityLevel.VERBOSE)
 
+    async def test_stream_load(self):
+        """Test stream mode: auto-increment address, tag-committed word pairs"""
+        await self.setup()
+
+        base_addr = 0x010
+        words = TestPatterns.sequential(start=0xC0DE0000, count=8)
+        writes = await self.stream_load(words, base_addr)
+
+        self.check_stream_writes(writes, words, base_addr)
+        done = int(self.dut.done.value)
+        assert done == 1, ErrorMessages.DONE_NOT_ASSERTED.format(len(words))
+        self.check_observer_voltage(ObserverVoltages.DONE)
+        self.log(f"Stream load: {len(words)} words at 0x{base_addr:03X}", VerbosityLevel.VERBOSE)
+
+    async def test_upload_crc(self):
+        """Test crc_out against the Python CRC-32 (zlib) of the written words"""
+        await self.setup()
+
+        self.check_crc(words_crc32([]))  # Nothing written since reset
+
+        words = [self.rng.getrandbits(32) for _ in range(9)]
+        await self.stream_load(words, 0x040)
+        self.check_crc(words_crc32(words))
+
+        # Verify with the right CRC: stays in DONE
+        await self.apply_batch(verify_batch(words_crc32(words), len(words)), [])
+        await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
+        self.check_observer_voltage(ObserverVoltages.DONE)
+        self.log(f"Upload CRC 0x{self.read_crc():08X}", VerbosityLevel.VERBOSE)
+
     # ========================================================================
     # P2 - Intermediate Tests (full functionality)
     # ========================================================================
@@ -181,6 +266,11 @@ class VoloBramLoaderTests(TestBase):
         await self.test("Observer voltage transitions", self.test_observer_transitions)
         await self.test("Edge case: zero words", self.test_zero_words)
         await self.test("Edge case: max address", self.test_max_address)
+        await self.test("Stream reload from DONE", self.test_stream_reload)
+        await self.test("Stream extra tags ignored", self.test_stream_extra_tags)
+        await self.test("CRC verify mismatch and reload", self.test_crc_mismatch)
+        await self.test("CRC across runs and strobe writes", self.test_crc_continue)
+        await self.test("Bulk register image writes", self.test_bulk_register_image)
 
     async def test_multiple_words(self):
         """Test writing multiple words sequentially"""
@@ -310,6 +400,134 @@ class VoloBramLoaderTests(TestBase):
         self.log(f"Max address 0x{max_addr:03X} handled correctly", VerbosityLevel.VERBOSE)
 
 
+    async def test_stream_reload(self):
+        """Test back-to-back stream loads: odd word count, reload from DONE, top of BRAM"""
+        await self.setup()
+
+        first = [self.rng.getrandbits(32) for _ in range(5)]
+        writes = await self.stream_load(first, 0x100)
+        self.check_stream_writes(writes, first, 0x100)
+        self.check_observer_voltage(ObserverVoltages.DONE)
+
+        # Second load restarts from DONE on the start edge, no reset needed;
+        # done drops from the start batch until the last word is written
+        second = [self.rng.getrandbits(32) for _ in range(3)]
+        batches = list(stream_batches(second, 0xFFD))
+        writes = []
+        await self.apply_batch(batches[0], writes)  # Re-arm the start edge
+        for batch in batches[1:-1]:
+            await self.apply_batch(batch, writes)
+            done = int(self.dut.done.value)
+            assert done == 0, ErrorMessages.DONE_DURING_RELOAD.format(done)
+        await self.apply_batch(batches[-1], writes)
+        await self.capture_writes(Timing.STATE_TRANSITION_CYCLES, writes)
+        self.check_stream_writes(writes, second, 0xFFD)
+        done = int(self.dut.done.value)
+        assert done == 1, ErrorMessages.DONE_NOT_ASSERTED.format(len(second))
+        self.check_observer_voltage(ObserverVoltages.DONE)
+
+    async def test_stream_extra_tags(self):
+        """Test stream mode writes no more than word_count words"""
+        await self.setup()
+
+        words = [TestPatterns.PATTERN_AA55, TestPatterns.PATTERN_DEADBEEF, TestPatterns.PATTERN_ONES]
+        batches = list(stream_batches(words, 0x020))
+        # Make the odd last word a pair (its second word exceeds the count),
+        # then send one more tag after the load is complete
+        batches[-1] = [(CR_DATA, words[2]), (CR_DATA_B, TestPatterns.PATTERN_ZEROS),
+                       (CR_STROBE, tag_value(9, pair=True))]
+        batches.append([(CR_DATA, TestPatterns.PATTERN_ZEROS), (CR_STROBE, tag_value(10, pair=False))])
+
+        writes = []
+        for batch in batches:
+            for reg, value in batch:
+                getattr(self.dut, f"Control{reg}").value = value
+            await self.capture_writes(Timing.STREAM_BATCH_GAP_CYCLES, writes)
+
+        self.check_stream_writes(writes, words, 0x020)
+        self.check_observer_voltage(ObserverVoltages.DONE)
+
+
+    async def test_crc_mismatch(self):
+        """Test a wrong expected CRC moves to CRC_ERR, and a reload recovers"""
+        await self.setup()
+
+        words = TestPatterns.alternating(count=6)
+        await self.stream_load(words, 0x000)
+        await self.apply_batch(verify_batch(words_crc32(words) ^ 1, len(words)), [])
+        await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
+        self.check_observer_voltage(ObserverVoltages.CRC_ERR)
+        # Fault shows as the negated DONE voltage (observer out of reset)
+        voltage = self.get_observer_voltage()
+        assert voltage < 0, ErrorMessages.VOLTAGE_SIGN_UNEXPECTED.format("negative", voltage)
+
+        # Done drops in CRC_ERR; a new start edge reloads and restarts the CRC
+        done = int(self.dut.done.value)
+        assert done == 0, ErrorMessages.DONE_IN_CRC_ERR.format(done)
+        words = TestPatterns.sequential(start=0x5000, count=4)
+        writes = await self.stream_load(words, 0x000)
+        self.check_stream_writes(writes, words, 0x000)
+        self.check_crc(words_crc32(words))
+        await self.apply_batch(verify_batch(words_crc32(words), len(words)), [])
+        await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
+        self.check_observer_voltage(ObserverVoltages.DONE)
+        done = int(self.dut.done.value)
+        assert done == 1, ErrorMessages.DONE_NOT_ASSERTED.format(len(words))
+
+    async def test_crc_continue(self):
+        """Test the CRC chains across delta runs and covers strobe-mode writes"""
+        await self.setup()
+
+        # Two runs, the second continuing the CRC (as BRAMUploader.upload_runs)
+        first = [self.rng.getrandbits(32) for _ in range(4)]
+        second = [self.rng.getrandbits(32) for _ in range(3)]
+        await self.stream_load(first, 0x200)
+        await self.stream_load(second, 0x300, continue_crc=True)
+        self.check_crc(words_crc32(second, words_crc32(first)))
+        await self.apply_batch(verify_batch(words_crc32(first + second), len(second),
+                                            continue_crc=True), [])
+        await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
+        self.check_observer_voltage(ObserverVoltages.DONE)
+
+        # Strobe protocol writes feed the same CRC
+        await self.setup()
+        words = [TestPatterns.PATTERN_DEADBEEF, TestPatterns.PATTERN_AA55]
+        await self.start_loading(len(words))
+        for addr, data in enumerate(words):
+            await self.write_word(addr, data)
+        self.check_crc(words_crc32(words))
+
+    async def test_bulk_register_image(self):
+        """Test mcc_write_regs diffs against the DUT, including direct ControlN writes"""
+        await self.setup()
+        await self.start_loading(1)
+
+        addr, data = 0x0A5, TestPatterns.PATTERN_DEADBEEF
+        image = {CR_ADDR: addr, CR_DATA: data, CR_STROBE: 0}
+
+        # setup() already cleared CR13 directly: only address and data change
+        written = await mcc_write_regs(self.dut, image)
+        expected = {CR_ADDR: addr, CR_DATA: data}
+        assert written == expected, ErrorMessages.BULK_WRITE_MISMATCH.format(written, expected)
+
+        # A direct write behind the helper's back must not hide the difference
+        self.dut.Control11.value = 0x001
+        await ClockCycles(self.dut.Clk, 1)
+        written = await mcc_write_regs(self.dut, image)
+        expected = {CR_ADDR: addr}
+        assert written == expected, ErrorMessages.BULK_WRITE_MISMATCH.format(written, expected)
+
+        # Strobe the word in with two more image updates
+        await mcc_write_regs(self.dut, {**image, CR_STROBE: ControlBits.WRITE_STROBE_MASK},
+                             settle_cycles=Timing.STROBE_HOLD_CYCLES)
+        await mcc_write_regs(self.dut, image, settle_cycles=Timing.POST_WRITE_CYCLES)
+        await ClockCycles(self.dut.Clk, Timing.STATE_TRANSITION_CYCLES)
+
+        done = int(self.dut.done.value)
+        assert done == 1, ErrorMessages.DONE_NOT_ASSERTED.format(1)
+        self.check_crc(words_crc32([data]))
+
+
 # ============================================================================
 # CocotB Test Entry Point
 # ============================================================================
@@ -18,23 +18,32 @@ Date: 2025-01-27
 """
 
 import cocotb
-from cocotb.triggers import RisingEdge, ClockCycles
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, Timer
 import sys
 from pathlib import Path
 
 # Add parent directory for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from conftest import setup_clock, reset_active_low, count_pulses, assert_pulse_count
+from conftest import (
+    setup_clock, reset_active_low, count_pulses, assert_pulse_count,
+    capture_signal_sequence, wait_for_value,
+    capture_signal_changes, count_pulses_by_edge, expand_signal_changes, wait_for_value_by_edge,
+)
 from test_base import TestBase, TestLevel, VerbosityLevel
 from volo_clk_divider_tests.volo_clk_divider_constants import *
 
+try:
+    from cocotb.simtime import get_sim_time  # cocotb 2.x
+except ImportError:
+    from cocotb.utils import get_sim_time
+
 
 class VoloClkDividerTests(TestBase):
     """Progressive tests for volo_clk_divider module"""
 
     def __init__(self, dut):
-        super().__init__(dut, MODULE_NAME)
+        super().__init__(dut, MODULE_NAME, clk_period_ns=DEFAULT_CLK_PERIOD_NS)
 
     async def setup(self):
         """Common setup for all tests"""
@@ -128,6 +137,8 @@ class VoloClkDividerTests(TestBase):
         await self.test("Divide by 10", self.test_divide_by_10)
         await self.test("Maximum division (255)", self.test_max_division)
         await self.test("Status register", self.test_status_register)
+        await self.test("Edge-triggered capture helpers", self.test_edge_capture)
+        await self.test("Edge-triggered wait helper", self.test_edge_wait)
 
     async def test_divide_by_1(self):
         """Test bypass mode where clk_en is always high"""
@@ -204,6 +215,71 @@ class VoloClkDividerTests(TestBase):
         assert wrap_detected, "Counter should wrap during test"
         self.log("Status register verified", VerbosityLevel.VERBOSE)
 
+    async def start_edge_stimulus(self):
+        """Reset, divide by EDGE_DIV_SEL and start toggling enable between clock edges"""
+        await reset_active_low(self.dut)
+        self.dut.div_sel.value = TestValues.EDGE_DIV_SEL
+        self.dut.enable.value = 1
+        await ClockCycles(self.dut.clk, 1)
+        return cocotb.start_soon(self.drive_enable(TestValues.EDGE_ENABLE_PATTERN))
+
+    async def drive_enable(self, pattern):
+        await FallingEdge(self.dut.clk)
+        for delay_ns, value in pattern:
+            await Timer(delay_ns, "ns")
+            self.dut.enable.value = value
+
+    async def timed(self, coro):
+        """Await coro, returning (result, sim time it returned at)"""
+        result = await coro
+        return result, get_sim_time("ns")
+
+    async def test_edge_capture(self):
+        """Test capture/count *_by_edge helpers against the per-cycle ones over one window"""
+        stimulus = await self.start_edge_stimulus()
+
+        clk = self.dut.clk
+        cycles = TestValues.EDGE_WINDOW_CYCLES
+        signals = [self.dut.enable, self.dut.clk_en, self.dut.stat_reg]
+        per_cycle = [cocotb.start_soon(capture_signal_sequence(signal, clk, cycles))
+                     for signal in signals]
+        by_edge = [cocotb.start_soon(capture_signal_changes(signal, clk, cycles))
+                   for signal in signals]
+        pulses = cocotb.start_soon(count_pulses(self.dut.clk_en, clk, cycles))
+        pulses_by_edge = await count_pulses_by_edge(self.dut.clk_en, clk, cycles)
+
+        for signal, sequence, changes in zip(signals, per_cycle, by_edge):
+            expected = await sequence
+            actual = expand_signal_changes(await changes, cycles)
+            assert actual == expected, ErrorMessages.EDGE_MISMATCH.format(
+                signal._name, actual, expected)
+        expected = await pulses
+        assert pulses_by_edge == expected, ErrorMessages.EDGE_MISMATCH.format(
+            "clk_en pulses", pulses_by_edge, expected)
+        await stimulus
+
+        self.log(f"Edge capture matched over {cycles} cycles ({expected} pulses)",
+                 VerbosityLevel.VERBOSE)
+
+    async def test_edge_wait(self):
+        """Test wait_for_value_by_edge returns the same result on the same edge as wait_for_value"""
+        stimulus = await self.start_edge_stimulus()
+
+        clk = self.dut.clk
+        cycles = TestValues.EDGE_WINDOW_CYCLES
+        # enable 0 (past a glitch), back to 1 (past another), 0 again; then a timeout
+        waits = [(self.dut.enable, 0), (self.dut.enable, 1), (self.dut.enable, 0),
+                 (self.dut.stat_reg, TestValues.EDGE_UNREACHED_STATUS)]
+        for signal, value in waits:
+            per_cycle = cocotb.start_soon(self.timed(wait_for_value(signal, value, clk, cycles)))
+            actual = await self.timed(wait_for_value_by_edge(signal, value, clk, cycles))
+            expected = await per_cycle
+            assert actual == expected, ErrorMessages.EDGE_MISMATCH.format(
+                f"wait for {signal._name} == {value}", actual, expected)
+        await stimulus
+
+        self.log("Edge waits resumed on the per-cycle edges", VerbosityLevel.VERBOSE)
+
 
 # CocotB test entry point
 @cocotb.test()
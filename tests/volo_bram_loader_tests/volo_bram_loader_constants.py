@@ -11,6 +11,12 @@ Author: EZ-EMFI Team
 Date: 2025-01-28
 """
 
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from models.reference import BRAM_LOADER_OBSERVER
+
 # Module identification
 MODULE_NAME = "volo_bram_loader"
 
@@ -23,7 +29,8 @@ class FSMStates:
     IDLE = 0b00
     LOADING = 0b01
     DONE = 0b10
-    RESERVED = 0b11  # Fault state
+    CRC_ERR = 0b11   # Fault state (upload CRC mismatch)
+    RESERVED = CRC_ERR
 
 
 # ==================================================================================
@@ -39,14 +46,15 @@ class FSMStates:
 class ObserverVoltages:
     """Expected voltages from FSM observer (±5V scale, 16-bit signed)"""
 
-    # Voltage calculation: V = V_MIN + (state_index * (V_MAX - V_MIN) / (num_normal - 1))
-    # Only 3 normal states (0, 1, 2), so v_step = 2.0 / 2 = 1.0V
-    # Digital = round(V * 32767 / 5.0)  [Note: VOLO_DIGITAL_SCALE_FACTOR = 32767/5 = 6553.4]
+    # Codes from the fsm_observer reference model (bit-exact with the RTL):
+    # 3 normal states (0, 1, 2) → 1.0V steps; state 3 negates the last normal state
+    _TABLE = BRAM_LOADER_OBSERVER.table()
 
-    IDLE = 0              # State 0: 0.0V → 0 digital
-    LOADING = 6553        # State 1: 1.0V → 6553 digital
-    DONE = 13107          # State 2: 2.0V → 13107 digital
-    RESERVED_FAULT = -13107  # State 3: -2.0V (sign-flip fault from previous state)
+    IDLE = _TABLE.code(0)                        # State 0: 0.0V
+    LOADING = _TABLE.code(1)                     # State 1: 1.0V → 6554 digital
+    DONE = _TABLE.code(2)                        # State 2: 2.0V → 13107 digital
+    RESERVED_FAULT = _TABLE.code(3, fault_from=2)  # State 3: -2.0V (sign-flip fault from DONE)
+    CRC_ERR = RESERVED_FAULT                       # Verify failed in DONE
 
     # Tolerance for voltage comparisons (±50 digital counts ≈ ±7.6mV)
     TOLERANCE = 50
@@ -93,6 +101,10 @@ class ControlBits:
     # Control11 - Address (12-bit, 0-4095)
     ADDR_MASK = 0x00000FFF
 
+    # Control10 - Upload CRC verify / continue
+    VERIFY_MASK = 0x00000004
+    CRC_CONTINUE_MASK = 0x00000008
+
     # Control13 - Write Strobe
     WRITE_STROBE_BIT = 0
     WRITE_STROBE_MASK = 0x00000001
@@ -112,6 +124,12 @@ class Timing:
     POST_WRITE_CYCLES = 2
     STATE_TRANSITION_CYCLES = 2
 
+    # Stream mode: cycles between register writes of one bulk call (random
+    # 0..MAX) and between bulk calls (the RTL needs >= 3 per tag change)
+    STREAM_MAX_SKEW_CYCLES = 2
+    STREAM_BATCH_GAP_CYCLES = 4
+    STREAM_SEED = 21
+
 
 # ==================================================================================
 # Error Messages
@@ -143,7 +161,14 @@ class ErrorMessages:
     # Loading protocol errors
     DONE_NOT_ASSERTED = "Done signal should be 1 after loading {} words"
     DONE_PREMATURE = "Done signal asserted prematurely at word {}/{}"
+    DONE_DURING_RELOAD = "Done signal should drop while reloading but is {}"
+    DONE_IN_CRC_ERR = "Done signal should be 0 in CRC_ERR but is {}"
     WORD_COUNT_MISMATCH = "Loaded {} words but expected {}"
+    STREAM_WRITES_MISMATCH = "Stream load wrote {} but expected {}"
+    BULK_WRITE_MISMATCH = "mcc_write_regs wrote {} but expected {}"
+
+    # Upload CRC errors
+    CRC_MISMATCH = "crc_out 0x{:08X} but Python CRC-32 is 0x{:08X}"
 
     # Voltage transition errors
     VOLTAGE_NO_CHANGE = "Observer voltage should change on state transition"
@@ -52,6 +52,16 @@ class TestValues:
     P3_DIV_VALUES = [1, 2, 3, 5, 10, 16, 32, 64, 128, 255]
     P3_TEST_CYCLES = 1024
 
+    # Edge-triggered helpers vs per-cycle helpers (conftest *_by_edge)
+    EDGE_DIV_SEL = 5
+    EDGE_WINDOW_CYCLES = 30
+    # (delay_ns, enable) steps from a falling edge: every change lands between
+    # rising edges; 0 at +16/1 at +17 and 0 at +57/1 at +58 are glitches no
+    # clock edge samples, 0 at +83/1 at +86 spans one edge
+    EDGE_ENABLE_PATTERN = [(16, 0), (1, 1), (19, 0), (20, 1), (1, 0), (1, 1),
+                           (25, 0), (3, 1), (15, 0), (13, 1)]
+    EDGE_UNREACHED_STATUS = 200  # stat_reg never gets there with EDGE_DIV_SEL
+
 
 # Error messages for assertions
 class ErrorMessages:
@@ -63,6 +73,7 @@ class ErrorMessages:
     PULSE_COUNT = "Expected {} pulses, got {}"
     COUNTER_FROZEN = "Counter should be frozen at {}, got {}"
     ENABLE_IGNORED = "clk_en should be 0 when enable=0, got {}"
+    EDGE_MISMATCH = "{}: edge-triggered helper gave {}, per-cycle helper {}"
 
 
 # Helper functions
@@ -0,0 +1,349 @@
+"""
+Compact waveform recorder for CocotB tests.
+
+capture_signal_sequence() keeps one Python int per signal per cycle, which
+adds up quickly for long FSM captures. WaveformRecorder instead stores each
+signal as a run-length encoded column: two preallocated `array("q")`
+buffers holding only the simulation time and value of every change. A
+signal that is stable for 100k cycles costs one entry, and nothing is
+recorded while no signal changes (each column is watched with an Edge
+trigger, not sampled every clock).
+
+Values are reported per clock cycle with the same sampling convention as
+the per-cycle helpers in conftest.py: cycle k is the value seen right after
+the k-th rising clock edge following start(), i.e. the last change before
+that edge. Unresolved values (X/U/Z) are stored as UNRESOLVED (-1).
+
+Usage:
+    from waveform_recorder import WaveformRecorder
+
+    rec = WaveformRecorder(dut, ["OutputC", "fsm_state"], clk=dut.Clk)
+    await rec.start()
+    ...                                   # run the scenario
+    rec.stop()
+
+    states = rec.values("fsm_state", 100, 200)   # one value per cycle
+    rec.changes("fsm_state")                     # [(cycle, value), ...]
+    rec.log_table(dut, 100, 110)
+    rec.write_vcd("ds1140_fsm.vcd")
+    rec.write_parquet("ds1140_fsm.parquet")      # needs pyarrow
+
+Author: EZ-EMFI Team
+Date: 2026-10-17
+"""
+
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cocotb
+from cocotb.triggers import Edge, RisingEdge
+
+try:
+    from cocotb.simtime import get_sim_time  # cocotb 2.x
+except ImportError:
+    from cocotb.utils import get_sim_time
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+UNRESOLVED = -1              # Stored for X/U/Z/W values
+DEFAULT_CAPACITY = 1024      # Initial changes preallocated per column
+MAX_ARRAY_WIDTH = 62         # Wider signals keep their values in a list
+
+
+class SignalColumn:
+    """Run-length encoded changes of one signal"""
+
+    def __init__(self, name: str, handle, capacity: int = DEFAULT_CAPACITY):
+        self.name = name
+        self.handle = handle
+        try:
+            self.width = len(handle)
+        except TypeError:
+            self.width = 1
+        # Preallocate, then track the used length ourselves
+        self.times = array("q", bytes(8 * capacity))
+        if self.width <= MAX_ARRAY_WIDTH:
+            self.values = array("q", bytes(8 * capacity))
+        else:
+            self.values = [0] * capacity
+        self.count = 0
+
+    def append(self, time_steps: int, value: int):
+        if self.count and self.values[self.count - 1] == value:
+            return  # Stable: extend the current run
+        if self.count == len(self.times):
+            # Amortized doubling (array.extend copies once in C)
+            self.times.extend(self.times)
+            self.values.extend(self.values)
+        self.times[self.count] = time_steps
+        self.values[self.count] = value
+        self.count += 1
+
+    def read(self) -> int:
+        try:
+            return int(self.handle.value)
+        except ValueError:
+            return UNRESOLVED
+
+
+class WaveformRecorder:
+    """
+    Record DUT signals as run-length encoded columns.
+
+    Args:
+        dut: Device Under Test
+        signals: Signal names (attributes of `dut`) or (name, handle) pairs
+        clk: Clock the cycle numbers refer to (default: dut.Clk or dut.clk)
+        capacity: Changes preallocated per signal (grows by doubling)
+    """
+
+    def __init__(self, dut, signals: Sequence, clk=None, capacity: int = DEFAULT_CAPACITY):
+        self.dut = dut
+        self.clk = clk if clk is not None else (dut.Clk if hasattr(dut, "Clk") else dut.clk)
+        self.columns: Dict[str, SignalColumn] = {}
+        for signal in signals:
+            name, handle = (signal, getattr(dut, signal)) if isinstance(signal, str) else signal
+            self.columns[name] = SignalColumn(name, handle, capacity)
+
+        self.t0 = 0                 # Sim steps of cycle 0's clock edge
+        self.t0_ns = 0.0
+        self.period = 0             # Clock period in sim steps
+        self.period_ns = 0.0
+        self.t_stop: Optional[int] = None
+        self._tasks = []
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """Start recording at the next rising clock edge (cycle 0)"""
+        await RisingEdge(self.clk)
+        self.t0 = get_sim_time()
+        self.t0_ns = get_sim_time("ns")
+        for column in self.columns.values():
+            column.append(self.t0, column.read())
+            self._tasks.append(cocotb.start_soon(self._watch(column)))
+        self._tasks.append(cocotb.start_soon(self._measure_period()))
+
+    def stop(self):
+        """Stop recording; cycles up to the current sim time stay available"""
+        self.t_stop = get_sim_time()
+        for task in self._tasks:
+            if hasattr(task, "cancel"):
+                task.cancel()
+            else:
+                task.kill()  # cocotb 1.x
+        self._tasks = []
+
+    async def _measure_period(self):
+        await RisingEdge(self.clk)
+        self.period = get_sim_time() - self.t0
+        self.period_ns = get_sim_time("ns") - self.t0_ns
+
+    async def _watch(self, column: SignalColumn):
+        handle = column.handle
+        while True:
+            await Edge(handle)
+            column.append(get_sim_time(), column.read())
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def _cycle_of(self, time_steps: int) -> int:
+        """
+        First cycle whose sample sees a change made at `time_steps`.
+
+        Only for changes after the start() sample: a change at the cycle-0
+        edge time itself (a register updating in the delta cycles after that
+        edge) is first sampled by cycle 1.
+        """
+        if not self.period:
+            return 1  # Period not measured yet: nothing past cycle 0 is readable
+        return int((time_steps - self.t0) // self.period) + 1
+
+    @property
+    def num_cycles(self) -> int:
+        """Cycles recorded so far (cycle 0 .. num_cycles - 1)"""
+        if not self.period:
+            return 1
+        end = self.t_stop if self.t_stop is not None else get_sim_time()
+        return int((end - self.t0) // self.period) + 1
+
+    def changes(self, name: str) -> List[Tuple[int, int]]:
+        """
+        (cycle, value) for every cycle where the sampled value of `name` changes
+
+        Several changes before one clock edge collapse to the last one.
+        """
+        column = self.columns[name]
+        result: List[Tuple[int, int]] = []
+        for i in range(column.count):
+            # Entry 0 is the value sampled by start(); later entries are changes
+            cycle = self._cycle_of(column.times[i]) if i else 0
+            value = column.values[i]
+            if result and result[-1][0] == cycle:
+                result.pop()
+            if not result or result[-1][1] != value:
+                result.append((cycle, value))
+        return result
+
+    def values(self, name: str, start: int = 0, end: Optional[int] = None, as_numpy: bool = False):
+        """
+        One value per cycle for cycles [start, end) of `name`.
+
+        Args:
+            name: Signal name
+            start: First cycle
+            end: End cycle, exclusive (default: num_cycles)
+            as_numpy: Return a NumPy int64 array (requires numpy)
+
+        Returns:
+            array("q") (or numpy.ndarray) of length end - start
+        """
+        end = self.num_cycles if end is None else end
+        runs = self.changes(name)
+        starts = [cycle for cycle, _ in runs]
+
+        if as_numpy:
+            if not NUMPY_AVAILABLE:
+                raise RuntimeError("numpy is not installed - use as_numpy=False")
+            bounds = np.clip(np.array(starts[1:] + [end], dtype=np.int64), start, end)
+            lengths = np.diff(np.concatenate(([start], bounds)))
+            return np.repeat(np.array([v for _, v in runs], dtype=np.int64), np.maximum(lengths, 0))
+
+        out = array("q")
+        for i, (cycle, value) in enumerate(runs):
+            run_end = starts[i + 1] if i + 1 < len(runs) else end
+            lo, hi = max(cycle, start), min(run_end, end)
+            if hi > lo:
+                out.extend(array("q", [value]) * (hi - lo))
+        return out
+
+    def value_at(self, name: str, cycle: int) -> int:
+        """Sampled value of `name` at one cycle"""
+        result = self.columns[name].values[0] if self.columns[name].count else UNRESOLVED
+        for change_cycle, value in self.changes(name):
+            if change_cycle > cycle:
+                break
+            result = value
+        return result
+
+    def slice(self, start: int, end: int) -> Dict[str, array]:
+        """Per-cycle values of every signal for cycles [start, end)"""
+        return {name: self.values(name, start, end) for name in self.columns}
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def _format_value(self, name: str, value: int) -> str:
+        if value == UNRESOLVED:
+            return "X"
+        width = self.columns[name].width
+        return str(value) if width == 1 else f"0x{value:0{(width + 3) // 4}X}"
+
+    def format_table(self, start: int, end: int) -> List[str]:
+        """Table rows (cycle + one column per signal) for cycles [start, end)"""
+        names = list(self.columns)
+        data = self.slice(start, end)
+        widths = [max(len(name), 6) for name in names]
+        rows = ["cycle    " + "  ".join(f"{n:>{w}s}" for n, w in zip(names, widths))]
+        for i in range(end - start):
+            cells = (self._format_value(n, data[n][i]) for n in names)
+            rows.append(f"{start + i:<8d} " + "  ".join(f"{c:>{w}s}" for c, w in zip(cells, widths)))
+        return rows
+
+    def log_table(self, dut, start: int, end: int, title: str = "Recorded Signals"):
+        """Log format_table() like conftest.log_signal_table()"""
+        dut._log.info("=" * 60)
+        dut._log.info(f"{title} (cycles {start}-{end - 1})")
+        dut._log.info("-" * 60)
+        for row in self.format_table(start, end):
+            dut._log.info(f"  {row}")
+        dut._log.info("=" * 60)
+
+    def write_vcd(self, path, timescale_ns: int = 1):
+        """
+        Export to a VCD file (one timestamp per clock cycle with a change).
+
+        Args:
+            path: Output .vcd path
+            timescale_ns: VCD time unit in ns (default: 1)
+        """
+        ids = {name: _vcd_id(i) for i, name in enumerate(self.columns)}
+        events: Dict[int, List[Tuple[str, int]]] = {}
+        for name in self.columns:
+            for cycle, value in self.changes(name):
+                events.setdefault(cycle, []).append((name, value))
+
+        with open(path, "w") as f:
+            f.write(f"$timescale {timescale_ns} ns $end\n")
+            f.write("$scope module recorder $end\n")
+            for name, column in self.columns.items():
+                f.write(f"$var wire {column.width} {ids[name]} {name} $end\n")
+            f.write("$upscope $end\n$enddefinitions $end\n")
+            for cycle in sorted(events):
+                time_ns = self.t0_ns + cycle * self.period_ns
+                f.write(f"#{int(round(time_ns / timescale_ns))}\n")
+                for name, value in events[cycle]:
+                    f.write(_vcd_value(value, self.columns[name].width, ids[name]))
+
+    def write_parquet(self, path):
+        """
+        Export the run-length encoded changes to Parquet.
+
+        One row per change: signal, cycle, time_ns, value (null = unresolved).
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is not installed - use write_vcd() instead")
+
+        signals, cycles, times, values = [], [], [], []
+        for name in self.columns:
+            for cycle, value in self.changes(name):
+                signals.append(name)
+                cycles.append(cycle)
+                times.append(self.t0_ns + cycle * self.period_ns)
+                values.append(None if value == UNRESOLVED else value)
+
+        table = pyarrow.table({
+            "signal": pyarrow.array(signals).dictionary_encode(),
+            "cycle": pyarrow.array(cycles, type=pyarrow.int64()),
+            "time_ns": pyarrow.array(times, type=pyarrow.float64()),
+            "value": pyarrow.array(values, type=pyarrow.uint64()),
+        })
+        pyarrow.parquet.write_table(table, str(Path(path)))
+
+
+def _vcd_id(index: int) -> str:
+    """Short printable VCD identifier for the index-th variable"""
+    chars = []
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 94)
+        chars.append(chr(33 + rem))
+    return "".join(chars)
+
+
+def _vcd_value(value: int, width: int, ident: str) -> str:
+    if width == 1:
+        return f"{'x' if value == UNRESOLVED else value & 1}{ident}\n"
+    bits = "x" * width if value == UNRESOLVED else format(value, f"0{width}b")
+    return f"b{bits} {ident}\n"
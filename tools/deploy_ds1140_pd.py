@@ -33,11 +33,15 @@ Usage:
     # Skip interactive testing
     python tools/deploy_ds1140_pd.py --no-test
 
+    # Reset/arm/fire campaign of 1000 shots (pipelined async writes)
+    python tools/deploy_ds1140_pd.py --no-test --campaign 1000
+
 Author: EZ-EMFI Team
 Date: 2025-01-28
 """
 
 import argparse
+import asyncio
 import sys
 import time
 from pathlib import Path
@@ -53,6 +57,8 @@ except ImportError:
     MOKU_AVAILABLE = False
     sys.exit(1)
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from models.moku_control import AsyncControlSession
 
 # ============================================================================
 # DS1140-PD FSM States
@@ -616,6 +622,54 @@ class DS1140Deployment:
             print(f"  ✗ Reset failed: {e}")
             return False
 
+    async def _campaign(self, shots: int, check_every: int) -> Dict:
+        """Pulse reset/arm/fire for each shot, checking for DONE every check_every shots"""
+        press = DS1140Registers.pack_button(True)
+        failures = 0
+        async with AsyncControlSession(self.cloud_compile) as session:
+            t0 = time.perf_counter()
+            for shot in range(1, shots + 1):
+                await session.pulse(DS1140Registers.RESET_FSM, press)
+                await session.pulse(DS1140Registers.ARM_PROBE, press)
+                await session.pulse(DS1140Registers.FORCE_FIRE, press)
+                if check_every and shot % check_every == 0:
+                    # Oscilloscope reads are blocking too: keep them off the loop
+                    if not await asyncio.to_thread(self.wait_for_state, "DONE", 2.0):
+                        failures += 1
+                        print(f"  ✗ Shot {shot}: DONE not reached")
+            elapsed = time.perf_counter() - t0
+        return {"elapsed": elapsed, "failures": failures, "stats": session.stats}
+
+    def run_campaign(self, shots: int, check_every: int = 100) -> bool:
+        """
+        Run a reset → arm → force-fire campaign through an async control session.
+
+        Button pulses are awaited (release only after the press was
+        acknowledged) instead of sleeping between the two writes.
+
+        Args:
+            shots: Number of reset/arm/fire cycles
+            check_every: Verify the FSM reached DONE every N shots (0 = never)
+
+        Returns:
+            True if every checked shot reached DONE
+        """
+        print(f"\nRunning {shots}-shot campaign...")
+        try:
+            result = asyncio.run(self._campaign(shots, check_every))
+        except Exception as e:
+            print(f"  ✗ Campaign failed: {e}")
+            return False
+
+        stats = result["stats"]
+        print(f"  ✓ {shots} shots in {result['elapsed']:.2f}s "
+              f"({shots / result['elapsed']:.1f} shots/s)")
+        print(f"  Writes: {stats.writes}, network calls: {stats.calls}")
+        if result["failures"]:
+            print(f"  ✗ {result['failures']} checked shots did not reach DONE")
+            return False
+        return True
+
     def run_deployment(self, skip_test: bool = False) -> bool:
         """Execute full deployment sequence"""
         print("=" * 70)
@@ -799,12 +853,19 @@ Examples:
 
   # Skip interactive testing
   python tools/deploy_ds1140_pd.py --no-test
+
+  # 1000-shot reset/arm/fire campaign
+  python tools/deploy_ds1140_pd.py --no-test --campaign 1000
         """
     )
 
     parser.add_argument('--ip', type=str, help='Moku device IP address')
     parser.add_argument('--bitstream', type=Path, help='Path to DS1140-PD bitstream (.tar)')
     parser.add_argument('--no-test', action='store_true', help='Skip interactive testing')
+    parser.add_argument('--campaign', type=int, default=0, metavar='SHOTS',
+                        help='Run SHOTS reset/arm/fire cycles after deployment')
+    parser.add_argument('--check-every', type=int, default=100, metavar='N',
+                        help='Campaign: check for DONE every N shots (default: 100, 0 = never)')
 
     args = parser.parse_args()
 
@@ -839,6 +900,8 @@ Examples:
     # Run deployment
     deployment = DS1140Deployment(args.ip, args.bitstream)
     success = deployment.run_deployment(skip_test=args.no_test)
+    if success and args.campaign:
+        success = deployment.run_campaign(args.campaign, args.check_every)
 
     # Keep connection open
     if success: